@@ -0,0 +1,233 @@
+# coding=utf-8
+
+"""
+Asyncio flavor of the Poco API for the std protocol (python 3.5+). Every method that talks to the device is a
+coroutine, so that one event loop can drive many devices concurrently without a thread for each of them.
+
+Each selection dumps the hierarchy once and evaluates the query locally on the frozen hierarchy, see
+:py:meth:`Poco.freeze() <poco.pocofw.Poco.freeze>`.
+
+Examples:
+    ::
+
+        import asyncio
+        from poco.aio import AsyncPoco
+
+        async def play(addr):
+            poco = await AsyncPoco.connect_std(addr)
+            await poco('start').wait_for_appearance(timeout=20)
+            await poco('start').click()
+            print(await poco('title').attr('text'))
+
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(asyncio.gather(play(('10.0.0.2', 15004)), play(('10.0.0.3', 15004))))
+"""
+
+import asyncio
+import copy
+import time
+import warnings
+
+from poco.exceptions import PocoTargetTimeout, PocoNoSuchNodeException, InvalidOperationException
+from poco.freezeui.utils import create_immutable_hierarchy
+from poco.sdk.exceptions import NoSuchTargetException
+from poco.utils.query_util import query_expr, build_query
+from poco.utils.simplerpc.aio import AsyncRpcClient, AsyncTcpTransport, AsyncWsTransport
+
+
+__all__ = ['AsyncPoco', 'AsyncUIObjectProxy']
+
+
+class AsyncUIObjectProxy(object):
+    """
+    Asyncio counterpart of :py:class:`UIObjectProxy <poco.proxy.UIObjectProxy>`. Query expressions are built the same
+    way, nothing is selected until an attribute or action is awaited.
+    """
+
+    def __init__(self, poco, name=None, **attrs):
+        super(AsyncUIObjectProxy, self).__init__()
+        self.query = build_query(name, **attrs)
+        self.poco = poco
+        self._focus = None
+
+    def _derive(self, query):
+        obj = copy.copy(self)
+        obj.query = query
+        return obj
+
+    def child(self, name=None, **attrs):
+        return self._derive(('/', (self.query, build_query(name, **attrs))))
+
+    def offspring(self, name=None, **attrs):
+        return self._derive(('>', (self.query, build_query(name, **attrs))))
+
+    def sibling(self, name=None, **attrs):
+        return self._derive(('-', (self.query, build_query(name, **attrs))))
+
+    def parent(self):
+        return self._derive(('^', (self.query, build_query(None))))
+
+    def __getitem__(self, item):
+        return self._derive(('index', (self.query, item)))
+
+    def focus(self, f):
+        ret = copy.copy(self)
+        ret._focus = f
+        return ret
+
+    async def _select(self):
+        hierarchy = create_immutable_hierarchy(await self.poco.dump())
+        try:
+            nodes = hierarchy.select(self.query, False)
+        except NoSuchTargetException:
+            nodes = None
+        if not nodes:
+            raise PocoNoSuchNodeException(self)
+        return hierarchy, nodes
+
+    async def attr(self, name):
+        """
+        See :py:meth:`UIObjectProxy.attr() <poco.proxy.UIObjectProxy.attr>`.
+        """
+
+        hierarchy, nodes = await self._select()
+        return hierarchy.getAttr(nodes, name)
+
+    async def exists(self):
+        try:
+            return await self.attr('visible')
+        except PocoNoSuchNodeException:
+            return False
+
+    async def get_position(self, focus=None):
+        """
+        See :py:meth:`UIObjectProxy.get_position() <poco.proxy.UIObjectProxy.get_position>`. All the attributes are
+        taken from one dump.
+        """
+
+        focus = focus or self._focus or 'center'
+        hierarchy, nodes = await self._select()
+        x, y = map(float, hierarchy.getAttr(nodes, 'pos'))
+        if focus == 'anchor':
+            return [x, y]
+        if focus == 'center':
+            fx, fy = 0.5, 0.5
+        elif type(focus) in (list, tuple):
+            fx, fy = focus
+        else:
+            raise TypeError('Unsupported focus type {}. '
+                            'Only "anchor/center" or 2-list/2-tuple available.'.format(type(focus)))
+        w, h = hierarchy.getAttr(nodes, 'size')
+        ap_x, ap_y = map(float, hierarchy.getAttr(nodes, 'anchorPoint'))
+        return [x + w * (fx - ap_x), y + h * (fy - ap_y)]
+
+    async def click(self, focus=None, sleep_interval=None):
+        """
+        See :py:meth:`UIObjectProxy.click() <poco.proxy.UIObjectProxy.click>`. Waits for the element to appear for at
+        most ``pre_action_wait_for_appearance`` seconds first.
+        """
+
+        if self.poco.pre_action_wait_for_appearance:
+            await self.wait_for_appearance(self.poco.pre_action_wait_for_appearance)
+        pos = await self.get_position(focus)
+        ret = await self.poco.click(pos, sleep_interval)
+        return ret
+
+    async def wait_for_appearance(self, timeout=120):
+        """
+        Raises:
+            PocoTargetTimeout: when the element does not appear in time
+        """
+
+        start = time.time()
+        while not await self.exists():
+            if time.time() - start > timeout:
+                raise PocoTargetTimeout('appearance', self)
+            await self.poco.sleep_for_polling_interval()
+
+    async def wait_for_disappearance(self, timeout=120):
+        """
+        Raises:
+            PocoTargetTimeout: when the element does not disappear in time
+        """
+
+        start = time.time()
+        while await self.exists():
+            if time.time() - start > timeout:
+                raise PocoTargetTimeout('disappearance', self)
+            await self.poco.sleep_for_polling_interval()
+
+    def __str__(self):
+        return 'AsyncUIObjectProxy of "{}"'.format(query_expr(self.query))
+
+    __repr__ = __str__
+
+
+class AsyncPoco(object):
+    """
+    Asyncio counterpart of :py:class:`Poco <poco.pocofw.Poco>` talking the std protocol.
+
+    Args:
+        client (:py:class:`AsyncRpcClient <poco.utils.simplerpc.aio.AsyncRpcClient>`): connected rpc client
+        options: ``action_interval``, ``poll_interval`` and ``pre_action_wait_for_appearance``, see
+         :py:class:`Poco <poco.pocofw.Poco>`
+    """
+
+    def __init__(self, client, **options):
+        super(AsyncPoco, self).__init__()
+        self.client = client
+        self.pre_action_wait_for_appearance = options.get('pre_action_wait_for_appearance', 6)
+        self._post_action_interval = options.get('action_interval', 0.8)
+        self._poll_interval = options.get('poll_interval', 1.44)
+
+    @classmethod
+    async def connect_std(cls, addr, **options):
+        """
+        Connect to the std sdk and return the poco instance.
+
+        Args:
+            addr: ``(host, port)`` tuple, unix domain socket path, or a ``ws://`` url
+        """
+
+        if isinstance(addr, str) and addr.startswith(('ws://', 'wss://')):
+            transport = AsyncWsTransport(addr)
+        else:
+            transport = AsyncTcpTransport(addr)
+        client = AsyncRpcClient(transport)
+        await client.connect()
+        return cls(client, **options)
+
+    async def close(self):
+        await self.client.close()
+
+    def __call__(self, name=None, **kw):
+        if not name and len(kw) == 0:
+            warnings.warn("Wildcard selector may cause performance trouble. Please give at least one condition to "
+                          "shrink range of results")
+        return AsyncUIObjectProxy(self, name, **kw)
+
+    async def dump(self, onlyVisibleNode=True):
+        return await self.client.call('Dump', onlyVisibleNode)
+
+    async def click(self, pos, sleep_interval=None):
+        """
+        See :py:meth:`Poco.click() <poco.pocofw.Poco.click>`.
+        """
+
+        if not (0 <= pos[0] <= 1) or not (0 <= pos[1] <= 1):
+            raise InvalidOperationException('Click position out of screen. pos={}'.format(repr(pos)))
+        ret = await self.client.call('Click', pos[0], pos[1])
+        if sleep_interval:
+            await asyncio.sleep(sleep_interval)
+        else:
+            await self.wait_stable()
+        return ret
+
+    async def get_screen_size(self):
+        return await self.client.call('GetScreenSize')
+
+    async def wait_stable(self):
+        await asyncio.sleep(self._post_action_interval)
+
+    async def sleep_for_polling_interval(self):
+        await asyncio.sleep(self._poll_interval)
@@ -311,6 +311,8 @@ class PocoSDKOSX(object):
         self.reactor.register('RClick', self.RClick)
         self.reactor.register('DoubleClick', self.DoubleClick)
         self.reactor.register('KeyEvent', self.KeyEvent)
+        self.reactor.enable_batch_input()
+        self.reactor.enable_capabilities()
         transport = TcpSocket()
         transport.bind(self.addr)
         self.rpc = StdRpcEndpointController(transport, self.reactor)
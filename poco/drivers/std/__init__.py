@@ -3,12 +3,13 @@
 from poco.pocofw import Poco
 from poco.agent import PocoAgent
 from poco.drivers.std.attributor import StdAttributor
+from poco.drivers.std.capabilities import StdCapabilities
 from poco.drivers.std.dumper import StdDumper
+from poco.drivers.std.hierarchy import StdHierarchy
 from poco.drivers.std.screen import StdScreen
 from poco.drivers.std.inputs import StdInput
-from poco.freezeui.hierarchy import FrozenUIHierarchy
 from poco.utils.airtest import AirtestInput
-from poco.utils.simplerpc.rpcclient import RpcClient
+from poco.utils.simplerpc.rpcclient import RpcClient, LaneRpcClient
 from poco.utils.simplerpc.transport.tcp.main import TcpClient
 from poco.utils.simplerpc.utils import sync_wrapper
 from poco.utils.device import default_device
@@ -24,18 +25,40 @@ DEFAULT_ADDR = ('localhost', DEFAULT_PORT)
 
 
 class StdPocoAgent(PocoAgent):
-    def __init__(self, addr=DEFAULT_ADDR, use_airtest_input=True):
+    """
+    Args:
+        addr: ``(host, port)`` of the sdk, or the path of its unix domain socket
+        use_airtest_input (:py:obj:`bool`): whether to use airtest to perform input actions instead of the sdk
+        bulk_lane (:py:obj:`bool`): whether to open a second connection for Dump and Screenshot so that their large
+         responses do not delay the other calls. default to False. enable it only for sdks known to serve requests on
+         every connection, an sdk accepting the second connection without answering on it makes these calls time out
+        hub (:py:class:`RpcHub <poco.utils.simplerpc.hub.RpcHub>`): hub receiving for the connections, shared by many
+         agents in one process. by default each call polls its own connection
+    """
+
+    def __init__(self, addr=DEFAULT_ADDR, use_airtest_input=True, bulk_lane=False, hub=None):
         self.conn = TcpClient(addr)
-        self.c = RpcClient(self.conn)
+        clients = [RpcClient(self.conn)]
+        if bulk_lane:
+            clients.append(RpcClient(TcpClient(addr)))
+            self.c = LaneRpcClient(*clients)
+        else:
+            self.c = clients[0]
+        if hub is not None:
+            for client in clients:
+                hub.add(client)
         self.c.DEBUG = False
         self.c.connect()
 
-        hierarchy = FrozenUIHierarchy(StdDumper(self.c), StdAttributor(self.c))
         screen = StdScreen(self.c)
+        capabilities = StdCapabilities(self.c)
         if use_airtest_input:
             inputs = AirtestInput()
+            attributor = StdAttributor(self.c)
         else:
-            inputs = StdInput(self.c)
+            inputs = StdInput(self.c, capabilities)
+            attributor = StdAttributor(self.c, inputs)
+        hierarchy = StdHierarchy(StdDumper(self.c), attributor, capabilities)
         super(StdPocoAgent, self).__init__(hierarchy, inputs, screen, None)
 
     @property
@@ -59,6 +82,12 @@ class StdPoco(Poco):
         port (:py:obj:`int`): the port number of the server that listens on the target device. default to 15004.
         device (:py:obj:`Device`): :py:obj:`airtest.core.device.Device` instance provided by ``airtest``. leave the
          parameter default and the default device will be chosen. more details refer to ``airtest doc``
+        ip (:py:obj:`str`): ip address of the target device. leave it None to find it out from the device
+        hub (:py:class:`RpcHub <poco.utils.simplerpc.hub.RpcHub>`): receive in the given hub thread, see
+         :py:class:`StdPocoAgent`
+        unix_socket (:py:obj:`str`): path of the unix domain socket the sdk listens on, for sdks running on the same
+         host. ``port``, ``device`` and ``ip`` are ignored when provided
+        bulk_lane (:py:obj:`bool`): open a second connection for Dump and Screenshot, see :py:class:`StdPocoAgent`
         options: see :py:class:`poco.pocofw.Poco`
 
     Examples:
@@ -74,6 +103,9 @@ class StdPoco(Poco):
             # or use ip:port to initialize poco object
             poco = StdPoco(port=10054, ip='xx.xx.xx.xx')
 
+            # or use a unix domain socket if the sdk runs on the same host
+            poco = StdPoco(unix_socket='/tmp/poco-sdk.sock')
+
             # now you can play with poco
             ui = poco('...')
             ui.click()
@@ -81,7 +113,18 @@ class StdPoco(Poco):
 
     """
 
-    def __init__(self, port=DEFAULT_PORT, device=None, use_airtest_input=True, ip=None, **kwargs):
+    def __init__(self, port=DEFAULT_PORT, device=None, use_airtest_input=True, ip=None, unix_socket=None, hub=None,
+                 bulk_lane=False, **kwargs):
+        if unix_socket is not None:
+            addr = unix_socket
+        else:
+            addr = self._resolve_ip(port, device, ip)
+
+        agent = StdPocoAgent(addr, use_airtest_input, bulk_lane=bulk_lane, hub=hub)
+        kwargs['reevaluate_volatile_attributes'] = True
+        super(StdPoco, self).__init__(agent, **kwargs)
+
+    def _resolve_ip(self, port, device, ip):
         if ip is None or ip == "localhost":
             self.device = device or default_device()
 
@@ -106,7 +149,4 @@ class StdPoco(Poco):
                     except socket.gaierror:
                         # 某些特殊情况下会出现这个error，无法正确获取本机ip地址
                         ip = 'localhost'
-
-        agent = StdPocoAgent((ip, port), use_airtest_input)
-        kwargs['reevaluate_volatile_attributes'] = True
-        super(StdPoco, self).__init__(agent, **kwargs)
+        return ip, port
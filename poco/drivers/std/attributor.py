@@ -5,9 +5,16 @@ from poco.sdk.exceptions import UnableToSetAttributeException
 
 
 class StdAttributor(Attributor):
-    def __init__(self, client):
+    """
+    Args:
+        client: rpc client
+        inputs (:py:class:`StdInput <poco.drivers.std.inputs.StdInput>`): SetText is queued into its batch if active
+    """
+
+    def __init__(self, client, inputs=None):
         super(StdAttributor, self).__init__()
         self.client = client
+        self.inputs = inputs
 
     def setAttr(self, node, attrName, attrVal):
         if attrName == 'text':
@@ -15,6 +22,9 @@ class StdAttributor(Attributor):
                 node = node[0]
             instance_id = node.getAttr('_instanceId')
             if instance_id:
+                if self.inputs is not None and self.inputs.batch is not None:
+                    self.inputs.queue('SetText', instance_id, attrVal)
+                    return True
                 success = self.client.call('SetText', instance_id, attrVal)
                 if success:
                     return True
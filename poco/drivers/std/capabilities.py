@@ -0,0 +1,36 @@
+# coding=utf-8
+
+from poco.utils.simplerpc.simplerpc import RpcConnectionError, RpcTimeoutError
+from poco.utils.simplerpc.utils import RemoteError
+
+
+class StdCapabilities(object):
+    """
+    Names of the optional methods the sdk advertises by ``GetCapabilities``, fetched once on first use and shared by
+    the parts of the driver. Sdks without ``GetCapabilities`` advertise nothing, including older ones dropping unknown
+    methods without an answer, which are given up after ``PROBE_TIMEOUT`` seconds.
+
+    Args:
+        client: rpc client
+    """
+
+    PROBE_TIMEOUT = 5
+
+    def __init__(self, client):
+        super(StdCapabilities, self).__init__()
+        self.client = client
+        self._names = None
+
+    def __contains__(self, name):
+        if self._names is None:
+            try:
+                self._names = set(self._get_capabilities() or [])
+            except (RemoteError, RpcTimeoutError, RpcConnectionError):
+                self._names = set()
+        return name in self._names
+
+    def _get_capabilities(self):
+        ret, err = self.client.call("GetCapabilities").wait(timeout=self.PROBE_TIMEOUT)
+        if err:
+            raise RemoteError(err['message'])
+        return ret
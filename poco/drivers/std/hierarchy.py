@@ -0,0 +1,58 @@
+# coding=utf-8
+
+from poco.freezeui.hierarchy import FrozenUIHierarchy, Node
+from poco.sdk.exceptions import NoSuchTargetException
+from poco.utils.simplerpc.utils import sync_wrapper
+
+
+class StdHierarchy(FrozenUIHierarchy):
+    """
+    Hierarchy of the std protocol. Queries are evaluated inside the sdk by ``Select``, ``Count`` and ``Exists`` if it
+    advertises the methods, so that only the matched nodes or the answer is transferred, otherwise the whole
+    hierarchy is dumped and the query is evaluated locally like
+    :py:class:`FrozenUIHierarchy <poco.freezeui.hierarchy.FrozenUIHierarchy>`.
+
+    Args:
+        dumper: :py:class:`StdDumper <poco.drivers.std.dumper.StdDumper>`
+        attributor: :py:class:`StdAttributor <poco.drivers.std.attributor.StdAttributor>`
+        capabilities (:py:class:`StdCapabilities <poco.drivers.std.capabilities.StdCapabilities>`): capabilities of
+         the sdk
+    """
+
+    def __init__(self, dumper, attributor, capabilities):
+        super(StdHierarchy, self).__init__(dumper, attributor)
+        self.capabilities = capabilities
+
+    @property
+    def selects_locally(self):
+        """
+        whether the queries are evaluated by the local selector, which is the only one consulting its locator hints
+        """
+
+        return 'Select' not in self.capabilities
+
+    def select(self, query, multiple=False):
+        if 'Select' not in self.capabilities:
+            return super(StdHierarchy, self).select(query, multiple)
+
+        nodes = self._select(query, multiple, None)
+        if nodes is None:
+            raise NoSuchTargetException(u'Query results index out of range. Condition "{}".'.format(query))
+        return [Node(n) for n in nodes]
+
+    def count(self, query):
+        if 'Count' not in self.capabilities:
+            return super(StdHierarchy, self).count(query)
+        return self._call("Count", query)
+
+    def exists(self, query):
+        if 'Exists' not in self.capabilities:
+            return super(StdHierarchy, self).exists(query)
+        return self._call("Exists", query)
+
+    def _select(self, query, multiple, attrs):
+        return self._call("Select", query, multiple, attrs)
+
+    @sync_wrapper
+    def _call(self, method, *args):
+        return self.dumper.rpcclient.call(method, *args)
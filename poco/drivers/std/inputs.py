@@ -1,40 +1,113 @@
 # coding=utf-8
 
+from poco.drivers.std.capabilities import StdCapabilities
 from poco.sdk.interfaces.input import InputInterface
 from poco.utils.simplerpc.utils import sync_wrapper
 
 
 class StdInput(InputInterface):
-    def __init__(self, client):
+    def __init__(self, client, capabilities=None):
         super(StdInput, self).__init__()
         self.client = client
         # 根据需要修改构造函数的签名
         # 并修改对应的调用处
 
+        # input steps queued by an active batch, see begin_batch
+        self.batch = None
+        self.batch_step_delay = 0
+
+        self.capabilities = capabilities if capabilities is not None else StdCapabilities(client)
+
+    def has_capability(self, name):
+        """
+        Whether the sdk advertises the optional method, e.g. ``ClickNode``. Sdks without ``GetCapabilities`` advertise
+        nothing.
+        """
+
+        return name in self.capabilities
+
+    def begin_batch(self, step_delay=0):
+        """
+        Queue the following input actions instead of sending them one by one, until :py:meth:`end_batch`.
+
+        Args:
+            step_delay (:obj:`float`): seconds for the sdk to wait after each step
+        """
+
+        self.batch = []
+        self.batch_step_delay = step_delay
+
+    def end_batch(self, send=True):
+        """
+        Send all queued steps as one ``BatchInput`` call, executed in order by the sdk.
+
+        Args:
+            send (:obj:`bool`): False to discard the queued steps
+
+        Returns:
+            :obj:`list`: results of the steps
+        """
+
+        steps, self.batch = self.batch, None
+        if not send or not steps:
+            return []
+        return self._batch_input(steps)
+
+    def queue(self, method, *params):
+        """
+        Queue the step into the active batch or call it right away.
+        """
+
+        if self.batch is not None:
+            self.batch.append({'method': method, 'params': list(params), 'delay': self.batch_step_delay})
+            return None
+        return self._call(method, *params)
+
     @sync_wrapper
-    def click(self, x, y):
-        return self.client.call("Click", x, y)
+    def _call(self, method, *params):
+        return self.client.call(method, *params)
 
     @sync_wrapper
+    def _batch_input(self, steps):
+        return self.client.call("BatchInput", steps)
+
+    def click(self, x, y):
+        return self.queue("Click", x, y)
+
     def swipe(self, x1, y1, x2, y2, duration):
-        return self.client.call("Swipe", x1, y1, x2, y2, duration)
+        return self.queue("Swipe", x1, y1, x2, y2, duration)
 
-    @sync_wrapper
     def longClick(self, x, y, duration):
-        return self.client.call("LongClick", x, y, duration)
+        return self.queue("LongClick", x, y, duration)
 
-    @sync_wrapper
     def keyevent(self, keycode):
-        return self.client.call("KeyEvent", keycode)
+        return self.queue("KeyEvent", keycode)
 
-    @sync_wrapper
     def scroll(self, direction='vertical', percent=1, duration=2.0):
-        return self.client.call("Scroll", direction, percent, duration)
+        return self.queue("Scroll", direction, percent, duration)
 
-    @sync_wrapper
     def rclick(self, x, y):
-        return self.client.call("RClick", x, y)
+        return self.queue("RClick", x, y)
 
-    @sync_wrapper
     def double_click(self, x, y):
-        return self.client.call("DoubleClick", x, y)
+        return self.queue("DoubleClick", x, y)
+
+    def clickNode(self, instance_id, focus):
+        """
+        Click the node, whose position is resolved by the sdk when clicking. Requires capability ``ClickNode``.
+
+        Returns:
+            False if the node does not exist any more. None if queued in a batch
+        """
+
+        return self.queue("ClickNode", instance_id, focus)
+
+    def swipeNode(self, instance_id, focus, direction, duration):
+        """
+        Swipe from the node, whose position is resolved by the sdk when swiping. Requires capability ``SwipeNode``.
+
+        Returns:
+            False if the node does not exist any more. None if queued in a batch
+        """
+
+        return self.queue("SwipeNode", instance_id, focus, direction, duration)
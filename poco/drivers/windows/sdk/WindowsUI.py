@@ -10,6 +10,8 @@ import operator
 import uiautomation as UIAuto
 from poco.sdk.std.rpc.controller import StdRpcEndpointController
 from poco.sdk.std.rpc.reactor import StdRpcReactor
+from poco.sdk.std.rpc.node_actions import NodeActions
+from poco.sdk.std.rpc.selection import RemoteSelector
 from poco.utils.net.transport.tcp import TcpSocket
 from poco.drivers.windows.sdk.WindowsUIDumper import WindowsUIDumper
 from poco.sdk.exceptions import UnableToSetAttributeException, NonuniqueSurfaceException, InvalidSurfaceException
@@ -267,6 +269,10 @@ class PocoSDKWindows(object):
         self.reactor.register('Scroll', self.Scroll)
         self.reactor.register('RClick', self.RClick)
         self.reactor.register('DoubleClick', self.DoubleClick)
+        self.reactor.enable_batch_input()
+        NodeActions(self.reactor, lambda: WindowsUIDumper(self.root)).register()
+        RemoteSelector(self.reactor, lambda: WindowsUIDumper(self.root)).register()
+        self.reactor.enable_capabilities()
         transport = TcpSocket()
         transport.bind(self.addr)
         self.rpc = StdRpcEndpointController(transport, self.reactor)
@@ -62,7 +62,8 @@ class FrozenUIHierarchy(HierarchyInterface):
     def __init__(self, dumper, attributor=None):
         super(FrozenUIHierarchy, self).__init__()
         self.dumper = dumper
-        self.selector = Selector(self.dumper)
+        # the dumper creates a new root node for each dump, so that the memo never outlives its hierarchy data
+        self.selector = Selector(self.dumper, memoize=True)
         self.attributor = attributor or Attributor()
 
     def dump(self):
@@ -89,12 +90,51 @@ class FrozenUIHierarchy(HierarchyInterface):
 
         return self.selector.select(query, multiple)
 
+    def count(self, query):
+        """
+        count nodes by query
+        """
+
+        return self.selector.count(query)
+
+    def exists(self, query):
+        """
+        test whether any node matches the query
+        """
+
+        return self.selector.exists(query)
+
+    def handle(self, node):
+        """
+        the `_instanceId` of the node if provided
+        """
+
+        return node.getAttr('_instanceId')
+
+    def resolve(self, handle):
+        """
+        select the node by its `_instanceId`
+        """
+
+        return self.select(('attr=', ('_instanceId', handle)), False)
+
 
 class Node(AbstractNode):
     def __init__(self, node):
         super(Node, self).__init__()
         self.node = node
 
+    # a new Node is created for the same node data each time it is traversed, compare them by the node data so that
+    # the same node is selected only once
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.node is other.node
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return id(self.node)
+
     def setParent(self, p):
         self.node['__parent__'] = p
 
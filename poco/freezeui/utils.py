@@ -13,7 +13,17 @@ def create_immutable_hierarchy(hierarchy_dict):
 
 def create_immutable_dumper(hierarchy_dict):
     class ImmutableFrozenUIDumper(FrozenUIDumper):
+        def __init__(self):
+            super(ImmutableFrozenUIDumper, self).__init__()
+            self.root = None
+
         def dumpHierarchy(self, onlyVisibleNode=True):
             return hierarchy_dict
 
+        def getRoot(self):
+            # the hierarchy never changes, keep the same root so that the selections from it are memoized
+            if self.root is None:
+                self.root = super(ImmutableFrozenUIDumper, self).getRoot()
+            return self.root
+
     return ImmutableFrozenUIDumper()
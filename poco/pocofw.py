@@ -4,12 +4,14 @@ from __future__ import unicode_literals
 import time
 import traceback
 import warnings
+from contextlib import contextmanager
 
 from .acceleration import PocoAccelerationMixin
 from .exceptions import PocoTargetTimeout, InvalidOperationException
 from .proxy import UIObjectProxy
 from .agent import PocoAgent
 from .freezeui.utils import create_immutable_hierarchy
+from .sdk.Selector import Selector
 from .utils.track import MotionTrackBatch
 from .utils.multitouch_gesture import make_pinching
 from .gesture import PendingGestureAction
@@ -38,6 +40,10 @@ class Poco(PocoAccelerationMixin):
             - ``reevaluate_volatile_attributes``: Re-select target UI proxy when retrieving volatile attributes. Poco
               drivers that using hrpc connections should default to be ``False`` as hrpc always reevaluate the
               attributes remotely. This option is useful for ``StdPoco`` driver and should be handled by ``StdPoco``.
+            - ``locator_hints``: :py:class:`LocatorHints <poco.sdk.LocatorHints.LocatorHints>` for the selector of the
+              hierarchy if it selects locally, so that the UI elements selected by a plain condition are probed at the
+              positions where they were found last time first. Ignored with a warning if the hierarchy selects
+              remotely, e.g. ``StdPoco`` with an sdk implementing ``Select``. Disabled by default.
     """
 
     def __init__(self, agent, **options):
@@ -58,6 +64,16 @@ class Poco(PocoAccelerationMixin):
                                  .format(repr(touch_down_duration)))
             self._agent.input.setTouchDownDuration(touch_down_duration)
 
+        if options.get('locator_hints') is not None:
+            hierarchy = self._agent.hierarchy
+            selector = getattr(hierarchy, 'selector', None)
+            if isinstance(selector, Selector) and getattr(hierarchy, 'selects_locally', True):
+                selector.hints = options['locator_hints']
+            else:
+                warnings.warn('Option `locator_hints` is ignored as the hierarchy does not select locally.')
+
+        self._input_batch_depth = 0
+
         self._pre_action_callbacks = [self.__class__.on_pre_action]
         self._post_action_callbacks = [self.__class__.on_post_action]
         self._agent.on_bind_driver(self)
@@ -201,11 +217,70 @@ class Poco(PocoAccelerationMixin):
     def wait_stable(self):
         """
         Sleep for fixed number of seconds in order to wait for the UI to become still (stable).
-        There is no need to call this method manually. It's automatically invoked when required.
+        There is no need to call this method manually. It's automatically invoked when required. Skipped inside
+        :py:meth:`input_batch` as the actions are not performed yet.
         """
 
+        if self._input_batch_depth:
+            return
         time.sleep(self._post_action_interval)
 
+    @contextmanager
+    def input_batch(self, step_delay=0):
+        """
+        Queue the input actions (click, swipe, keyevent, set_text, etc.) performed inside the ``with`` block and send
+        them to the device at once when the block exits. The sdk executes them in order, waiting ``step_delay``
+        seconds after each step, which saves the network latency and ``wait_stable`` of each action. Queries are still
+        evaluated when the actions are queued, so the UI should not change in between. Nothing is sent if the block
+        raises.
+
+        Only available with input implementations that support batching, e.g. ``StdPoco(use_airtest_input=False)``
+        connected to an sdk advertising ``BatchInput``.
+
+        Examples:
+            ::
+
+                with poco.input_batch(step_delay=0.05):
+                    poco('username').set_text('foo')
+                    poco('password').set_text('bar')
+                    poco('login').click()
+
+        Args:
+            step_delay (:obj:`float`): seconds to wait on device side after each step
+
+        Raises:
+            InvalidOperationException: when the input implementation or the sdk does not support batching
+        """
+
+        inputs = self.agent.input
+        if not hasattr(inputs, 'begin_batch'):
+            raise InvalidOperationException('Input batch is not supported by {}'.format(repr(inputs)))
+        # check up front, otherwise the queued actions would be lost when the block exits
+        has_capability = getattr(inputs, 'has_capability', None)
+        if has_capability is not None and not has_capability('BatchInput'):
+            raise InvalidOperationException('Input batch is not supported by the sdk, which does not advertise '
+                                            '`BatchInput`.')
+        if self._input_batch_depth:
+            # nested batches are merged into the outer one
+            self._input_batch_depth += 1
+            try:
+                yield
+            finally:
+                self._input_batch_depth -= 1
+            return
+
+        inputs.begin_batch(step_delay)
+        self._input_batch_depth = 1
+        try:
+            yield
+        except BaseException:
+            self._input_batch_depth = 0
+            inputs.end_batch(send=False)
+            raise
+        self._input_batch_depth = 0
+        inputs.end_batch()
+        self.wait_stable()
+
     def sleep_for_polling_interval(self):
         """
         Sleep for fixed number of seconds after each poll event.
@@ -253,6 +328,32 @@ class Poco(PocoAccelerationMixin):
         self.wait_stable()
         return ret
 
+    def click_node(self, node_input, instance_id, focus, pos):
+        """
+        Perform click action on the UI element by its ``_instanceId``, whose position is resolved by the sdk when
+        clicking. ``pos`` is the position of the UI element just selected, which is checked the same way as the
+        coordinates given to :py:meth:`click`.
+
+        Args:
+            node_input: input implementation supporting ``clickNode``, e.g.
+             :py:class:`StdInput <poco.drivers.std.inputs.StdInput>`
+            instance_id: ``_instanceId`` of the UI element
+            focus: see :py:meth:`UIObjectProxy.click() <poco.proxy.UIObjectProxy.click>`
+            pos (:obj:`list(float, float)` / :obj:`tuple(float, float)`): position of the UI element in range of 0 to 1
+
+        Returns:
+            False if the UI element does not exist any more
+
+        Raises:
+            InvalidOperationException: when the UI element lies outside of the screen
+        """
+
+        if not (0 <= pos[0] <= 1) or not (0 <= pos[1] <= 1):
+            raise InvalidOperationException('Click position out of screen. pos={}'.format(repr(pos)))
+        ret = node_input.clickNode(instance_id, focus)
+        self.wait_stable()
+        return ret
+
     def rclick(self, pos):
         raise NotImplementedError
 
@@ -306,6 +407,32 @@ class Poco(PocoAccelerationMixin):
             raise TypeError('Swipe end not set.')
         return self.agent.input.swipe(p1[0], p1[1], p2[0], p2[1], duration)
 
+    def swipe_node(self, node_input, instance_id, focus, origin, direction, duration=2.0):
+        """
+        Perform swipe action from the UI element by its ``_instanceId``, whose position is resolved by the sdk when
+        swiping. ``origin`` is the position of the UI element just selected, which is checked the same way as the
+        start point given to :py:meth:`swipe`.
+
+        Args:
+            node_input: input implementation supporting ``swipeNode``, e.g.
+             :py:class:`StdInput <poco.drivers.std.inputs.StdInput>`
+            instance_id: ``_instanceId`` of the UI element
+            focus: see :py:meth:`UIObjectProxy.click() <poco.proxy.UIObjectProxy.click>`
+            origin: position of the UI element
+            direction: swipe direction
+            duration (:obj:`float`): time interval in which the swipe action is performed
+
+        Returns:
+            False if the UI element does not exist any more
+
+        Raises:
+            InvalidOperationException: when the UI element lies outside of the screen
+        """
+
+        if not (0 <= origin[0] <= 1) or not (0 <= origin[1] <= 1):
+            raise InvalidOperationException('Swipe origin out of screen. {}'.format(repr(origin)))
+        return node_input.swipeNode(instance_id, focus, list(direction), duration)
+
     def long_click(self, pos, duration=2.0):
         """
         Similar to click but press the screen for the given time interval and then release
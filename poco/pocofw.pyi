@@ -1,6 +1,6 @@
 # coding=utf-8
 
-from typing import List, Union, NoReturn, Callable, Any, Text
+from typing import List, Union, NoReturn, Callable, Any, Text, ContextManager
 
 from .acceleration import PocoAccelerationMixin
 from .proxy import UIObjectProxy
@@ -65,6 +65,9 @@ class Poco(PocoAccelerationMixin):
     def get_screen_size(self) -> (float, float):
         ...
 
+    def input_batch(self, step_delay: float=0) -> ContextManager[None]:
+        ...
+
     def wait_stable(self):
         ...
 
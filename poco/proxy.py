@@ -110,6 +110,11 @@ class UIObjectProxy(object):
         self._nodes = None
         self._nodes_proxy_is_list = True
 
+        # stable handle of the single UI element this proxy represents, see `HierarchyInterface.handle`. once set, the
+        # UI element is re-resolved by the handle directly instead of evaluating the query again
+        # 通过__getitem__/__iter__得到的代理对象保存节点的句柄，重新查询时直接按句柄查找，不必重新执行整个query再取下标
+        self._handle = None
+
         # use only for caching some proxies of sorted nodes in `self.__getitem__`
         # 仅用于__getitem__时保存好已排序的child代理对象
         self._sorted_children = None
@@ -243,6 +248,7 @@ class UIObjectProxy(object):
                 uiobj._query_multiple = True
                 uiobj._nodes = nodes[i]
                 uiobj._nodes_proxy_is_list = False
+                uiobj._handle = self.poco.agent.hierarchy.handle(nodes[i])
                 pos = uiobj.get_position()
                 self._sorted_children.append((uiobj, pos))
 
@@ -263,10 +269,8 @@ class UIObjectProxy(object):
 
         # 获取长度时总是multiple的
         if not self._query_multiple:
-            try:
-                nodes = self._do_query(multiple=True, refresh=True)
-            except PocoNoSuchNodeException:
-                nodes = []
+            # 只计数，不需要选出所有节点
+            return self.poco.agent.hierarchy.count(self.query)
         else:
             nodes = self._nodes
         return len(nodes) if nodes else 0
@@ -300,6 +304,7 @@ class UIObjectProxy(object):
             uiobj._query_multiple = True
             uiobj._nodes = nodes[i]
             uiobj._nodes_proxy_is_list = False
+            uiobj._handle = self.poco.agent.hierarchy.handle(nodes[i])
             pos = uiobj.get_position()
             sorted_nodes.append((uiobj, pos))
         sorted_nodes.sort(key=lambda v: (v[1][1], v[1][0]))
@@ -329,9 +334,22 @@ class UIObjectProxy(object):
         """
 
         focus = focus or self._focus or 'center'
-        pos_in_percentage = self.get_position(focus)
-        self.poco.pre_action('click', self, pos_in_percentage)
-        ret = self.poco.click(pos_in_percentage)
+        node_input, instance_id = self._node_action_target('ClickNode')
+        if node_input is not None:
+            # the sdk resolves the position when clicking, the position of the selected node is only for the callbacks
+            with ReevaluationContext(self):
+                pos_in_percentage = self.get_position(focus)
+            self.poco.pre_action('click', self, pos_in_percentage)
+            ret = self.poco.click_node(node_input, instance_id, focus, pos_in_percentage)
+            if ret is False:
+                # node has gone, click the position of the node matching the query now
+                self.invalidate()
+                pos_in_percentage = self.get_position(focus)
+                ret = self.poco.click(pos_in_percentage)
+        else:
+            pos_in_percentage = self.get_position(focus)
+            self.poco.pre_action('click', self, pos_in_percentage)
+            ret = self.poco.click(pos_in_percentage)
         if sleep_interval:
             time.sleep(sleep_interval)
         else:
@@ -454,12 +472,42 @@ class UIObjectProxy(object):
 
         focus = focus or self._focus or 'center'
         dir_vec = self._direction_vector_of(direction)
-        origin = self.get_position(focus)
-        self.poco.pre_action('swipe', self, (origin, dir_vec))
-        ret = self.poco.swipe(origin, direction=dir_vec, duration=duration)
+        node_input, instance_id = self._node_action_target('SwipeNode')
+        if node_input is not None:
+            with ReevaluationContext(self):
+                origin = self.get_position(focus)
+            self.poco.pre_action('swipe', self, (origin, dir_vec))
+            ret = self.poco.swipe_node(node_input, instance_id, focus, origin, dir_vec, duration)
+            if ret is False:
+                self.invalidate()
+                origin = self.get_position(focus)
+                ret = self.poco.swipe(origin, direction=dir_vec, duration=duration)
+        else:
+            origin = self.get_position(focus)
+            self.poco.pre_action('swipe', self, (origin, dir_vec))
+            ret = self.poco.swipe(origin, direction=dir_vec, duration=duration)
         self.poco.post_action('swipe', self, (origin, dir_vec))
         return ret
 
+    def _node_action_target(self, action):
+        """
+        Find out whether the action can be addressed to the node instead of coordinates, i.e. the input implementation
+        supports it, the sdk advertises the capability and the node has an ``_instanceId``.
+
+        Returns:
+            2-:obj:`tuple`: (input, instance id), or (None, None) if the action should be performed by coordinates
+        """
+
+        node_input = self.poco.agent.input
+        has_capability = getattr(node_input, 'has_capability', None)
+        if has_capability is None or not has_capability(action):
+            return None, None
+        nodes = self._do_query(multiple=False)
+        instance_id = self.poco.agent.hierarchy.getAttr(nodes, '_instanceId')
+        if instance_id is None:
+            return None, None
+        return node_input, instance_id
+
     def drag_to(self, target, duration=2.0):
         """
         Similar to swipe action, but the end point is provide by a UI proxy or by fixed coordinates.
@@ -770,6 +818,10 @@ class UIObjectProxy(object):
             bool: True if exists otherwise False
         """
 
+        if not self._evaluated and self._handle is None:
+            # 尚未选择节点时，只需判断是否存在任一匹配的节点，不必选出节点再获取visible属性
+            return self.poco.agent.hierarchy.exists(self.query)
+
         try:
             return self.attr('visible')
         except (PocoTargetRemovedException, PocoNoSuchNodeException):
@@ -881,7 +933,14 @@ class UIObjectProxy(object):
 
     def _do_query(self, multiple=True, refresh=False):
         if not self._evaluated or refresh:
-            self._nodes = self.poco.agent.hierarchy.select(self.query, multiple)
+            self._nodes = None
+            if self._handle is not None:
+                self._nodes = self.poco.agent.hierarchy.resolve(self._handle)
+                if not self._nodes:
+                    # 句柄对应的节点已不存在，之后按query查找
+                    self._handle = None
+            if not self._nodes:
+                self._nodes = self.poco.agent.hierarchy.select(self.query, multiple)
             if not self._nodes or len(self._nodes) == 0:
                 # 找不到节点时，将当前节点状态重置，强制下一次访问时重新查询一次节点信息
                 self.invalidate()
@@ -4,7 +4,8 @@ import re
 from .exceptions import NoSuchComparatorException
 
 __author__ = 'lxn3032'
-__all__ = ['IMatcher', 'DefaultMatcher', 'EqualizationComparator', 'RegexpComparator']
+__all__ = ['IMatcher', 'DefaultMatcher', 'EqualizationComparator', 'RegexpComparator', 'InsideComparator',
+           'ContainsPointComparator', 'getBounds']
 
 
 class IMatcher(object):
@@ -53,6 +54,46 @@ class RegexpComparator(object):
         return re.match(pattern, origin) is not None
 
 
+def getBounds(node):
+    """
+    Get the bounding box of the node from its ``pos``, ``size`` and ``anchorPoint`` attributes.
+
+    Returns:
+        :obj:`tuple`: (x0, y0, x1, y1) in normalized coordinates, or None if the node does not provide the attributes
+    """
+
+    pos = node.getAttr('pos')
+    size = node.getAttr('size')
+    if not pos or not size:
+        return None
+    anchorPoint = node.getAttr('anchorPoint') or (0.5, 0.5)
+    x0 = pos[0] - size[0] * anchorPoint[0]
+    y0 = pos[1] - size[1] * anchorPoint[1]
+    return x0, y0, x0 + size[0], y0 + size[1]
+
+
+class InsideComparator(object):
+    """
+    Test whether the bounding box lies entirely inside the region (x0, y0, x1, y1).
+    """
+
+    def compare(self, bounds, region):
+        if bounds is None:
+            return False
+        return region[0] <= bounds[0] and region[1] <= bounds[1] and bounds[2] <= region[2] and bounds[3] <= region[3]
+
+
+class ContainsPointComparator(object):
+    """
+    Test whether the bounding box contains the point (x, y).
+    """
+
+    def compare(self, bounds, point):
+        if bounds is None:
+            return False
+        return bounds[0] <= point[0] <= bounds[2] and bounds[1] <= point[1] <= bounds[3]
+
+
 class DefaultMatcher(IMatcher):
     """
     Default matcher implementation for poco hierarchy traversing. Including logical query condition and predicate
@@ -69,10 +110,19 @@ class DefaultMatcher(IMatcher):
 
         op1 := 'attr='
         op1 := 'attr.*='
+        op1 := 'spatial'
         op1 := ... (other customized)
 
       - ``attr=`` corresponds to :py:class:`EqualizationComparator <poco.sdk.DefaultMatcher.EqualizationComparator>`.
       - ``attr.*=`` corresponds to :py:class:`RegexpComparator <poco.sdk.DefaultMatcher.RegexpComparator>`.
+      - ``spatial`` tests the bounding box of the node (see :py:func:`getBounds`), ``arg1`` can be one of as follows:
+
+        - ``inside``: ``arg2`` is the region (x0, y0, x1, y1), see
+          :py:class:`InsideComparator <poco.sdk.DefaultMatcher.InsideComparator>`.
+        - ``containsPoint``: ``arg2`` is the point (x, y), see
+          :py:class:`ContainsPointComparator <poco.sdk.DefaultMatcher.ContainsPointComparator>`.
+        - ``nearest``: ``arg2`` is the point (x, y). Every node matches, the
+          :py:class:`Selector <poco.sdk.Selector.Selector>` selects the one whose center is nearest to the point.
       
       The ``op1`` must be a string. The ``Matcher`` will help to map to ``Comparator`` object.
     """
@@ -83,6 +133,10 @@ class DefaultMatcher(IMatcher):
             'attr=': EqualizationComparator(),
             'attr.*=': RegexpComparator(),
         }
+        self.spatialComparators = {
+            'inside': InsideComparator(),
+            'containsPoint': ContainsPointComparator(),
+        }
 
     def match(self, cond, node):
         """
@@ -104,6 +158,17 @@ class DefaultMatcher(IMatcher):
                     return True
             return False
 
+        # 包围盒匹配
+        if op == 'spatial':
+            kind, value = args
+            if kind == 'nearest':
+                # 由Selector从所有匹配的节点中选出最近的一个
+                return True
+            comparator = self.spatialComparators.get(kind)
+            if comparator:
+                return comparator.compare(getBounds(node), value)
+            raise NoSuchComparatorException(kind, 'poco.sdk.DefaultMatcher')
+
         # 属性匹配
         comparator = self.comparators.get(op)
         if comparator:
@@ -0,0 +1,67 @@
+# coding=utf-8
+
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+__all__ = ['LocatorHints']
+
+
+class LocatorHints(object):
+    """
+    Remembers the child-index path from the root where each query expression last matched, so that the
+    :py:class:`Selector <poco.sdk.Selector.Selector>` can probe the path first instead of traversing the whole
+    hierarchy. The probed node is always verified by the matcher, so a stale hint only costs the probe.
+
+    Hints apply only to selections of a single UI element by a plain condition (no path operators). The probed node is
+    returned even if another matched node precedes it in the traversal order, so enable the hints for the queries
+    that identify a UI element uniquely.
+
+    Examples:
+        ::
+
+            hints = LocatorHints('locator_hints.json')  # loads the hints of the previous run if any
+            selector = Selector(dumper, hints=hints)
+            ...
+            hints.save()
+
+    Args:
+        filename (:obj:`str`): json file to load the hints from and to save them to, or None to keep them in memory
+        max_size (:obj:`int`): max number of hints to keep, the earliest added ones are dropped first
+    """
+
+    def __init__(self, filename=None, max_size=10000):
+        super(LocatorHints, self).__init__()
+        self.filename = filename
+        self.max_size = max_size
+        self.paths = OrderedDict()  # key of query expression -> list of child indexes
+        self.lock = threading.Lock()
+        if filename and os.path.exists(filename):
+            self.load()
+
+    @staticmethod
+    def key(cond):
+        return json.dumps(cond, sort_keys=True)
+
+    def get(self, cond):
+        return self.paths.get(self.key(cond))
+
+    def set(self, cond, path):
+        with self.lock:
+            self.paths[self.key(cond)] = list(path)
+            while len(self.paths) > self.max_size:
+                self.paths.popitem(last=False)
+
+    def load(self, filename=None):
+        with io.open(filename or self.filename, 'r', encoding='utf-8') as f:
+            paths = json.load(f, object_pairs_hook=OrderedDict)
+        with self.lock:
+            self.paths.update(paths)
+
+    def save(self, filename=None):
+        with self.lock:
+            data = json.dumps(self.paths)
+        with io.open(filename or self.filename, 'w', encoding='utf-8') as f:
+            f.write(data if isinstance(data, type(u'')) else data.decode('utf-8'))
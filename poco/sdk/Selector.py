@@ -1,10 +1,27 @@
 # coding=utf-8
-from .DefaultMatcher import DefaultMatcher
+import itertools
+
+from .DefaultMatcher import DefaultMatcher, getBounds
 from .exceptions import NoSuchTargetException
 
 __author__ = 'lxn3032'
 __all__ = ['ISelector', 'Selector']
 
+# operators of the query expressions handled by the selector, the others are passed to the matcher
+_OPERATORS = ('>', '/', '-', 'index', '^')
+
+
+def _getSpatialArg(cond, kind):
+    # value of the spatial predicate of the given kind in the top level of the condition, or None
+    op, args = cond
+    if op == 'spatial':
+        return args[1] if args[0] == kind else None
+    if op == 'and':
+        for arg in args:
+            if arg[0] == 'spatial' and arg[1][0] == kind:
+                return arg[1][1]
+    return None
+
 
 class ISelector(object):
     """
@@ -50,15 +67,37 @@ class Selector(ISelector):
 
     - ``others``: passes the expression to matcher
 
+    Spatial predicates (see :py:class:`DefaultMatcher <poco.sdk.DefaultMatcher.DefaultMatcher>`) also prune the
+    traversal. The subtree of a node is skipped if the bounding box of the node does not intersect the region given by
+    ``inside`` or does not contain the point given by ``containsPoint``, assuming children lie within the bounds of
+    their parent. Nodes of zero width or height never prune. Set ``pruneByBounds`` to False for engines whose children
+    may overflow their parent. ``nearest`` selects the matched node whose center is the nearest to the given point.
+
+    Chained path expressions such as ``('/', (('/', (expr0, expr1)), expr2))`` built by chained proxies are flattened
+    into ``('/', (expr0, expr1, expr2))`` before evaluation, see :py:meth:`plan`.
+
     Args:
         dumper (any implementation of :py:class:`IDumper <poco.sdk.AbstractDumper.IDumper>`):  dumper for the selector
         matcher (any implementation of :py:class:`IMatcher <poco.sdk.DefaultMatcher.IMatcher>`): :py:class:`DefaultMatcher
          <poco.sdk.DefaultMatcher.DefaultMatcher>` instance by default.
+        memoize (:obj:`bool`): whether to remember the nodes selected by each path prefix as long as the dumper returns
+         the same root node, so that queries sharing the same anchor (e.g. ``panel.child('a')`` and
+         ``panel.child('b')``) find the anchor only once. Enable it only if the dumper returns a new root node whenever
+         the hierarchy changes, e.g. a snapshot of the hierarchy.
+        hints (:py:class:`LocatorHints <poco.sdk.LocatorHints.LocatorHints>`): where the queries last matched, probed
+         first when selecting a single node by a plain condition. None by default
     """
 
-    def __init__(self, dumper, matcher=None):
+    pruneByBounds = True
+
+    def __init__(self, dumper, matcher=None, memoize=False, hints=None):
         self.dumper = dumper
         self.matcher = matcher or DefaultMatcher()
+        self.memoize = memoize
+        self.hints = hints
+        self._memoRoot = None
+        self._memo = {}
+        self._regionsCache = (None, [])  # (cond, regions of the spatial predicates of cond)
 
     def getRoot(self):
         """
@@ -70,11 +109,245 @@ class Selector(ISelector):
 
         return self.dumper.getRoot()
 
+    @staticmethod
+    def plan(cond):
+        """
+        Rewrite the query expression into an equivalent one that is cheaper to evaluate. Nested path expressions of
+        the same operator are flattened, e.g. ``('>', (('>', (expr0, expr1)), expr2))`` into
+        ``('>', (expr0, expr1, expr2))``, so that each step is evaluated once and shared prefixes can be memoized.
+
+        Args:
+            cond (:obj:`tuple`): query expression
+
+        Returns:
+            :obj:`tuple`: query expression
+        """
+
+        op, args = cond
+        if op in ('>', '/'):
+            flattened = []
+            for index, arg in enumerate(args):
+                arg = Selector.plan(arg)
+                if index == 0 and arg[0] == op:
+                    flattened.extend(arg[1])
+                else:
+                    flattened.append(arg)
+            return op, tuple(flattened)
+        elif op == '-':
+            return op, (Selector.plan(args[0]), Selector.plan(args[1]))
+        elif op in ('index', '^'):
+            return op, (Selector.plan(args[0]), args[1])
+        return cond
+
+    def _getRootForQuery(self):
+        root = self.getRoot()
+        if self.memoize and root is not self._memoRoot:
+            # a new snapshot, forget everything selected from the previous one
+            self._memoRoot = root
+            self._memo = {}
+        return root
+
+    def _getMemo(self, root, key):
+        # memoize only the selections from the root of the snapshot, the key must be hashable
+        if not self.memoize or root is not self._memoRoot:
+            return None
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return self._memo
+
     def select(self, cond, multiple=False):
         """
         See Also: :py:meth:`select <poco.sdk.Selector.ISelector.select>` method in ``ISelector``.
         """
-        return self.selectImpl(cond, multiple, self.getRoot(), 9999, True, True)
+        cond = self.plan(cond)
+        root = self._getRootForQuery()
+        if not multiple and self._hintable(cond):
+            return self._selectByHint(cond, root)
+        return self.selectImpl(cond, multiple, root, 9999, True, True)
+
+    def count(self, cond):
+        """
+        Count the nodes matching the query expression without collecting them.
+
+        Returns:
+            :obj:`int`: the same as ``len(select(cond, True))``, or 0 if the query indexes out of the results
+        """
+
+        return self.countImpl(self.plan(cond), self._getRootForQuery(), 9999, True, True)
+
+    def exists(self, cond):
+        """
+        Test whether any node matches the query expression. The traversal terminates at the first matched node.
+
+        Returns:
+            :obj:`bool`: the same as ``len(select(cond, False)) > 0``
+        """
+
+        cond = self.plan(cond)
+        root = self._getRootForQuery()
+        if self._hintable(cond):
+            return len(self._selectByHint(cond, root)) > 0
+        return self.existsImpl(cond, root, 9999, True, True)
+
+    @staticmethod
+    def _isPlainStep(cond):
+        # a condition passed to the matcher whose matched nodes are all selected
+        return cond[0] not in _OPERATORS and _getSpatialArg(cond, 'nearest') is None
+
+    def _hintable(self, cond):
+        return self.hints is not None and self._isPlainStep(cond)
+
+    def _getRegions(self, cond):
+        cachedCond, regions = self._regionsCache
+        if cond is not cachedCond:
+            regions = []
+            inside = _getSpatialArg(cond, 'inside')
+            if inside is not None:
+                regions.append(tuple(inside))
+            point = _getSpatialArg(cond, 'containsPoint')
+            if point is not None:
+                regions.append((point[0], point[1], point[0], point[1]))
+            self._regionsCache = (cond, regions)
+        return regions
+
+    def _outOfRegion(self, cond, node):
+        # whether the subtree of the node cannot intersect the regions of the spatial predicates
+        if not self.pruneByBounds:
+            return False
+        regions = self._getRegions(cond)
+        if not regions:
+            return False
+        bounds = getBounds(node)
+        if bounds is None or bounds[2] <= bounds[0] or bounds[3] <= bounds[1]:
+            return False
+        for x0, y0, x1, y1 in regions:
+            if bounds[2] < x0 or x1 < bounds[0] or bounds[3] < y0 or y1 < bounds[1]:
+                return True
+        return False
+
+    @staticmethod
+    def _selectNearest(nodes, point):
+        nearest, nearestDistance = None, None
+        for node in nodes:
+            bounds = getBounds(node)
+            if bounds is None:
+                continue
+            dx = (bounds[0] + bounds[2]) / 2.0 - point[0]
+            dy = (bounds[1] + bounds[3]) / 2.0 - point[1]
+            distance = dx * dx + dy * dy
+            if nearestDistance is None or distance < nearestDistance:
+                nearest, nearestDistance = node, distance
+        return [nearest] if nearest is not None else []
+
+    def _selectByHint(self, cond, root):
+        try:
+            path = self.hints.get(cond)
+        except TypeError:
+            # not json serializable
+            return self.selectImpl(cond, False, root, 9999, True, True)
+
+        if path is not None:
+            node = self._probePath(cond, root, path, True)
+            if node is not None:
+                return [node]
+
+        path = []
+        node = self._selectFirstTraverse(cond, root, path, 9999, True, True)
+        if node is None:
+            return []
+        self.hints.set(cond, path)
+        return [node]
+
+    def _probePath(self, cond, root, path, onlyVisibleNode):
+        # walk down the child indexes, O(depth). the nodes on the path must be visible just like in _selectTraverse
+        node = root
+        if not node or (onlyVisibleNode and not node.getAttr('visible')):
+            return None
+        for index in path:
+            node = next(itertools.islice(node.getChildren(), index, None), None)
+            if node is None or (onlyVisibleNode and not node.getAttr('visible')):
+                return None
+        if self.matcher.match(cond, node):
+            return node
+        return None
+
+    def _selectFirstTraverse(self, cond, node, path, maxDepth, onlyVisibleNode, includeRoot):
+        # the same traversal as _selectTraverse with multiple=False, also records the child indexes to the node
+        if not node or (onlyVisibleNode and not node.getAttr('visible')) or self._outOfRegion(cond, node):
+            return None
+
+        if includeRoot and self.matcher.match(cond, node):
+            return node
+
+        if maxDepth == 0:
+            return None
+        maxDepth -= 1
+
+        for index, child in enumerate(node.getChildren()):
+            path.append(index)
+            found = self._selectFirstTraverse(cond, child, path, maxDepth, onlyVisibleNode, True)
+            if found is not None:
+                return found
+            path.pop()
+
+        return None
+
+    def countImpl(self, cond, root, maxDepth, onlyVisibleNode, includeRoot):
+        """
+        See :py:meth:`selectImpl <poco.sdk.Selector.Selector.selectImpl>` for the arguments.
+        """
+
+        if not root:
+            return 0
+
+        op, args = cond
+        if op == '/' and len(args) > 1 and self._isPlainStep(args[-1]):
+            # children of distinct parents are distinct, so count them under each parent without collecting
+            try:
+                parents = self.selectImpl((op, args[:-1]), True, root, maxDepth, onlyVisibleNode, includeRoot)
+            except NoSuchTargetException:
+                return 0
+            return sum(self._countTraverse(args[-1], parent, 1, onlyVisibleNode, False) for parent in parents)
+        elif op in _OPERATORS or _getSpatialArg(cond, 'nearest') is not None:
+            # nearest is reduced to one node per anchor, only the selection knows which ones
+            try:
+                return len(self.selectImpl(cond, True, root, maxDepth, onlyVisibleNode, includeRoot))
+            except NoSuchTargetException:
+                return 0
+        else:
+            return self._countTraverse(cond, root, maxDepth, onlyVisibleNode, includeRoot)
+
+    def existsImpl(self, cond, root, maxDepth, onlyVisibleNode, includeRoot):
+        """
+        See :py:meth:`selectImpl <poco.sdk.Selector.Selector.selectImpl>` for the arguments.
+        """
+
+        if not root:
+            return False
+
+        op, args = cond
+        if op in ('>', '/') and len(args) > 1 and self._isPlainStep(args[-1]):
+            # stop at the first parent having any matched child/offspring
+            try:
+                parents = self.selectImpl((op, args[:-1]), True, root, maxDepth, onlyVisibleNode, includeRoot)
+            except NoSuchTargetException:
+                return False
+            _maxDepth = 1 if op == '/' else maxDepth
+            for parent in parents:
+                if self.existsImpl(args[-1], parent, _maxDepth, onlyVisibleNode, False):
+                    return True
+            return False
+        elif op in _OPERATORS or _getSpatialArg(cond, 'nearest') is not None:
+            try:
+                return len(self.selectImpl(cond, False, root, maxDepth, onlyVisibleNode, includeRoot)) > 0
+            except NoSuchTargetException:
+                return False
+        else:
+            result = []
+            self._selectTraverse(cond, root, result, False, maxDepth, onlyVisibleNode, includeRoot)
+            return len(result) > 0
 
     def selectImpl(self, cond, multiple, root, maxDepth, onlyVisibleNode, includeRoot):
         """
@@ -110,8 +383,19 @@ class Selector(ISelector):
             # children or offsprings
             # 父子直系相对节点选择
             parents = [root]
-            for index, arg in enumerate(args):
+            start = 0
+            prefixKeys = [((op, tuple(args[:index + 1])), maxDepth, onlyVisibleNode) for index in range(len(args))]
+            memo = self._getMemo(root, prefixKeys[-1])
+            if memo is not None:
+                # 从已经选择过的最长路径前缀继续
+                for index in range(len(args) - 1, -1, -1):
+                    if prefixKeys[index] in memo:
+                        parents, start = memo[prefixKeys[index]], index + 1
+                        break
+            for index in range(start, len(args)):
+                arg = args[index]
                 midResult = []
+                seen = _NodeSet()
                 for parent in parents:
                     if op == '/' and index != 0:
                         _maxDepth = 1
@@ -119,17 +403,20 @@ class Selector(ISelector):
                         _maxDepth = maxDepth
                     # 按路径进行遍历一定要multiple为true才不会漏掉
                     _res = self.selectImpl(arg, True, parent, _maxDepth, onlyVisibleNode, False)
-                    [midResult.append(r) for r in _res if r not in midResult]
+                    [midResult.append(r) for r in _res if seen.add(r)]
                 parents = midResult
-            result = parents
+                if memo is not None:
+                    memo[prefixKeys[index]] = parents
+            result = list(parents)
         elif op == '-':
             # sibling
             # 兄弟节点选择
             query1, query2 = args
             result1 = self.selectImpl(query1, multiple, root, maxDepth, onlyVisibleNode, includeRoot)
+            seen = _NodeSet()
             for n in result1:
                 sibling_result = self.selectImpl(query2, multiple, n.getParent(), 1, onlyVisibleNode, includeRoot)
-                [result.append(r) for r in sibling_result if r not in result]
+                [result.append(r) for r in sibling_result if seen.add(r)]
         elif op == 'index':
             cond, i = args
             try:
@@ -148,7 +435,20 @@ class Selector(ISelector):
                 if parent_node is not None:
                     result = [parent_node]
         else:
-            self._selectTraverse(cond, root, result, multiple, maxDepth, onlyVisibleNode, includeRoot)
+            nearest = _getSpatialArg(cond, 'nearest')
+            if nearest is not None:
+                # 所有匹配的节点都是候选
+                multiple = True
+            key = (cond, maxDepth, onlyVisibleNode, includeRoot)
+            memo = self._getMemo(root, key) if multiple else None
+            if memo is not None and key in memo:
+                result = list(memo[key])
+            else:
+                self._selectTraverse(cond, root, result, multiple, maxDepth, onlyVisibleNode, includeRoot)
+                if memo is not None:
+                    memo[key] = list(result)
+            if nearest is not None:
+                result = self._selectNearest(result, nearest)
 
         return result
 
@@ -157,14 +457,17 @@ class Selector(ISelector):
         # 剪掉不可见节点branch
         if onlyVisibleNode and not node.getAttr('visible'):
             return False
+        # 剪掉包围盒不在区域内的branch
+        if self._outOfRegion(cond, node):
+            return False
 
         if self.matcher.match(cond, node):
             # To select node from parent or ancestor, the parent or ancestor are excluded.
             # 父子/祖先后代节点选择时，默认是不包含父节点/祖先节点的
             # 在下面的children循环中则需要包含，因为每个child在_selectTraverse中就当做是root
             if includeRoot:
-                if node not in outResult:
-                    outResult.append(node)
+                # each node is visited only once in one traversal, no need to check for duplicates
+                outResult.append(node)
                 if not multiple:
                     return True
 
@@ -180,3 +483,50 @@ class Selector(ISelector):
                 return True
 
         return False
+
+    def _countTraverse(self, cond, node, maxDepth, onlyVisibleNode, includeRoot):
+        # the same traversal as _selectTraverse with multiple=True, but nothing is collected
+        if onlyVisibleNode and not node.getAttr('visible'):
+            return 0
+        if self._outOfRegion(cond, node):
+            return 0
+
+        count = 0
+        if includeRoot and self.matcher.match(cond, node):
+            count += 1
+
+        if maxDepth == 0:
+            return count
+        maxDepth -= 1
+
+        for child in node.getChildren():
+            count += self._countTraverse(cond, child, maxDepth, onlyVisibleNode, True)
+
+        return count
+
+
+class _NodeSet(object):
+    """
+    Set of the selected nodes for removing duplicates from the results. Falls back to a list for the nodes that are not
+    hashable.
+    """
+
+    def __init__(self):
+        self.hashable = set()
+        self.unhashable = []
+
+    def add(self, node):
+        """
+        Returns:
+            :obj:`bool`: True if the node is newly added
+        """
+
+        try:
+            if node in self.hashable:
+                return False
+            self.hashable.add(node)
+        except TypeError:
+            if node in self.unhashable:
+                return False
+            self.unhashable.append(node)
+        return True
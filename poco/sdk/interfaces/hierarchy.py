@@ -1,5 +1,7 @@
 # coding=utf-8
 
+from poco.sdk.exceptions import NoSuchTargetException
+
 
 class HierarchyInterface(object):
     """
@@ -25,6 +27,67 @@ class HierarchyInterface(object):
 
         raise NotImplementedError
 
+    def count(self, query):
+        """
+        Count the UI elements matching the given query expression. Implementations are expected to count without
+        selecting the UI elements, the default one selects them all.
+
+        Args:
+            query (:obj:`tuple`): query expression
+
+        Returns:
+            :obj:`int`: number of the matched UI elements
+        """
+
+        try:
+            return len(self.select(query, True) or [])
+        except NoSuchTargetException:
+            return 0
+
+    def exists(self, query):
+        """
+        Test whether any UI element matches the given query expression. Implementations are expected to terminate at
+        the first matched UI element without retrieving any attribute, the default one selects the first one.
+
+        Args:
+            query (:obj:`tuple`): query expression
+
+        Returns:
+            :obj:`bool`: True if exists otherwise False
+        """
+
+        try:
+            return len(self.select(query, False) or []) > 0
+        except NoSuchTargetException:
+            return False
+
+    def handle(self, node):
+        """
+        Get a stable handle of the selected UI element, by which the UI element can be found again directly without
+        evaluating its query expression, e.g. the ``_instanceId`` attribute or the remote node reference.
+
+        Args:
+            node: UI element returned by :py:meth:`select`
+
+        Returns:
+            handle of the UI element, or None if the UI element has no stable handle
+        """
+
+        return None
+
+    def resolve(self, handle):
+        """
+        Find the UI element again by the handle got from :py:meth:`handle`.
+
+        Args:
+            handle: handle of the UI element
+
+        Returns:
+            :obj:`list`: list of the UI element, or an empty list if it does not exist any more
+        """
+
+        return []
+
     def dump(self):
         """
         Get the UI hierarchy with its origin structure and attributes, then store the structure and attributes  into
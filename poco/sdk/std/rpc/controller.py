@@ -1,9 +1,8 @@
 # coding=utf-8
 
-import json
-import time
+import threading
 
-from poco.utils import six
+from poco.utils import jsoncodec
 
 
 class RpcRemoteException(Exception):
@@ -16,39 +15,58 @@ class StdRpcEndpointController(object):
         self.transport = transport
         self.reactor = reactor
 
+        # notified by the serving thread whenever a response packet arrives, so that `call` can block instead of polling
+        self.response_arrived = threading.Condition()
+
+        # responses may be sent from reactor worker threads, keep packets from interleaving on the wire
+        self.send_lock = threading.Lock()
+
     def deserialize(self, data):
-        if six.PY3 and not isinstance(data, six.text_type):
-            data = data.decode('utf-8')
-        return json.loads(data)
+        return jsoncodec.loads(data)
 
     def serialize(self, packet):
-        return json.dumps(packet)
+        return jsoncodec.dumps(packet)
+
+    def update(self, timeout=None):
+        """
+        Process at most one incoming packet. Blocks in the transport for at most ``timeout`` seconds (forever if None)
+        until a packet is readable.
+        """
+
+        cid, data = self.transport.update(timeout)
+        if data:
+            packet = self.deserialize(data)
+            if 'method' in packet:
+                self.reactor.dispatch_request(packet, lambda result: self.send(cid, result))
+            else:
+                with self.response_arrived:
+                    self.reactor.handle_response(packet)
+                    self.response_arrived.notify_all()
+
+    def send(self, cid, packet):
+        sdata = self.serialize(packet)
+        with self.send_lock:
+            self.transport.send(cid, sdata)
 
     def serve_forever(self):
         while True:
-            cid, data = self.transport.update()
-            if data:
-                packet = self.deserialize(data)
-                if 'method' in packet:
-                    result = self.reactor.handle_request(packet)
-                    sres = self.serialize(result)
-                    self.transport.send(cid, sres)
-                else:
-                    self.reactor.handle_response(packet)
+            self.update()
 
     def call(self, method, *args, **kwargs):
         req = self.reactor.build_request(method, *args, **kwargs)
         rid = req['id']
-        sreq = self.serialize(req)
-        self.transport.send(None, sreq)
-        while True:
-            time.sleep(0.004)
+        self.send(None, req)
+        with self.response_arrived:
             res = self.reactor.get_result(rid)
-            if res is not None:
-                if 'result' in res:
-                    return res['result']
+            while res is None:
+                self.response_arrived.wait()
+                res = self.reactor.get_result(rid)
+            self.reactor.pop_result(rid)
+
+        if 'result' in res:
+            return res['result']
 
-                if 'error' in res:
-                    raise RpcRemoteException(res['error']['message'])
+        if 'error' in res:
+            raise RpcRemoteException(res['error']['message'])
 
-                raise RuntimeError('Invalid response from {}. Got {}'.format(self.transport, res))
\ No newline at end of file
+        raise RuntimeError('Invalid response from {}. Got {}'.format(self.transport, res))
@@ -0,0 +1,82 @@
+# coding=utf-8
+
+__all__ = ['NodeActions']
+
+
+class NodeActions(object):
+    """
+    Reference implementation of the node-targeted actions ``ClickNode`` and ``SwipeNode`` of the std protocol. The node
+    is found by its ``_instanceId`` and its position is resolved when the action is executed, then the action is
+    performed by the ``Click``/``Swipe`` methods already registered on the reactor.
+
+    Examples:
+        ::
+
+            reactor = StdRpcReactor()
+            reactor.register('Click', ...)
+            reactor.register('Swipe', ...)
+            NodeActions(reactor, lambda: MyDumper(root)).register()
+            reactor.enable_capabilities()
+
+    Args:
+        reactor (:py:class:`StdRpcReactor <poco.sdk.std.rpc.reactor.StdRpcReactor>`): reactor to register on
+        dumper_factory: callable returning an :py:class:`AbstractDumper <poco.sdk.AbstractDumper.AbstractDumper>` of
+         the current hierarchy
+    """
+
+    def __init__(self, reactor, dumper_factory):
+        super(NodeActions, self).__init__()
+        self.reactor = reactor
+        self.dumper_factory = dumper_factory
+
+    def register(self):
+        self.reactor.register('ClickNode', self.ClickNode)
+        self.reactor.register('SwipeNode', self.SwipeNode)
+
+    def find(self, instance_id):
+        stack = [self.dumper_factory().getRoot()]
+        while stack:
+            node = stack.pop()
+            if node.getAttr('_instanceId') == instance_id:
+                return node
+            stack.extend(node.getChildren())
+        return None
+
+    @staticmethod
+    def position(node, focus):
+        x, y = node.getAttr('pos')
+        if focus == 'anchor':
+            return x, y
+        if focus == 'center':
+            fx, fy = 0.5, 0.5
+        else:
+            fx, fy = focus
+        w, h = node.getAttr('size')
+        ap_x, ap_y = node.getAttr('anchorPoint')
+        return x + w * (fx - ap_x), y + h * (fy - ap_y)
+
+    def ClickNode(self, instance_id, focus='center'):
+        """
+        Returns:
+            :obj:`bool`: False if the node does not exist any more
+        """
+
+        node = self.find(instance_id)
+        if node is None:
+            return False
+        x, y = self.position(node, focus)
+        self.reactor.dispatch('Click', x, y)
+        return True
+
+    def SwipeNode(self, instance_id, focus, direction, duration):
+        """
+        Returns:
+            :obj:`bool`: False if the node does not exist any more
+        """
+
+        node = self.find(instance_id)
+        if node is None:
+            return False
+        x, y = self.position(node, focus)
+        self.reactor.dispatch('Swipe', x, y, x + direction[0], y + direction[1], duration)
+        return True
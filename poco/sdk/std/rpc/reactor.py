@@ -1,9 +1,17 @@
 # coding=utf-8
+import threading
+import time
 import traceback
 import uuid
 
 from poco.utils import six
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    # python 2 without the futures backport. requests are always dispatched inline
+    ThreadPoolExecutor = None
+
 
 class NoSuchMethod(Exception):
     def __init__(self, name, available_methods):
@@ -12,10 +20,43 @@ class NoSuchMethod(Exception):
 
 
 class StdRpcReactor(object):
-    def __init__(self):
+    """
+    Args:
+        max_workers (:obj:`int`): size of the worker pool requests are dispatched to by :py:meth:`dispatch_request`.
+         0 by default, which means requests run inline on the thread that received them. The worker pool and the
+         lanes require ``concurrent.futures``, without which requests always run inline.
+    """
+
+    def __init__(self, max_workers=0):
         super(StdRpcReactor, self).__init__()
         self.slots = {}  # method name -> method
         self.pending_response = {}  # rid -> result
+        self.max_workers = max_workers
+        self.pool = None  # shared worker pool, created on first use
+        self.lanes = {}  # method name -> executor limiting the concurrency of that method
+        self._local = threading.local()  # lane or worker pool of the current thread
+
+    def set_concurrency_limit(self, names, limit):
+        """
+        Let the given methods share one lane that runs at most ``limit`` requests at a time, in arrival order. e.g.
+        ``set_concurrency_limit(['Click', 'Swipe', 'KeyEvent'], 1)`` serializes input injection while Dump or
+        Screenshot still run in parallel on the worker pool.
+
+        Args:
+            names (:obj:`str` or :obj:`list`): method name(s)
+            limit (:obj:`int`): max number of requests of these methods running concurrently
+        """
+
+        if isinstance(names, six.string_types):
+            names = [names]
+        if limit < 1:
+            raise ValueError('Argument `limit` should be a positive integer. Got {}'.format(repr(limit)))
+        if ThreadPoolExecutor is None:
+            # inline dispatch runs one request at a time, which satisfies any limit
+            return
+        lane = ThreadPoolExecutor(max_workers=limit)
+        for name in names:
+            self.lanes[name] = lane
 
     def register(self, name, method):
         if not callable(method):
@@ -25,6 +66,49 @@ class StdRpcReactor(object):
 
         self.slots[name] = method
 
+    def enable_capabilities(self, name='GetCapabilities'):
+        """
+        Register the ``GetCapabilities`` method, which returns the names of all registered methods so that the client
+        can tell the optional methods (e.g. ``ClickNode``) are available. Call it after everything else is registered.
+        """
+
+        self.register(name, self.get_capabilities)
+
+    def get_capabilities(self):
+        return sorted(self.slots.keys())
+
+    def enable_batch_input(self, name='BatchInput'):
+        """
+        Register the ``BatchInput`` method, which executes the given input steps in order with the methods already
+        registered. Each step is ``{"method": name, "params": [...], "delay": seconds to wait afterwards}``.
+        """
+
+        self.register(name, self.batch_input)
+
+    def batch_input(self, steps):
+        results = []
+        for step in steps:
+            results.append(self.dispatch_on_lane(step['method'], *step.get('params', [])))
+            delay = step.get('delay')
+            if delay:
+                time.sleep(delay)
+        return results
+
+    def dispatch_on_lane(self, name, *args):
+        """
+        Dispatch on the lane of the method if it has one and wait for the result, so that the method never runs
+        concurrently with the requests of its lane. Dispatched inline when already running on that lane.
+        """
+
+        lane = self.lanes.get(name)
+        if lane is None or getattr(self._local, 'lane', None) is lane:
+            return self.dispatch(name, *args)
+        return lane.submit(self._dispatch_on, lane, name, args).result()
+
+    def _dispatch_on(self, lane, name, args):
+        self._local.lane = lane
+        return self.dispatch(name, *args)
+
     def dispatch(self, name, *args, **kwargs):
         method = self.slots.get(name)
         if not method:
@@ -51,9 +135,35 @@ class StdRpcReactor(object):
 
         return ret
 
+    def dispatch_request(self, req, on_complete):
+        """
+        Handle the request on its lane or on the worker pool if configured, otherwise inline. ``on_complete`` is
+        invoked with the response packet as soon as the request finishes, so responses may be sent in a different
+        order than the requests arrived.
+        """
+
+        executor = self.lanes.get(req.get('method'))
+        if executor is None and self.max_workers > 0 and ThreadPoolExecutor is not None:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            executor = self.pool
+
+        if executor is None:
+            on_complete(self.handle_request(req))
+        else:
+            executor.submit(self._handle_request_async, executor, req, on_complete)
+
+    def _handle_request_async(self, executor, req, on_complete):
+        self._local.lane = executor
+        try:
+            on_complete(self.handle_request(req))
+        except Exception:
+            traceback.print_exc()
+
     def handle_response(self, res):
         id = res['id']
-        self.pending_response[id] = res
+        if id in self.pending_response:
+            self.pending_response[id] = res
 
     def build_request(self, method, *args, **kwargs):
         rid = six.text_type(uuid.uuid4())
@@ -68,3 +178,6 @@ class StdRpcReactor(object):
 
     def get_result(self, rid):
         return self.pending_response.get(rid)
+
+    def pop_result(self, rid):
+        return self.pending_response.pop(rid, None)
@@ -0,0 +1,98 @@
+# coding=utf-8
+
+from poco.sdk.Selector import Selector
+from poco.sdk.exceptions import NoSuchTargetException
+
+__all__ = ['RemoteSelector']
+
+
+class RemoteSelector(object):
+    """
+    Reference implementation of the ``Select``, ``Count`` and ``Exists`` methods of the std protocol. The query is
+    evaluated by :py:class:`Selector <poco.sdk.Selector.Selector>` inside the sdk and only the matched nodes are
+    returned, so that the client does not need to transfer the whole hierarchy to find a few nodes.
+
+    Each matched node is returned in the same structure as a node of ``Dump`` but without children. The payload
+    holds only the requested attributes plus ``_instanceId``, or all attributes if none is requested.
+
+    Examples:
+        ::
+
+            reactor = StdRpcReactor()
+            RemoteSelector(reactor, lambda: MyDumper(root)).register()
+            reactor.enable_capabilities()
+
+    Args:
+        reactor (:py:class:`StdRpcReactor <poco.sdk.std.rpc.reactor.StdRpcReactor>`): reactor to register on
+        dumper_factory: callable returning an :py:class:`AbstractDumper <poco.sdk.AbstractDumper.AbstractDumper>` of
+         the current hierarchy
+        matcher: matcher for the selector, :py:class:`DefaultMatcher <poco.sdk.DefaultMatcher.DefaultMatcher>` by
+         default
+        hints (:py:class:`LocatorHints <poco.sdk.LocatorHints.LocatorHints>`): locator hints shared by all selections,
+         None by default
+    """
+
+    def __init__(self, reactor, dumper_factory, matcher=None, hints=None):
+        super(RemoteSelector, self).__init__()
+        self.reactor = reactor
+        self.dumper_factory = dumper_factory
+        self.matcher = matcher
+        self.hints = hints
+
+    def register(self):
+        self.reactor.register('Select', self.Select)
+        self.reactor.register('Count', self.Count)
+        self.reactor.register('Exists', self.Exists)
+
+    def _selector(self):
+        return Selector(self.dumper_factory(), self.matcher, hints=self.hints)
+
+    def Select(self, query, multiple=False, attrs=None):
+        """
+        Args:
+            query (:obj:`list`): query expression, see :py:class:`Selector <poco.sdk.Selector.Selector>`
+            multiple (:obj:`bool`): whether to select all matched nodes or only the first one
+            attrs (:obj:`list`): names of the attributes to return, None for all
+
+        Returns:
+            :obj:`list`: matched nodes, or None if the query indexes out of the results
+        """
+
+        try:
+            nodes = self._selector().select(query, multiple)
+        except NoSuchTargetException:
+            return None
+        return [self.project(node, attrs) for node in nodes]
+
+    def Count(self, query):
+        """
+        Returns:
+            :obj:`int`: number of the matched nodes
+        """
+
+        return self._selector().count(query)
+
+    def Exists(self, query):
+        """
+        Returns:
+            :obj:`bool`: whether any node matches, the traversal terminates at the first matched node
+        """
+
+        return self._selector().exists(query)
+
+    @staticmethod
+    def project(node, attrs=None):
+        payload = {}
+        if attrs is None:
+            for attrName, attrVal in node.enumerateAttrs():
+                if attrVal is not None:
+                    payload[attrName] = attrVal
+        else:
+            for attrName in list(attrs) + ['_instanceId']:
+                attrVal = node.getAttr(attrName)
+                if attrVal is not None:
+                    payload[attrName] = attrVal
+        return {
+            'name': payload.get('name') or node.getAttr('name'),
+            'payload': payload,
+        }
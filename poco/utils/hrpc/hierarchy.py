@@ -3,8 +3,9 @@
 # @Email:  gzliuxin@corp.netease.com
 # @Date:   2017-07-11 14:34:46
 
-from hrpc.exceptions import TransportDisconnected
+from hrpc.exceptions import TransportDisconnected, RpcRemoteException
 
+from poco.exceptions import PocoTargetRemovedException
 from poco.sdk.interfaces.hierarchy import HierarchyInterface
 from poco.utils.hrpc.utils import transform_node_has_been_removed_exception
 from poco.utils.retry import retries_when
@@ -17,6 +18,10 @@ class RemotePocoHierarchy(HierarchyInterface):
         self.selector = selector
         self.attributor = attributor
 
+        # whether the remote selector implements count/exists, sdks of older versions do not
+        self._remote_count = True
+        self._remote_exists = True
+
     # node/hierarchy interface
     @retries_when(TransportDisconnected, delay=3.0)
     @transform_node_has_been_removed_exception
@@ -32,6 +37,38 @@ class RemotePocoHierarchy(HierarchyInterface):
     def select(self, query, multiple=False):
         return self.selector.select(query, multiple)
 
+    @retries_when(TransportDisconnected, delay=3.0)
+    def count(self, query):
+        if self._remote_count:
+            try:
+                return self.selector.count(query)
+            except RpcRemoteException:
+                self._remote_count = False
+        return super(RemotePocoHierarchy, self).count(query)
+
+    @retries_when(TransportDisconnected, delay=3.0)
+    def exists(self, query):
+        if self._remote_exists:
+            try:
+                return self.selector.exists(query)
+            except RpcRemoteException:
+                self._remote_exists = False
+        return super(RemotePocoHierarchy, self).exists(query)
+
+    def handle(self, node):
+        # the remote node reference itself is stable until the node is removed
+        return node
+
+    def resolve(self, handle):
+        try:
+            visible = self.getAttr(handle, 'visible')
+        except PocoTargetRemovedException:
+            return []
+        # invisible nodes are never selected, a node hidden since then is gone as well
+        if not visible:
+            return []
+        return [handle]
+
     @retries_when(TransportDisconnected, delay=3.0)
     def dump(self):
         return self.dumper.dumpHierarchy()
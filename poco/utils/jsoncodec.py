@@ -0,0 +1,117 @@
+# coding=utf-8
+
+"""
+JSON codec shared by the rpc stack. An accelerated backend (``orjson`` or ``ujson``) is used when installed, otherwise
+the standard library :py:mod:`json`. Values the accelerated backend cannot handle (e.g. non-string dict keys, NaN)
+fall back to the standard library so that the results are always the same as :py:mod:`json`.
+
+Use :py:func:`set_backend` to choose the backend explicitly.
+"""
+
+import json
+
+from poco.utils import six
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+__all__ = ['loads', 'dumps', 'set_backend', 'get_backend']
+
+
+def _json_loads(data):
+    if six.PY3 and isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def _orjson_loads(data):
+    try:
+        return orjson.loads(data)
+    except ValueError:
+        # NaN/Infinity and the like are accepted by json but not by orjson
+        return _json_loads(data)
+
+
+def _orjson_dumps(obj):
+    try:
+        return orjson.dumps(obj).decode('utf-8')
+    except TypeError:
+        return json.dumps(obj)
+
+
+def _ujson_loads(data):
+    try:
+        return ujson.loads(data)
+    except ValueError:
+        return _json_loads(data)
+
+
+def _ujson_dumps(obj):
+    try:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+    except (TypeError, OverflowError):
+        return json.dumps(obj)
+
+
+_BACKENDS = {
+    'json': (_json_loads, json.dumps),
+    'orjson': (_orjson_loads, _orjson_dumps),
+    'ujson': (_ujson_loads, _ujson_dumps),
+}
+
+_backend = None
+_loads = _dumps = None
+
+
+def set_backend(name):
+    """
+    Args:
+        name (:obj:`str`): one of ``"orjson"``, ``"ujson"`` and ``"json"``
+
+    Raises:
+        ValueError: if the backend is unknown or not installed
+    """
+
+    global _backend, _loads, _dumps
+    if name not in _BACKENDS:
+        raise ValueError('Unknown json backend "{}"'.format(name))
+    if (name == 'orjson' and orjson is None) or (name == 'ujson' and ujson is None):
+        raise ValueError('json backend "{}" is not installed'.format(name))
+    _backend = name
+    _loads, _dumps = _BACKENDS[name]
+
+
+def get_backend():
+    return _backend
+
+
+def loads(data):
+    """
+    Parse json from :obj:`str` or utf-8 encoded :obj:`bytes`.
+    """
+
+    return _loads(data)
+
+
+def dumps(obj):
+    """
+    Serialize to a json :obj:`str`.
+    """
+
+    return _dumps(obj)
+
+
+if orjson is not None:
+    set_backend('orjson')
+elif ujson is not None:
+    set_backend('ujson')
+else:
+    set_backend('json')
@@ -0,0 +1,43 @@
+# coding=utf-8
+
+import socket
+
+__all__ = ['socketpair']
+
+
+def socketpair():
+    """
+    Pair of connected sockets like :py:func:`socket.socketpair`, e.g. for waking up a thread blocked in select. The
+    function is missing on windows before python 3.5, where the pair is connected through the loopback interface
+    instead.
+
+    Returns:
+        :obj:`tuple`: (socket, socket)
+    """
+
+    if hasattr(socket, 'socketpair'):
+        return socket.socketpair()
+    return _loopback_socketpair()
+
+
+def _loopback_socketpair():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            client.connect(listener.getsockname())
+            server, _ = listener.accept()
+        except Exception:
+            client.close()
+            raise
+    finally:
+        listener.close()
+
+    # anyone else on the host may connect to the listener, make sure the accepted one is ours
+    if server.getpeername() != client.getsockname():
+        server.close()
+        client.close()
+        raise socket.error('Unexpected connection while creating a socket pair')
+    return server, client
@@ -0,0 +1,102 @@
+# coding=utf-8
+
+import bisect
+import time
+
+
+class LatencyHistogram(object):
+    """
+    Fixed log-scale histogram of latencies in seconds, from 0.1ms up to about 2 minutes. Percentiles are estimated by
+    the upper bound of the bucket, which is accurate to about 20%.
+    """
+
+    BOUNDS = [0.0001 * 1.2 ** i for i in range(78)]
+
+    def __init__(self):
+        super(LatencyHistogram, self).__init__()
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, latency):
+        self.counts[bisect.bisect_left(self.BOUNDS, latency)] += 1
+        self.total += 1
+        self.sum += latency
+        if latency > self.max:
+            self.max = latency
+
+    def percentile(self, p):
+        if self.total == 0:
+            return None
+        rank = self.total * p / 100.0
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.BOUNDS[i] if i < len(self.BOUNDS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.total,
+            'mean': self.sum / self.total if self.total else None,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+        }
+
+
+class RateCounter(object):
+    """
+    Count events per second over a sliding window of ``window`` seconds.
+    """
+
+    def __init__(self, window=60):
+        super(RateCounter, self).__init__()
+        self.window = window
+        self.slots = [0] * window
+        self.slot_seconds = [0] * window
+
+    def add(self, n=1):
+        second = int(time.time())
+        i = second % self.window
+        if self.slot_seconds[i] != second:
+            self.slot_seconds[i] = second
+            self.slots[i] = 0
+        self.slots[i] += n
+
+    def rate(self):
+        now = int(time.time())
+        total = 0
+        for second, count in zip(self.slot_seconds, self.slots):
+            if now - second < self.window:
+                total += count
+        return float(total) / self.window
+
+
+class EndpointStats(object):
+    def __init__(self, endpoint):
+        super(EndpointStats, self).__init__()
+        self.endpoint = endpoint
+        self.requests = 0
+        self.responses = 0
+        self.timeouts = 0
+        self.dropped = 0  # requester gone before the response arrived, or responder gone before answering
+        self.coalesced = 0  # requests answered by an identical request in flight
+        self.cache_hits = 0
+        self.throughput = RateCounter()
+        self.latency = LatencyHistogram()
+
+    def to_dict(self):
+        return {
+            'endpoint': self.endpoint,
+            'requests': self.requests,
+            'responses': self.responses,
+            'timeouts': self.timeouts,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'cache_hits': self.cache_hits,
+            'throughput': self.throughput.rate(),
+            'latency': self.latency.to_dict(),
+        }
@@ -2,81 +2,403 @@
 
 import json
 import threading
+import time
+from collections import deque
 
+from poco.utils.net.stats import EndpointStats
 from poco.utils.net.transport.ws import WsSocket
 from poco.utils.net.transport.tcp import TcpSocket
-from poco.utils import six
+from poco.utils import jsoncodec, six
 
 if six.PY3:
+    import selectors
     from urllib.parse import urlparse
 else:
+    import selectors2 as selectors
     from urlparse import urlparse
 
 
+class BrokerRequest(object):
+    def __init__(self, reqid, method, data, requester, cid):
+        super(BrokerRequest, self).__init__()
+        self.reqid = reqid
+        self.fwdid = reqid  # id of the request forwarded to the responder, see StdBroker.dispatch_pending
+        self.method = method
+        self.data = data
+        self.requester = requester
+        self.cid = cid
+        self.responder = None
+        self.rcid = None
+        self.received_at = time.time()
+        self.forwarded_at = None
+
+        # identical requests that arrived while this one was in flight, answered by the same response
+        self.coalesce_key = None
+        self.followers = []
+
+    def to_dict(self, broker, now):
+        return {
+            'id': self.reqid,
+            'method': self.method,
+            'age': now - self.received_at,
+            'requester': broker.endpoint_of(self.requester),
+            'responder': broker.endpoint_of(self.responder) if self.responder else None,
+            'coalesced': len(self.followers),
+        }
+
+
 class StdBroker(object):
-    def __init__(self, ep1, ep2):
+    """
+    Broker between requesters (poco clients, test workers) and responders (poco-sdk in game instances). All endpoints
+    are served by one selector-based event loop. Each request is forwarded to the responder connection that has the
+    fewest requests in flight, and its response is routed back to the requester that sent it. A request whose id is
+    already used by another request in flight, e.g. from another requester, is forwarded under an id of the broker,
+    and the response carries the original id again.
+
+    Requests not answered within ``request_timeout`` are answered with an error by the broker itself, so are requests
+    whose responder disconnects. Requesters can call ``GetBrokerStats`` through the broker to get the in-flight
+    requests, throughput and latency percentiles of each endpoint. This method is handled by the broker and never
+    forwarded.
+
+    Requests to the idempotent methods in ``coalesce_methods`` (Dump, GetScreenSize and GetSDKVersion by default) that
+    arrive while an identical request (same method and params) is in flight are not forwarded, they are answered by
+    the response of the request in flight. With ``cache_ttl`` greater than 0, their responses are also reused for that
+    many seconds.
+
+    Args:
+        ep1: endpoint(s) responders connect to, e.g. ``'tcp://*:15003'`` or a list of endpoints
+        ep2: endpoint(s) requesters connect to, e.g. ``'ws://*:15004'`` or a list of endpoints
+        max_inflight (:obj:`int`): max number of requests forwarded to one responder connection and not yet answered.
+         Further requests wait in the broker until a responder is available
+        max_pending (:obj:`int`): max number of requests waiting in the broker. When reached, the broker stops reading
+         from requesters until the responders catch up
+        request_timeout (:obj:`float`): seconds before a request is given up, counted from when the broker receives it
+        coalesce_methods: names of the idempotent methods whose identical requests are coalesced
+        cache_ttl (:obj:`float`): seconds to answer identical requests of ``coalesce_methods`` from the last response.
+         0 by default, which disables the cache
+    """
+
+    STATS_METHOD = 'GetBrokerStats'
+    SWEEP_INTERVAL = 1.0
+
+    DEFAULT_COALESCE_METHODS = ('Dump', 'GetScreenSize', 'GetSDKVersion')
+
+    def __init__(self, ep1, ep2, max_inflight=4, max_pending=1024, request_timeout=60,
+                 coalesce_methods=DEFAULT_COALESCE_METHODS, cache_ttl=0):
         super(StdBroker, self).__init__()
 
         # always ep2  --request---> ep1
         #        ep2 <--response--  ep1
-        self.ep1 = self._make_transport(ep1)
-        self.ep2 = self._make_transport(ep2)
-        self.requests_map = {}  # reqid -> requester cid
+        self.selector = selectors.DefaultSelector()
+        self.stats = {}  # transport -> EndpointStats
+        self.responders = [self._make_transport(ep) for ep in self._as_list(ep1)]
+        self.requesters = [self._make_transport(ep) for ep in self._as_list(ep2)]
+        self.ep1 = self.responders[0]
+        self.ep2 = self.requesters[0]
+        self.max_inflight = max_inflight
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self.coalesce_methods = set(coalesce_methods or [])
+        self.cache_ttl = cache_ttl
+
+        self.requests_map = {}  # forwarded id -> BrokerRequest forwarded to a responder
+        self.next_fwdid = 0
+        self.inflight = {}  # (responder transport, responder cid) -> number of requests not yet answered
+        self.pending = deque()  # BrokerRequest waiting for a free responder
+        self.coalescing = {}  # (method, params) -> BrokerRequest pending or in flight
+        self.cache = {}  # (method, params) -> (time, response packet)
+        self.reading_paused = False
+        self.started_at = time.time()
+        self.last_sweep = self.started_at
 
         self.t = threading.Thread(target=self.loop)
         self.t.daemon = True
         self.t.start()
 
+    @staticmethod
+    def _as_list(ep):
+        if isinstance(ep, six.string_types):
+            return [ep]
+        return list(ep)
+
     def _make_transport(self, ep):
-        ep = urlparse(ep)
-        if ep.scheme.startswith('ws'):
-            transport = WsSocket()
+        url = urlparse(ep)
+        if url.scheme.startswith('ws'):
+            transport = WsSocket(selector=self.selector)
+            transport.bind((url.hostname, url.port))
+        elif url.scheme == 'unix':
+            # unix:///tmp/poco.sock, or unix://poco.sock relative to the working directory
+            transport = TcpSocket(selector=self.selector)
+            transport.bind(url.netloc + url.path)
         else:
-            transport = TcpSocket()
-        transport.bind((ep.hostname, ep.port))
+            transport = TcpSocket(selector=self.selector)
+            transport.bind((url.hostname, url.port))
+        self.stats[transport] = EndpointStats(ep)
         return transport
 
+    def endpoint_of(self, transport):
+        return self.stats[transport].endpoint
+
     def deserialize(self, data):
-        if six.PY3 and not isinstance(data, six.text_type):
-            data = data.decode('utf-8')
-        return json.loads(data)
+        return jsoncodec.loads(data)
 
     def serialize(self, packet):
-        return json.dumps(packet)
+        return jsoncodec.dumps(packet)
 
     def handle_request(self):
-        cid, data = self.ep2.update()
-        if data:
-            packet = self.deserialize(data)
-            reqid = packet['id']
-            self.requests_map[reqid] = cid
-            self.ep1.send(None, data)
+        for requester in self.requesters:
+            while len(self.pending) < self.max_pending:
+                cid, data = requester.recv()
+                if not data:
+                    break
+                packet = self.deserialize(data)
+                self.stats[requester].requests += 1
+                if packet.get('method') == self.STATS_METHOD:
+                    self.reply(requester, cid, packet['id'], result=self.get_stats())
+                    continue
+                req = BrokerRequest(packet['id'], packet.get('method'), data, requester, cid)
+                if req.method in self.coalesce_methods and self._coalesce(req, packet):
+                    continue
+                self.pending.append(req)
+        self.dispatch_pending()
 
     def handle_response(self):
-        _, data = self.ep1.update()
-        if data:
-            packet = self.deserialize(data)
-            reqid = packet['id']
-            cid = self.requests_map.pop(reqid, None)
-            if cid:
-                self.ep2.send(cid, data)
+        for responder in self.responders:
+            while True:
+                rcid, data = responder.recv()
+                if not data:
+                    break
+                packet = self.deserialize(data)
+                req = self.requests_map.pop(packet['id'], None)
+                if req:
+                    self._release(req)
+                    self._complete(req, packet, data)
+        self.dispatch_pending()
+
+    def dispatch_pending(self):
+        while self.pending:
+            target = self._pick_responder()
+            if target is None:
+                break
+            req = self.pending.popleft()
+            req.responder, req.rcid = target
+            req.forwarded_at = time.time()
+            if req.reqid in self.requests_map:
+                # requesters choose their ids independently, forward under an id of the broker if it is taken
+                req.fwdid = self._make_fwdid()
+                req.data = self.serialize(dict(self.deserialize(req.data), id=req.fwdid))
+            self.requests_map[req.fwdid] = req
+            self.inflight[target] = self.inflight.get(target, 0) + 1
+            self.stats[req.responder].requests += 1
+            req.responder.send(req.rcid, req.data)
+
+        # backpressure, stop reading from requesters while too many requests are waiting for responders
+        if len(self.pending) >= self.max_pending and not self.reading_paused:
+            self.reading_paused = True
+            for requester in self.requesters:
+                requester.pause_reading()
+        elif len(self.pending) < self.max_pending // 2 and self.reading_paused:
+            self.reading_paused = False
+            for requester in self.requesters:
+                requester.resume_reading()
+
+    def _make_fwdid(self):
+        while True:
+            self.next_fwdid += 1
+            fwdid = 'StdBroker-{}'.format(self.next_fwdid)
+            if fwdid not in self.requests_map:
+                return fwdid
+
+    def reply(self, requester, cid, reqid, result=None, error=None):
+        packet = {'id': reqid, 'jsonrpc': '2.0'}
+        if error is not None:
+            packet['error'] = {'message': error}
+        else:
+            packet['result'] = result
+        requester.send(cid, self.serialize(packet))
+        self.stats[requester].responses += 1
+
+    def _coalesce(self, req, packet):
+        """
+        Answer the request from the cache or attach it to the identical request in flight.
+
+        Returns:
+            :obj:`bool`: True if the request is taken care of and should not be forwarded
+        """
+
+        key = (req.method, json.dumps(packet.get('params'), sort_keys=True))
+        cached = self.cache.get(key)
+        if cached is not None:
+            cached_at, cached_packet = cached
+            if time.time() - cached_at <= self.cache_ttl:
+                self.stats[req.requester].cache_hits += 1
+                self._deliver(req, self.serialize(dict(cached_packet, id=req.reqid)), time.time())
+                return True
+            self.cache.pop(key)
+
+        leader = self.coalescing.get(key)
+        if leader is not None:
+            self.stats[req.requester].coalesced += 1
+            leader.followers.append(req)
+            return True
+
+        req.coalesce_key = key
+        self.coalescing[key] = req
+        return False
+
+    def _end_coalescing(self, req, packet=None):
+        if req.coalesce_key is None:
+            return
+        if self.coalescing.get(req.coalesce_key) is req:
+            self.coalescing.pop(req.coalesce_key)
+        if packet is not None and self.cache_ttl > 0 and 'result' in packet:
+            self.cache[req.coalesce_key] = (time.time(), packet)
+
+    def _complete(self, req, packet, data):
+        now = time.time()
+        responder_stats = self.stats[req.responder]
+        responder_stats.responses += 1
+        responder_stats.throughput.add()
+        responder_stats.latency.add(now - req.forwarded_at)
+
+        self._end_coalescing(req, packet)
+        if req.fwdid != req.reqid:
+            data = self.serialize(dict(packet, id=req.reqid))
+        self._deliver(req, data, now)
+        for follower in req.followers:
+            self._deliver(follower, self.serialize(dict(packet, id=follower.reqid)), now)
+
+    def _deliver(self, req, data, now):
+        requester_stats = self.stats[req.requester]
+        if req.requester.get_connection(req.cid) is None:
+            requester_stats.dropped += 1
+            return
+        req.requester.send(req.cid, data)
+        requester_stats.responses += 1
+        requester_stats.throughput.add()
+        requester_stats.latency.add(now - req.received_at)
+
+    def _fail(self, req, reason):
+        self._end_coalescing(req)
+        for r in [req] + req.followers:
+            if r.requester.get_connection(r.cid) is None:
+                self.stats[r.requester].dropped += 1
+                continue
+            self.reply(r.requester, r.cid, r.reqid,
+                       error='{} (method "{}", id {}, waited {:.3f}s in StdBroker)'
+                       .format(reason, r.method, r.reqid, time.time() - r.received_at))
+
+    def _pick_responder(self):
+        best = None
+        best_load = self.max_inflight
+        for responder in self.responders:
+            # half-closed responders would never answer
+            for rcid in responder.get_active_connection_ids():
+                load = self.inflight.get((responder, rcid), 0)
+                if load < best_load:
+                    best, best_load = (responder, rcid), load
+        return best
+
+    def _release(self, req):
+        target = (req.responder, req.rcid)
+        load = self.inflight.get(target, 0) - 1
+        if load > 0:
+            self.inflight[target] = load
+        else:
+            self.inflight.pop(target, None)
+
+    def sweep(self):
+        """
+        Expire timed out requests, give up requests whose responder is gone and drop waiting requests whose requester
+        is gone.
+        """
+
+        now = time.time()
+        self.last_sweep = now
+        deadline = now - self.request_timeout
+        # half-closed responders are gone as well, they would never answer
+        active = dict((responder, set(responder.get_active_connection_ids())) for responder in self.responders)
+
+        for fwdid, req in list(self.requests_map.items()):
+            if req.received_at < deadline:
+                self.requests_map.pop(fwdid)
+                self._release(req)
+                self.stats[req.responder].timeouts += 1
+                self._fail(req, 'Request timeout')
+            elif req.rcid not in active[req.responder]:
+                self.requests_map.pop(fwdid)
+                self._release(req)
+                self.stats[req.responder].dropped += 1
+                self._fail(req, 'Responder disconnected')
+            # requests of gone requesters keep their responder slot until answered or expired, the response is dropped
+
+        alive = deque()
+        for req in self.pending:
+            if req.requester.get_connection(req.cid) is None and not req.followers:
+                self.stats[req.requester].dropped += 1
+                self._end_coalescing(req)
+            elif req.received_at < deadline:
+                self.stats[req.requester].timeouts += 1
+                self._fail(req, 'Request timeout, no responder available')
+            else:
+                alive.append(req)
+        self.pending = alive
+
+        for key, (cached_at, _) in list(self.cache.items()):
+            if now - cached_at > self.cache_ttl:
+                self.cache.pop(key)
+
+        # forget responder connections that have gone
+        for target in list(self.inflight.keys()):
+            responder, rcid = target
+            if responder.get_connection(rcid) is None:
+                self.inflight.pop(target)
+
+    def get_stats(self):
+        now = time.time()
+        return {
+            'uptime': now - self.started_at,
+            'inflight': [req.to_dict(self, now) for req in self.requests_map.values()],
+            'pending': [req.to_dict(self, now) for req in self.pending],
+            'reading_paused': self.reading_paused,
+            'responders': [self.stats[t].to_dict() for t in self.responders],
+            'requesters': [self.stats[t].to_dict() for t in self.requesters],
+        }
+
+    def update(self, timeout=None):
+        if self.requests_map or self.pending:
+            since_sweep = time.time() - self.last_sweep
+            if since_sweep >= self.SWEEP_INTERVAL:
+                self.sweep()
+                since_sweep = 0
+            if timeout is None or timeout > self.SWEEP_INTERVAL - since_sweep:
+                timeout = self.SWEEP_INTERVAL - since_sweep
+
+        transports = self.responders + self.requesters
+        for transport in transports:
+            timeout = transport.prepare_poll(timeout)
+        events = self.selector.select(timeout)
+        for transport in transports:
+            transport.process_events(events)
+        self.handle_response()
+        self.handle_request()
 
     def loop(self):
         print('StdBroker on.')
         while True:
-            self.handle_request()
-            self.handle_response()
+            self.update()
 
 
 if __name__ == '__main__':
     import sys
-    import time
 
     if len(sys.argv) < 3:
         print('Not enough arguments. Please provide at least 2 endpoints.')
         print('e.g. ws://*:15003 tcp://*:15004')
+        print('or unix:///tmp/poco-sdk.sock unix:///tmp/poco.sock for a unix domain socket')
+        print('separate multiple endpoints of the same side by comma, e.g. tcp://*:15003,tcp://*:15005 tcp://*:15004')
         exit(-1)
-    rpt = StdBroker(sys.argv[1], sys.argv[2])
+    rpt = StdBroker(sys.argv[1].split(','), sys.argv[2].split(','))
 
     while True:
         time.sleep(5)
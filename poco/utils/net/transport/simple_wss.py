@@ -26,6 +26,8 @@ import codecs
 from collections import deque
 from select import select
 
+from poco.utils.net.socketpair import socketpair
+
 
 __all__ = ['WebSocket',
            'SimpleWebSocketServer',
@@ -416,6 +418,8 @@ class WebSocket(object):
             payload.extend(data)
 
         self.sendq.append((opcode, payload))
+        # messages may be sent from other threads, wake the server up to write it right away
+        self.server.wakeup()
 
     def _parseMessage(self, byte):
         # read in the header
@@ -587,6 +591,31 @@ class SimpleWebSocketServer(object):
         self.connections = {}
         self.listeners = [self.serversocket]
 
+        # written to by wakeup() so that select returns as soon as there is something to send
+        self.wakeupsocket, self._wakeupwriter = socketpair()
+        self.wakeupsocket.setblocking(0)
+        self._wakeupwriter.setblocking(0)
+        self.listeners.append(self.wakeupsocket)
+
+        # whether to read from the clients, see pause_reading
+        self.reading = True
+
+    def pause_reading(self):
+        # stop reading from the clients so that they are blocked by tcp flow control, sending is not affected
+        self.reading = False
+        self.wakeup()
+
+    def resume_reading(self):
+        self.reading = True
+        self.wakeup()
+
+    def wakeup(self):
+        try:
+            self._wakeupwriter.send(b'\0')
+        except socket.error:
+            # the pipe is full, select is going to return anyway
+            pass
+
     def _decorateSocket(self, sock):
         return sock
 
@@ -595,6 +624,8 @@ class SimpleWebSocketServer(object):
 
     def close(self):
         self.serversocket.close()
+        self.wakeupsocket.close()
+        self._wakeupwriter.close()
 
         for desc, conn in self.connections.items():
             conn.close()
@@ -612,16 +643,21 @@ class SimpleWebSocketServer(object):
     def serveonce(self):
         writers = []
         for fileno in self.listeners:
-            if fileno == self.serversocket:
+            if fileno == self.serversocket or fileno == self.wakeupsocket:
                 continue
             client = self.connections[fileno]
             if client.sendq:
                 writers.append(fileno)
 
+        if self.reading:
+            readers = self.listeners
+        else:
+            readers = [self.serversocket, self.wakeupsocket]
+
         if self.selectInterval:
-            rList, wList, xList = select(self.listeners, writers, self.listeners, self.selectInterval)
+            rList, wList, xList = select(readers, writers, self.listeners, self.selectInterval)
         else:
-            rList, wList, xList = select(self.listeners, writers, self.listeners)
+            rList, wList, xList = select(readers, writers, self.listeners)
 
         for ready in wList:
             client = self.connections[ready]
@@ -654,6 +690,12 @@ class SimpleWebSocketServer(object):
                 except Exception as n:
                     if sock is not None:
                         sock.close()
+            elif ready == self.wakeupsocket:
+                try:
+                    while self.wakeupsocket.recv(4096):
+                        pass
+                except socket.error:
+                    pass
             else:
                 if ready not in self.connections:
                     continue
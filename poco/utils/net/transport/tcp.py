@@ -1,20 +1,30 @@
 # coding=utf-8
 
 import errno
+import os
 import socket
-import select
+import stat
+import threading
+import time
 import uuid
 
 from poco.sdk.std.transport import Transport
 from poco.sdk.std.protocol import SimpleProtocolFilter
 from poco.utils import six
+from poco.utils.net.socketpair import socketpair
 
 if six.PY3:
+    import selectors
     from queue import Queue, Empty
 else:
+    import selectors2 as selectors
     from Queue import Queue, Empty
 
 
+# errors meaning the non-blocking operation should simply be retried when the socket is ready again
+WOULD_BLOCK = (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR)
+
+
 class ConnectionReset(Exception):
     pass
 
@@ -24,25 +34,57 @@ class Connection(object):
         super(Connection, self).__init__()
         self.cid = cid
         self.sock = sock
+        self.sock.setblocking(False)
         self.endpoint = endpoint
         self.p = SimpleProtocolFilter()
         self.RX_SIZE = RX_SIZE
 
+        # outgoing bytes not yet accepted by the kernel. written as soon as the socket becomes writable
+        self.tx_buf = bytearray()
+        self.tx_lock = threading.Lock()
+
+        # the time when peer shut down its sending side. the connection stays writable for a while so that
+        # responses to the requests it has sent still get delivered
+        self.half_closed_at = None
+
     def send(self, packet):
+        """
+        Queue the packet and write as much as possible without blocking.
+
+        Returns:
+            :obj:`bool`: True if some data is still pending and should be flushed when the socket is writable
+        """
+
         data = self.p.pack(packet)
-        self.sock.sendall(data)
+        with self.tx_lock:
+            self.tx_buf += data
+            return self._flush()
+
+    def flush(self):
+        with self.tx_lock:
+            return self._flush()
+
+    def _flush(self):
+        while self.tx_buf:
+            try:
+                sent = self.sock.send(self.tx_buf)
+            except socket.error as e:
+                if e.errno in WOULD_BLOCK:
+                    break
+                raise ConnectionReset
+            del self.tx_buf[:sent]
+        return len(self.tx_buf) > 0
 
     def recv(self):
-        rxdata = ''
         try:
             rxdata = self.sock.recv(self.RX_SIZE)
         except socket.error as e:
-            if e.errno in (errno.ECONNRESET, ):
-                raise ConnectionReset
+            if e.errno in WOULD_BLOCK:
+                return
+            raise ConnectionReset
 
         if not rxdata:
-            self.close()
-            raise ConnectionReset
+            self.half_closed_at = time.time()
         else:
             for packet in self.p.input(rxdata):
                 yield packet
@@ -57,78 +99,137 @@ class Connection(object):
         return self.sock
 
 
+def make_socket(endpoint):
+    """
+    Create a stream socket for the endpoint. A ``(host, port)`` tuple is a tcp endpoint, a string is the path of a unix
+    domain socket.
+    """
+
+    if isinstance(endpoint, six.string_types):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+
 class TcpSocket(Transport):
-    def __init__(self, RX_SIZE=65536):
+    """
+    Packet transport over tcp, or over a unix domain socket when the endpoint passed to :py:meth:`bind` or
+    :py:meth:`connect` is a path instead of a ``(host, port)`` tuple. Sockets are non-blocking and multiplexed by one :py:mod:`selectors` selector, outgoing
+    packets are buffered per connection and written when the socket becomes writable so that a slow peer never blocks
+    the others.
+
+    Args:
+        RX_SIZE (:obj:`int`): max bytes to read from a socket each time it is readable
+        HALF_CLOSE_LINGER (:obj:`float`): seconds to keep a connection for sending after peer shut down its sending
+         side
+        selector: a :py:mod:`selectors` selector shared with other transports so that all of them can be served by one
+         event loop, see :py:meth:`process_events`. A private one is created by default
+    """
+
+    def __init__(self, RX_SIZE=65536, HALF_CLOSE_LINGER=10, selector=None):
         super(TcpSocket, self).__init__()
         # active socket object
         self.s = None
-        self.connections = {}  # sock -> Connection
+        self.connections = {}  # cid -> Connection
         self.connections_endpoints = {}  # endpoint -> Connection
+        self.selector = selector or selectors.DefaultSelector()
+        self.reading = True
+
+        # other threads writing to a connection ask the polling thread to watch for writability through this pipe
+        self._wakeup_r, self._wakeup_w = socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self.selector.register(self._wakeup_r, selectors.EVENT_READ, (self, None))
+        self._want_write = set()  # cids
+        self._want_write_lock = threading.Lock()
+        self._poll_thread = None
+        self._half_closed = {}  # cid -> Connection
 
         self.rq = Queue()
         self.RX_SIZE = RX_SIZE
+        self.HALF_CLOSE_LINGER = HALF_CLOSE_LINGER
 
     def connect(self, endpoint):
         if endpoint in self.connections_endpoints:
             raise RuntimeError("Already connected to {}".format(endpoint))
 
-        c = socket.socket()
+        c = make_socket(endpoint)
         c.connect(endpoint)
-        cid = six.text_type(uuid.uuid4())
-        conn = Connection(cid, c, endpoint, self.RX_SIZE)
-        self.connections[c] = conn
-        self.connections_endpoints[endpoint] = conn
+        self._add_connection(c, endpoint)
 
     def disconnect(self, endpoint=None):
         if endpoint is not None:
-            conn = self.connections_endpoints.pop(endpoint, None)
+            conn = self.connections_endpoints.get(endpoint)
             if conn:
-                self.connections.pop(conn.get_socket_object(), None)
-                conn.close()
+                self._remove_connection(conn)
         else:
-            for _, conn in self.connections_endpoints.items():
-                conn.close()
-            self.connections_endpoints = {}
-            self.connections = {}
+            for conn in list(self.connections.values()):
+                self._remove_connection(conn)
 
     def bind(self, endpoint):
         if self.s is not None:
             raise RuntimeError("Already bound at {}".format(self.s.getsockname()))
 
-        ip, port = endpoint
-        if ip in ('', '*', '0'):
-            ip = '0.0.0.0'
-        self.s = socket.socket()
-        self.s.bind((ip, port))
-        self.s.listen(10)
-        print('server listens on ("{}", {}) transport socket'.format(ip, port))
+        if isinstance(endpoint, six.string_types):
+            # a socket file left by a previous server that was not shut down cleanly makes bind fail
+            if os.path.exists(endpoint) and stat.S_ISSOCK(os.stat(endpoint).st_mode):
+                os.unlink(endpoint)
+            self.s = make_socket(endpoint)
+            self.s.bind(endpoint)
+            print('server listens on "{}" transport unix socket'.format(endpoint))
+        else:
+            ip, port = endpoint
+            if ip in ('', '*', '0'):
+                ip = '0.0.0.0'
+            self.s = make_socket(endpoint)
+            self.s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.s.bind((ip, port))
+            print('server listens on ("{}", {}) transport socket'.format(ip, port))
+        self.s.listen(socket.SOMAXCONN)
+        self.s.setblocking(False)
+        self.selector.register(self.s, selectors.EVENT_READ, (self, None))
 
     def update(self, timeout=0.002):
-        rlist = []
-        if self.s is not None:
-            rlist.append(self.s)
-        rlist.extend(self.connections.keys())
-        r, _, _ = select.select(rlist, [], [], timeout)
-        for c in r:
-            if c is self.s:
-                client_sock, endpoint = self.s.accept()
-                print('accept from: {}'.format(endpoint))
-                cid = six.text_type(uuid.uuid4())
-                conn = Connection(cid, client_sock, endpoint, self.RX_SIZE)
-                self.connections[client_sock] = conn
-                self.connections_endpoints[endpoint] = conn
-            else:
-                conn = self.connections.get(c)
-                if not conn:
-                    continue
+        """
+        Wait at most ``timeout`` seconds (forever if None) for any socket to become ready, then return one received
+        packet as ``(cid, packet)`` or ``(None, None)``. Packets already queued are returned without waiting.
+        """
 
+        if not self.rq.empty():
+            timeout = 0
+        self.process_events(self.selector.select(self.prepare_poll(timeout)))
+        return self.recv()
+
+    def process_events(self, events):
+        """
+        Handle the events returned by the selector. Events of sockets that belong to other transports sharing the
+        selector are ignored. Received packets are queued and can be taken by :py:meth:`recv`.
+        """
+
+        self._poll_thread = threading.current_thread()
+        for key, mask in events:
+            owner, conn = key.data
+            if owner is not self:
+                continue
+
+            c = key.fileobj
+            if c is self._wakeup_r:
+                self._drain_wakeup()
+            elif c is self.s:
+                self._accept()
+            else:
                 try:
-                    for packet in conn.recv():
-                        self.rq.put((conn.cid, packet))
+                    if mask & selectors.EVENT_WRITE:
+                        self._flush(conn)
+                    if mask & selectors.EVENT_READ:
+                        for packet in conn.recv():
+                            self.rq.put((conn.cid, packet))
+                        if conn.half_closed_at is not None and conn.cid not in self._half_closed:
+                            self._half_closed[conn.cid] = conn
+                            self._watch(conn, write=len(conn.tx_buf) > 0)
                 except ConnectionReset:
-                    self.connections.pop(c)
+                    self._remove_connection(conn)
 
-        return self.recv()
+        self._process_want_write()
 
     def recv(self):
         try:
@@ -139,18 +240,160 @@ class TcpSocket(Transport):
     def send(self, cid, packet):
         if cid is None:
             # broadcast
-            for _, conn in self.connections.items():
-                conn.send(packet)
+            for conn in list(self.connections.values()):
+                self._send(conn, packet)
         else:
             conn = self.get_connection(cid)
             if conn:
-                conn.send(packet)
+                self._send(conn, packet)
 
     def get_connection(self, cid):
-        for sock, conn in self.connections.items():
-            if conn.cid == cid:
-                return conn
-        return None
+        return self.connections.get(cid)
+
+    def get_connection_ids(self):
+        return list(self.connections.keys())
+
+    def get_active_connection_ids(self):
+        """
+        Ids of the connections whose peer has not shut down its sending side. Half-closed connections are kept for a
+        while to flush the pending responses, but their peer will never send anything, e.g. answer a new request.
+        """
+
+        return [cid for cid, conn in self.connections.items() if conn.half_closed_at is None]
+
+    def pause_reading(self):
+        """
+        Stop reading from all connections, peers will be blocked by tcp flow control once the kernel buffers are full.
+        Sending is not affected.
+        """
+
+        if self.reading:
+            self.reading = False
+            for conn in list(self.connections.values()):
+                self._watch(conn, write=len(conn.tx_buf) > 0)
+
+    def resume_reading(self):
+        if not self.reading:
+            self.reading = True
+            for conn in list(self.connections.values()):
+                self._watch(conn, write=len(conn.tx_buf) > 0)
+
+    def _send(self, conn, packet):
+        try:
+            pending = conn.send(packet)
+        except ConnectionReset:
+            self._schedule_write(conn)  # let the polling thread clean it up
+            return
+        if pending:
+            self._schedule_write(conn)
+
+    def _schedule_write(self, conn):
+        if threading.current_thread() is self._poll_thread:
+            self._watch(conn, write=True)
+        else:
+            with self._want_write_lock:
+                self._want_write.add(conn.cid)
+            try:
+                self._wakeup_w.send(b'\0')
+            except socket.error:
+                # the pipe is full, the polling thread is going to wake up anyway
+                pass
+
+    def _process_want_write(self):
+        with self._want_write_lock:
+            cids, self._want_write = self._want_write, set()
+        for cid in cids:
+            conn = self.connections.get(cid)
+            if conn:
+                self._flush(conn)
+
+    def _flush(self, conn):
+        try:
+            pending = conn.flush()
+        except ConnectionReset:
+            self._remove_connection(conn)
+            return
+        self._watch(conn, write=pending)
+
+    def _watch(self, conn, write=False):
+        events = selectors.EVENT_WRITE if write else 0
+        if self.reading and conn.half_closed_at is None:
+            events |= selectors.EVENT_READ
+        sock = conn.get_socket_object()
+        try:
+            key = self.selector.get_key(sock)
+        except KeyError:
+            key = None
+
+        if not events:
+            # nothing to read or write, no need to watch it until a packet is sent, reading resumes or it expires
+            if key is not None:
+                self._unregister(sock)
+        elif key is None:
+            self.selector.register(sock, events, (self, conn))
+        elif key.events != events:
+            self.selector.modify(sock, events, (self, conn))
+
+    def prepare_poll(self, timeout):
+        """
+        Close the half-closed connections that have lingered long enough and return the timeout to wait on the selector
+        for, so that the next expiry is not missed.
+        """
+
+        now = time.time()
+        next_expiry = None
+        for conn in list(self._half_closed.values()):
+            expiry = conn.half_closed_at + self.HALF_CLOSE_LINGER
+            if expiry <= now:
+                self._remove_connection(conn)
+            elif next_expiry is None or expiry < next_expiry:
+                next_expiry = expiry
+        if next_expiry is not None and (timeout is None or next_expiry - now < timeout):
+            timeout = next_expiry - now
+        return timeout
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_r.recv(4096):
+                pass
+        except socket.error:
+            pass
+
+    def _accept(self):
+        while True:
+            try:
+                client_sock, endpoint = self.s.accept()
+            except socket.error as e:
+                if e.errno not in WOULD_BLOCK:
+                    print('accept error: {}'.format(e))
+                return
+            print('accept from: {}'.format(endpoint))
+            self._add_connection(client_sock, endpoint)
+
+    def _add_connection(self, sock, endpoint):
+        cid = six.text_type(uuid.uuid4())
+        if not endpoint:
+            # peers of a unix domain socket are usually unnamed
+            endpoint = cid
+        conn = Connection(cid, sock, endpoint, self.RX_SIZE)
+        self.connections[cid] = conn
+        self.connections_endpoints[endpoint] = conn
+        self._watch(conn)
+        return conn
+
+    def _remove_connection(self, conn):
+        self.connections.pop(conn.cid, None)
+        self._half_closed.pop(conn.cid, None)
+        if self.connections_endpoints.get(conn.endpoint) is conn:
+            self.connections_endpoints.pop(conn.endpoint)
+        self._unregister(conn.get_socket_object())
+        conn.close()
+
+    def _unregister(self, sock):
+        try:
+            self.selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
 
     def __str__(self):
         return 'Tcp connection(s) at {}'.format(self.connections_endpoints.keys())
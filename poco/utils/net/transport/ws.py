@@ -1,27 +1,45 @@
 # coding=utf-8
 
-import time
+import socket
 import threading
 import uuid
 
 from poco.sdk.std.transport import Transport
 from poco.utils import six
+from poco.utils.net.socketpair import socketpair
 from poco.utils.net.transport.simple_wss import SimpleWebSocketServer, WebSocket
 
 if six.PY3:
+    import selectors
     from queue import Queue, Empty
 else:
+    import selectors2 as selectors
     from Queue import Queue, Empty
 
 
 class WsSocket(Transport):
-    def __init__(self):
+    """
+    Args:
+        selector: a :py:mod:`selectors` selector shared with other transports. The websocket server runs in its own
+         thread, received messages wake up the selector so that one event loop can serve this transport together with
+         the others, see :py:meth:`process_events`.
+    """
+
+    def __init__(self, selector=None):
         super(WsSocket, self).__init__()
         self.s = None
         self.connections = {}  # websocket client object -> cid
         self.connections_endpoints = {}  # endpoint -> websocket client object
         self.rq = Queue()
 
+        self.selector = selector
+        self._wakeup_r = self._wakeup_w = None
+        if selector is not None:
+            self._wakeup_r, self._wakeup_w = socketpair()
+            self._wakeup_r.setblocking(False)
+            self._wakeup_w.setblocking(False)
+            selector.register(self._wakeup_r, selectors.EVENT_READ, (self, None))
+
     def connect(self, endpoint):
         raise NotImplementedError
 
@@ -43,25 +61,61 @@ class WsSocket(Transport):
                 print('server on accept. {}'.format(self2))
 
             def handleMessage(self2):
-                print('received_message from {}: {}'.format(self2.address, self2.data))
                 cid = self.connections.get(self2)
                 if cid:
                     self.rq.put((cid, self2.data))
+                    self._notify()
 
             def handleClose(self2):
                 self.connections.pop(self2, None)
                 self.connections_endpoints.pop(self2.address, None)
                 print('client gone. {}'.format(self2.address))
 
-        self.s = SimpleWebSocketServer(ip, port, MyWsApp)
+        # outgoing messages wake the server up, no need to poll select periodically
+        self.s = SimpleWebSocketServer(ip, port, MyWsApp, selectInterval=None)
         t = threading.Thread(target=self.s.serveforever)
         t.daemon = True
         t.start()
         print('server listens on ("{}", {}) transport websocket'.format(ip, port))
 
     def update(self, timeout=0.001):
-        time.sleep(timeout)
-        return self.recv()
+        try:
+            return self.rq.get(True, timeout)
+        except Empty:
+            return None, None
+
+    def process_events(self, events):
+        for key, _ in events:
+            owner, _ = key.data
+            if owner is self:
+                try:
+                    while self._wakeup_r.recv(4096):
+                        pass
+                except socket.error:
+                    pass
+
+    def prepare_poll(self, timeout):
+        return timeout
+
+    def pause_reading(self):
+        """
+        Stop reading from all clients, they will be blocked by tcp flow control once the kernel buffers are full.
+        Sending is not affected.
+        """
+
+        if self.s is not None:
+            self.s.pause_reading()
+
+    def resume_reading(self):
+        if self.s is not None:
+            self.s.resume_reading()
+
+    def _notify(self):
+        if self._wakeup_w is not None:
+            try:
+                self._wakeup_w.send(b'\0')
+            except socket.error:
+                pass
 
     def recv(self):
         try:
@@ -79,6 +133,12 @@ class WsSocket(Transport):
             if conn:
                 conn.sendMessage(data)
 
+    def get_connection_ids(self):
+        return list(self.connections.values())
+
+    def get_active_connection_ids(self):
+        return self.get_connection_ids()
+
     def get_connection(self, cid_):
         for conn, cid in self.connections.items():
             if cid == cid_:
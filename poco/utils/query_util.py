@@ -10,6 +10,7 @@ __all__ = ['query_expr']
 TranslatePred = {
     'attr=': '=',
     'attr.*=': ' matches ',
+    'spatial': '=',
 }
 
 
@@ -25,6 +26,13 @@ TranslateOp = {
 
 ComparableTypes = six.integer_types + six.string_types + (six.binary_type, bool, float)
 
+# spatial predicates on the bounding box and the number of their coordinates, see poco.sdk.DefaultMatcher
+SpatialPredicates = {
+    'inside': 4,  # (x0, y0, x1, y1)
+    'containsPoint': 2,  # (x, y)
+    'nearest': 2,  # (x, y)
+}
+
 
 def query_expr(query):
     op = query[0]
@@ -60,6 +68,12 @@ def build_query(name, **attrs):
         name = ensure_text(name)
         attrs['name'] = name
     for attr_name, attr_val in attrs.items():
+        if attr_name in SpatialPredicates:
+            if not isinstance(attr_val, (list, tuple)) or len(attr_val) != SpatialPredicates[attr_name]:
+                raise ValueError('Spatial predicate "{}" should be a {}-tuple of coordinates. Got {}'
+                                 .format(attr_name, SpatialPredicates[attr_name], repr(attr_val)))
+            query.append(('spatial', (attr_name, tuple(float(v) for v in attr_val))))
+            continue
         if not isinstance(attr_val, ComparableTypes):
             raise ValueError('Selector value should be one of the following types "{}". Got {}'
                              .format(ComparableTypes, type(attr_val)))
@@ -0,0 +1,194 @@
+# coding=utf-8
+
+"""
+Asyncio client of the std rpc protocol (python 3.5+). Unlike :py:class:`RpcClient <poco.utils.simplerpc.rpcclient.RpcClient>`
+it needs no thread nor polling, so that one event loop can talk to many devices concurrently.
+
+Examples:
+    ::
+
+        client = AsyncRpcClient(AsyncTcpTransport(('localhost', 15004)))
+        await client.connect()
+        hierarchy = await client.call('Dump', True)
+"""
+
+import asyncio
+import struct
+import uuid
+
+from poco.utils import jsoncodec
+from poco.utils.simplerpc.simplerpc import RpcConnectionError, RpcTimeoutError
+from poco.utils.simplerpc.transport.tcp.main import UNIX_SCHEME
+from poco.utils.simplerpc.transport.tcp.protocol import SimpleProtocolFilter
+from poco.utils.simplerpc.utils import RemoteError
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+# get_running_loop is only available since python 3.7, get_event_loop is deprecated inside coroutines since then
+_get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+__all__ = ['AsyncTcpTransport', 'AsyncWsTransport', 'AsyncRpcClient']
+
+
+class AsyncTcpTransport(object):
+    """
+    Length-prefixed packets over tcp, the same as :py:class:`TcpClient <poco.utils.simplerpc.transport.tcp.TcpClient>`.
+    ``addr`` is a ``(host, port)`` tuple or the path of a unix domain socket.
+    """
+
+    HEADER_SIZE = 4
+
+    def __init__(self, addr):
+        super(AsyncTcpTransport, self).__init__()
+        if isinstance(addr, str) and addr.startswith(UNIX_SCHEME):
+            addr = addr[len(UNIX_SCHEME):]
+        self.addr = addr
+        self.reader = None
+        self.writer = None
+
+    def __str__(self):
+        if isinstance(self.addr, str):
+            return UNIX_SCHEME + self.addr
+        return 'tcp://{}:{}'.format(*self.addr)
+    __repr__ = __str__
+
+    async def connect(self):
+        if isinstance(self.addr, str):
+            self.reader, self.writer = await asyncio.open_unix_connection(self.addr)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(*self.addr)
+
+    async def send(self, data):
+        self.writer.write(SimpleProtocolFilter.pack(data))
+        await self.writer.drain()
+
+    async def recv(self):
+        header = await self.reader.readexactly(self.HEADER_SIZE)
+        length = struct.unpack('i', header)[0]
+        return await self.reader.readexactly(length)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class AsyncWsTransport(object):
+    """
+    Messages over websocket. Requires the optional `websockets <https://pypi.org/project/websockets/>`_ package.
+    """
+
+    def __init__(self, url):
+        super(AsyncWsTransport, self).__init__()
+        self.url = url
+        self.ws = None
+
+    def __str__(self):
+        return self.url
+    __repr__ = __str__
+
+    async def connect(self):
+        if websockets is None:
+            raise RuntimeError('Package "websockets" is required by AsyncWsTransport. Please install it first.')
+        self.ws = await websockets.connect(self.url, max_size=None)
+
+    async def send(self, data):
+        await self.ws.send(data)
+
+    async def recv(self):
+        return await self.ws.recv()
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+            self.ws = None
+
+
+class AsyncRpcClient(object):
+    """
+    Args:
+        transport: :py:class:`AsyncTcpTransport` or :py:class:`AsyncWsTransport`
+        timeout (:obj:`float`): seconds to wait for each response, the same as
+         :py:func:`sync_wrapper <poco.utils.simplerpc.utils.sync_wrapper>`
+    """
+
+    def __init__(self, transport, timeout=30):
+        super(AsyncRpcClient, self).__init__()
+        self.transport = transport
+        self.timeout = timeout
+        self._pending = {}  # rid -> future
+        self._reader = None
+
+    def __str__(self):
+        return 'AsyncRpcClient at "{}"'.format(self.transport)
+    __repr__ = __str__
+
+    async def connect(self):
+        await self.transport.connect()
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        await self.transport.close()
+        self._fail_pending(RpcConnectionError('Rpc Connection Closed'))
+
+    async def call(self, func, *args, **kwargs):
+        """
+        Call the remote method and return its result.
+
+        Raises:
+            RemoteError: when the remote method raises
+            RpcTimeoutError: when no response arrives in time
+            RpcConnectionError: when the connection is not established or lost
+        """
+
+        if self._reader is None:
+            raise RpcConnectionError('Rpc Connection Closed')
+
+        rid = str(uuid.uuid4())
+        payload = {
+            "method": func,
+            "params": args or kwargs or [],
+            "jsonrpc": "2.0",
+            "id": rid,
+        }
+        future = _get_running_loop().create_future()
+        self._pending[rid] = future
+        try:
+            await self.transport.send(jsoncodec.dumps(payload))
+            res = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise RpcTimeoutError('{} (rid={}) (connection="{}")'.format(func, rid, self.transport))
+        finally:
+            self._pending.pop(rid, None)
+
+        if 'error' in res:
+            raise RemoteError(res['error']['message'])
+        return res.get('result')
+
+    async def _read_loop(self):
+        try:
+            while True:
+                packet = jsoncodec.loads(await self.transport.recv())
+                if 'method' in packet:
+                    # requests from the remote side are not served by this client
+                    continue
+                future = self._pending.get(packet.get('id'))
+                if future is not None and not future.done():
+                    future.set_result(packet)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._reader = None
+            self._fail_pending(RpcConnectionError('Rpc Connection Closed. {}'.format(e)))
+
+    def _fail_pending(self, error):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
@@ -0,0 +1,132 @@
+# coding=utf-8
+
+import socket
+import threading
+import traceback
+
+from poco.utils import six
+from poco.utils.net.socketpair import socketpair
+
+if six.PY3:
+    import selectors
+else:
+    import selectors2 as selectors
+
+
+__all__ = ['RpcHub']
+
+
+class RpcHub(object):
+    """
+    Receive for many :py:class:`RpcClient <poco.utils.simplerpc.rpcclient.RpcClient>` over
+    :py:class:`TcpClient <poco.utils.simplerpc.transport.tcp.TcpClient>` in one thread, multiplexed by one
+    :py:mod:`selectors` selector. Callers keep the synchronous api, waiting on a call blocks until the hub thread
+    receives the response instead of polling the connection, so that many clients in one process cost no cpu while
+    idle.
+
+    Examples:
+        ::
+
+            hub = RpcHub()
+            pocos = [StdPoco(port, device, hub=hub) for port, device in ...]
+
+    Args:
+        RX_SIZE (:obj:`int`): max bytes to read from a socket each time it is readable
+    """
+
+    def __init__(self, RX_SIZE=65536):
+        super(RpcHub, self).__init__()
+        self.RX_SIZE = RX_SIZE
+        self.selector = selectors.DefaultSelector()
+        self.clients = set()
+        self.lock = threading.Lock()
+
+        # sockets are (un)registered from the caller threads, wake the hub thread up so that it selects on the new set
+        self._wakeup_r, self._wakeup_w = socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self.selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+
+        self.t = threading.Thread(target=self.loop, name='RpcHub')
+        self.t.daemon = True
+        self.t.start()
+
+    def add(self, client):
+        """
+        Let the hub receive for the client from now on, even after it reconnects.
+        """
+
+        if not hasattr(client.conn, 'prot'):
+            raise TypeError('RpcHub only supports clients over TcpClient. Got {}'.format(repr(client.conn)))
+        client.hub = self
+        with self.lock:
+            self.clients.add(client)
+        if client._status == client.CONNECTED:
+            self.watch(client)
+
+    def remove(self, client):
+        self.unwatch(client)
+        with self.lock:
+            self.clients.discard(client)
+        client.hub = None
+
+    def watch(self, client):
+        sock = client.conn.c.sock
+        with self.lock:
+            try:
+                self.selector.register(sock, selectors.EVENT_READ, client)
+            except KeyError:
+                self.selector.modify(sock, selectors.EVENT_READ, client)
+        self._wakeup()
+
+    def unwatch(self, client):
+        c = client.conn.c
+        if c is None or c.sock is None:
+            return
+        with self.lock:
+            try:
+                self.selector.unregister(c.sock)
+            except (KeyError, ValueError):
+                pass
+        self._wakeup()
+
+    def _wakeup(self):
+        if threading.current_thread() is self.t:
+            return
+        try:
+            self._wakeup_w.send(b'\0')
+        except socket.error:
+            pass
+
+    def loop(self):
+        while True:
+            self.update()
+
+    def update(self, timeout=None):
+        for key, _ in self.selector.select(timeout):
+            client = key.data
+            if client is None:
+                try:
+                    while self._wakeup_r.recv(4096):
+                        pass
+                except socket.error:
+                    pass
+                continue
+
+            try:
+                data = key.fileobj.recv(self.RX_SIZE)
+            except socket.timeout:
+                continue
+            except socket.error:
+                data = b''
+            if not data:
+                # connection lost
+                self.unwatch(client)
+                client.on_close()
+                continue
+
+            for msg in client.conn.prot.input(data):
+                try:
+                    client.handle_message(msg, client.conn)
+                except Exception:
+                    traceback.print_exc()
@@ -1,6 +1,6 @@
 """ JSON-RPC Exceptions."""
 from . import six
-import json
+from poco.utils import jsoncodec
 
 
 class JSONRPCError(object):
@@ -34,8 +34,8 @@ class JSONRPCError(object):
 
     """
 
-    serialize = staticmethod(json.dumps)
-    deserialize = staticmethod(json.loads)
+    serialize = staticmethod(jsoncodec.dumps)
+    deserialize = staticmethod(jsoncodec.loads)
 
     def __init__(self, code=None, message=None, data=None):
         self._data = dict()
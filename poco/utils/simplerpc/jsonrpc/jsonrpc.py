@@ -17,8 +17,11 @@ class JSONRPCRequest(JSONSerializable):
 
     @classmethod
     def from_json(cls, json_str):
-        data = cls.deserialize(json_str)
+        return cls.from_data(cls.deserialize(json_str))
+
+    @classmethod
+    def from_data(cls, data):
         if isinstance(data, dict) and "jsonrpc" not in data:
-            return JSONRPC10Request.from_json(json_str)
+            return JSONRPC10Request.from_data(data)
         else:
-            return JSONRPC20Request.from_json(json_str)
+            return JSONRPC20Request.from_data(data)
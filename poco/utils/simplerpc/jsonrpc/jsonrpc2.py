@@ -1,6 +1,4 @@
-﻿import json
-
-from . import six
+﻿from . import six
 from .base import JSONRPCBaseRequest, JSONRPCBaseResponse
 from .exceptions import JSONRPCError, JSONRPCInvalidRequestException
 
@@ -108,8 +106,10 @@ class JSONRPC20Request(JSONRPCBaseRequest):
 
     @classmethod
     def from_json(cls, json_str):
-        data = cls.deserialize(json_str)
+        return cls.from_data(cls.deserialize(json_str))
 
+    @classmethod
+    def from_data(cls, data):
         is_batch = isinstance(data, list)
         data = data if is_batch else [data]
 
@@ -156,9 +156,13 @@ class JSONRPC20BatchRequest(object):
     def from_json(cls, json_str):
         return JSONRPC20Request.from_json(json_str)
 
+    @classmethod
+    def from_data(cls, data):
+        return JSONRPC20Request.from_data(data)
+
     @property
     def json(self):
-        return json.dumps([r.data for r in self.requests])
+        return JSONRPC20Request.serialize([r.data for r in self.requests])
 
     def __iter__(self):
         return iter(self.requests)
@@ -243,6 +247,18 @@ class JSONRPC20Response(JSONRPCBaseResponse):
 
         self._data["id"] = value
 
+    @classmethod
+    def from_valid_data(cls, data):
+        """ Build the response from data known to be valid, without the
+        validation done by the setters.
+
+        :param dict data: response data including "jsonrpc" and "id".
+
+        """
+        response = cls.__new__(cls)
+        response._data = data
+        return response
+
 
 class JSONRPC20BatchResponse(object):
 
@@ -257,7 +273,7 @@ class JSONRPC20BatchResponse(object):
 
     @property
     def json(self):
-        return json.dumps(self.data)
+        return JSONRPC20Response.serialize(self.data)
 
     def __iter__(self):
         return iter(self.responses)
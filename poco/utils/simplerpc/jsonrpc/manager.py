@@ -1,4 +1,3 @@
-import json
 # import logging
 from .utils import is_invalid_params
 from .exceptions import (
@@ -14,8 +13,10 @@ from .jsonrpc1 import JSONRPC10Response
 from .jsonrpc2 import (
     JSONRPC20BatchRequest,
     JSONRPC20BatchResponse,
+    JSONRPC20Request,
     JSONRPC20Response,
 )
+from . import six
 from .jsonrpc import JSONRPCRequest
 
 # logger = logging.getLogger(__name__)
@@ -43,21 +44,91 @@ class JSONRPCResponseManager(object):
 
     @classmethod
     def handle(cls, request_str, dispatcher):
-        if isinstance(request_str, bytes):
-            request_str = request_str.decode("utf-8")
-
         try:
-            json.loads(request_str)
+            data = JSONRPCRequest.deserialize(request_str)
         except (TypeError, ValueError):
             return JSONRPC20Response(error=JSONRPCParseError()._data)
 
+        return cls.handle_data(data, dispatcher)
+
+    @classmethod
+    def handle_data(cls, data, dispatcher):
+        """ Handle request data already parsed from json, so that callers
+        that have parsed the message need not serialize and parse it again.
+
+        :param data: parsed request, dict or list for a batch.
+        :param jsonrpc.dispatcher.Dispatcher dispatcher:
+
+        """
+        response = cls._handle_fast(data, dispatcher)
+        if response is not None:
+            return response
+
         try:
-            request = JSONRPCRequest.from_json(request_str)
+            request = JSONRPCRequest.from_data(data)
         except JSONRPCInvalidRequestException:
             return JSONRPC20Response(error=JSONRPCInvalidRequest()._data)
 
         return cls.handle_request(request, dispatcher)
 
+    @classmethod
+    def _handle_fast(cls, data, dispatcher):
+        """ Fast path for the common case: a single JSON-RPC 2.0 call (not a
+        notification) of a known method. The response is built directly from
+        the parsed data, without request and response objects.
+
+        :return JSONRPC20Response: or None if the request has to go through
+            the general path, e.g. it is a batch, a notification, invalid or
+            the method is not found.
+
+        """
+        if type(data) is not dict or data.get("jsonrpc") != "2.0" \
+                or "id" not in data \
+                or not JSONRPC20Request.POSSIBLE_FIELDS.issuperset(data):
+            return None
+
+        _id = data["id"]
+        method_name = data.get("method")
+        params = data.get("params")
+        if (_id is not None and not isinstance(
+                _id, six.string_types + six.integer_types)) \
+                or not isinstance(method_name, six.string_types) \
+                or method_name.startswith("rpc.") \
+                or not (params is None or isinstance(params, (list, dict))):
+            return None
+
+        method_map = getattr(dispatcher, "method_map", dispatcher)
+        method = method_map.get(method_name)
+        if method is None:
+            return None
+
+        args = params if isinstance(params, list) else ()
+        kwargs = params if isinstance(params, dict) else {}
+        output = {"jsonrpc": "2.0", "id": _id}
+        try:
+            output["result"] = method(*args, **kwargs)
+        except JSONRPCDispatchException as e:
+            output["error"] = e.error._data
+        except Exception as e:
+            output["error"] = cls._exception_error(e, method, args, kwargs)
+        return JSONRPC20Response.from_valid_data(output)
+
+    @classmethod
+    def _exception_error(cls, e, method, args, kwargs):
+        """ Error data of the exception raised by the method."""
+        data = {
+            "type": e.__class__.__name__,
+            "args": e.args,
+            "message": str(e),
+        }
+        if isinstance(e, TypeError) and is_invalid_params(
+                method, *args, **kwargs):
+            return JSONRPCInvalidParams(data=data)._data
+        else:
+            # logger.exception("API Exception: {0}".format(data))
+            print("API Exception: {0}".format(data))
+            return JSONRPCServerError(data=data)._data
+
     @classmethod
     def handle_request(cls, request, dispatcher):
         """ Handle request data.
@@ -109,20 +180,8 @@ class JSONRPCResponseManager(object):
                 except JSONRPCDispatchException as e:
                     output = response(error=e.error._data)
                 except Exception as e:
-                    data = {
-                        "type": e.__class__.__name__,
-                        "args": e.args,
-                        "message": str(e),
-                    }
-                    if isinstance(e, TypeError) and is_invalid_params(
-                            method, *request.args, **request.kwargs):
-                        output = response(
-                            error=JSONRPCInvalidParams(data=data)._data)
-                    else:
-                        # logger.exception("API Exception: {0}".format(data))
-                        print("API Exception: {0}".format(data))
-                        output = response(
-                            error=JSONRPCServerError(data=data)._data)
+                    output = response(error=cls._exception_error(
+                        e, method, request.args, request.kwargs))
                 else:
                     output = response(result=result)
             finally:
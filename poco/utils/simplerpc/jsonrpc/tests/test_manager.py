@@ -73,6 +73,16 @@ class TestJSONRPCResponseManager(unittest.TestCase):
         self.assertEqual(response.error["message"], "Invalid Request")
         self.assertEqual(response.error["code"], -32600)
 
+    def test_handle_data_same_as_general_path(self):
+        for method, params in [("multiply", [2, 3]), ("101_base", {"base": 2}),
+                               ("error", None), ("dispatch_error", ["x"])]:
+            data = JSONRPC20Request(method, params, _id=1).data
+            response = JSONRPCResponseManager.handle_data(data, self.dispatcher)
+            expected = JSONRPCResponseManager.handle_request(
+                JSONRPC20Request.from_data(data), self.dispatcher)
+            self.assertTrue(isinstance(response, JSONRPC20Response))
+            self.assertEqual(response.data, expected.data)
+
     def test_method_not_found(self):
         request = JSONRPC20Request("does_not_exist", [[]], _id=0)
         response = JSONRPCResponseManager.handle(request.json, self.dispatcher)
@@ -6,14 +6,15 @@ import json
 from abc import ABCMeta, abstractmethod
 
 from . import six
+from poco.utils import jsoncodec
 
 
 class JSONSerializable(six.with_metaclass(ABCMeta, object)):
 
     """ Common functionality for json serializable objects."""
 
-    serialize = staticmethod(json.dumps)
-    deserialize = staticmethod(json.loads)
+    serialize = staticmethod(jsoncodec.dumps)
+    deserialize = staticmethod(jsoncodec.loads)
 
     @abstractmethod
     def json(self):
@@ -21,8 +22,10 @@ class JSONSerializable(six.with_metaclass(ABCMeta, object)):
 
     @classmethod
     def from_json(cls, json_str):
-        data = cls.deserialize(json_str)
+        return cls.from_data(cls.deserialize(json_str))
 
+    @classmethod
+    def from_data(cls, data):
         if not isinstance(data, dict):
             raise ValueError("data should be dict")
 
@@ -16,11 +16,14 @@ class RpcClient(RpcAgent):
         self.conn = conn
         self.conn.connect_cb = self.on_connect
         self.conn.close_cb = self.on_close
+        self.hub = None  # RpcHub receiving for this client, see RpcHub.add
 
     def connect(self, timeout=10):
         self._status = self.CONNECTING
         self.conn.connect()
         self._wait_connected(timeout)
+        if self.hub is not None:
+            self.hub.watch(self)
 
     def get_connection(self):
         return self.conn
@@ -41,6 +44,8 @@ class RpcClient(RpcAgent):
         raise RpcConnectionError("Connecting Timeout")
 
     def close(self):
+        if self.hub is not None:
+            self.hub.unwatch(self)
         self.conn.close()
         self._status = self.CLOSED
 
@@ -52,14 +57,24 @@ class RpcClient(RpcAgent):
     def on_close(self):
         print("[rpc]closed")
         self._status = self.CLOSED
+        # responses of the pending calls will never arrive
+        callbacks, self._callbacks = self._callbacks, {}
+        for cb in callbacks.values():
+            cb.connection_lost("Rpc Connection Closed")
 
     def call(self, func, *args, **kwargs):
+        if self._status == self.CLOSED:
+            raise RpcConnectionError("Rpc Connection Closed")
         msg, cb = self.format_request(func, *args, **kwargs)
         self.conn.send(msg)
+        if self._status == self.CLOSED and cb.status == cb.WAITING:
+            # closed while sending, on_close may have missed the callback
+            self._callbacks.pop(cb.rid, None)
+            cb.connection_lost("Rpc Connection Closed")
         return cb
 
     def update(self):
-        if self._status != self.CONNECTED:
+        if self._status != self.CONNECTED or self.hub is not None:
             return
         data = self.conn.recv()
         if not data:
@@ -74,3 +89,57 @@ class RpcClient(RpcAgent):
     @DEBUG.setter
     def DEBUG(self, value):
         simplerpc.DEBUG = value
+
+
+class LaneRpcClient(object):
+    """
+    Route calls over two :py:class:`RpcClient` by method name, so that small calls (input, attributes) never wait
+    behind the multi-MB responses of bulk calls (Dump, Screenshot) on the same connection.
+
+    Bulk calls go through the ``bulk`` client when it is connected and through the ``primary`` client otherwise, e.g.
+    when the server does not accept a second connection.
+    """
+
+    BULK_METHODS = ('Dump', 'Screenshot')
+
+    def __init__(self, primary, bulk, bulk_methods=BULK_METHODS):
+        super(LaneRpcClient, self).__init__()
+        self.primary = primary
+        self.bulk = bulk
+        self.bulk_methods = set(bulk_methods)
+
+    def connect(self, timeout=10):
+        self.primary.connect(timeout)
+        try:
+            self.bulk.connect(timeout)
+        except Exception as e:
+            print("[rpc]bulk lane unavailable, all calls go through the primary connection. {}".format(e))
+
+    def close(self):
+        self.primary.close()
+        if self.bulk._status == self.bulk.CONNECTED:
+            self.bulk.close()
+
+    def get_connection(self):
+        return self.primary.get_connection()
+
+    def call(self, func, *args, **kwargs):
+        if func in self.bulk_methods and self.bulk._status == self.bulk.CONNECTED:
+            try:
+                return self.bulk.call(func, *args, **kwargs)
+            except Exception as e:
+                print("[rpc]bulk lane failed, fall back to the primary connection. {}".format(e))
+        return self.primary.call(func, *args, **kwargs)
+
+    def update(self):
+        self.primary.update()
+        if self.bulk._status == self.bulk.CONNECTED:
+            self.bulk.update()
+
+    @property
+    def DEBUG(self):
+        return self.primary.DEBUG
+
+    @DEBUG.setter
+    def DEBUG(self, value):
+        self.primary.DEBUG = value
@@ -3,7 +3,7 @@
 # @Email:  gzliuxin@corp.netease.com
 # @Date:   2017-07-12 16:56:14
 
-import json
+import threading
 import time
 import traceback
 import uuid
@@ -12,6 +12,7 @@ from .jsonrpc import JSONRPCResponseManager, dispatcher
 from .jsonrpc.jsonrpc2 import JSONRPC20Response
 from .jsonrpc.exceptions import JSONRPCServerError
 from .jsonrpc import six
+from poco.utils import jsoncodec
 
 
 DEBUG = False
@@ -32,6 +33,11 @@ class Callback(object):
         self.status = self.WAITING
         self.result = None
         self.error = None
+        self.exception = None  # raised by wait, e.g. when the connection is lost before the response arrives
+
+        # set once the status is no longer WAITING. waited on instead of polling when responses are received by another
+        # thread, see RpcHub
+        self.done = threading.Event()
 
     def on_result(self, func):
         if not callable(func):
@@ -52,6 +58,7 @@ class Callback(object):
             except Exception:
                 traceback.print_exc()
         self.status = self.RESULT
+        self.done.set()
 
     def rpc_error(self, data):
         self.error = data
@@ -61,13 +68,28 @@ class Callback(object):
             except Exception:
                 traceback.print_exc()
         self.status = self.ERROR
+        self.done.set()
+
+    def connection_lost(self, reason):
+        self.exception = RpcConnectionError('{}. {}'.format(reason, self))
+        self.status = self.ERROR
+        self.done.set()
 
     def cancel(self):
         self.result_callback = None
         self.error_callback = None
         self.status = self.CANCELED
+        self.done.set()
 
     def wait(self, timeout=None):
+        if getattr(self.agent, 'hub', None) is not None:
+            # the response is received by the hub thread
+            if not self.done.wait(timeout):
+                raise RpcTimeoutError(self)
+            if self.exception is not None:
+                raise self.exception
+            return self.result, self.error
+
         start_time = time.time()
         while True:
             if not BACKEND_UPDATE:
@@ -78,6 +100,8 @@ class Callback(object):
                     raise RpcTimeoutError(self)
             else:
                 break
+        if self.exception is not None:
+            raise self.exception
         return self.result, self.error
 
     def __str__(self):
@@ -142,7 +166,7 @@ class RpcAgent(object):
         }
         self._id = six.text_type(uuid.uuid4())  # prepare next request id
         # send rpc
-        req = json.dumps(payload)
+        req = jsoncodec.dumps(payload)
         if DEBUG:
             print("-->", req)
         # init cb
@@ -151,27 +175,25 @@ class RpcAgent(object):
         return req, cb
 
     def handle_request(self, req):
-        res = JSONRPCResponseManager.handle(req, dispatcher).data
+        """req is the request already parsed from json"""
+        res = JSONRPCResponseManager.handle_data(req, dispatcher).data
         return res
 
     def handle_message(self, msg, conn):
-        if isinstance(msg, six.binary_type):
-            # py3里 json 只接受str类型，py2没有这个限制
-            msg = msg.decode('utf-8')
-        data = json.loads(msg)
+        data = jsoncodec.loads(msg)
         if DEBUG:
             print("<--", data)
         if "method" in data:
             # rpc request
             message_type = self.REQUEST
-            result = self.handle_request(msg)
+            result = self.handle_request(data)
 
             if isinstance(result.get("result"), AsyncResponse):
                 result["result"].setup(conn, result["id"])
             else:
                 # if DEBUG:
                 #     print("-->", result)
-                conn.send(json.dumps(result))
+                conn.send(jsoncodec.dumps(result))
 
         else:
             # rpc response
@@ -3,20 +3,29 @@
 from ..interfaces import IClient
 from .safetcp import Client, socket
 from .protocol import SimpleProtocolFilter
+from poco.utils import six
 
 
 DEFAULT_ADDR = ("0.0.0.0", 5001)
+UNIX_SCHEME = 'unix://'
 
 
 class TcpClient(IClient):
-    """docstring for TcpClient"""
+    """
+    Client over tcp. ``addr`` is a ``(host, port)`` tuple, or the path of a unix domain socket (optionally as a
+    ``unix://`` url) to skip the loopback network stack when the server is on the same host.
+    """
     def __init__(self, addr=DEFAULT_ADDR):
         super(TcpClient, self).__init__()
+        if isinstance(addr, six.string_types) and addr.startswith(UNIX_SCHEME):
+            addr = addr[len(UNIX_SCHEME):]
         self.addr = addr
         self.prot = SimpleProtocolFilter()
         self.c = None
 
     def __str__(self):
+        if isinstance(self.addr, six.string_types):
+            return UNIX_SCHEME + self.addr
         return 'tcp://{}:{}'.format(*self.addr)
     __repr__ = __str__
 
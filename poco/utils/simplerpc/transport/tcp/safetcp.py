@@ -9,7 +9,7 @@ DEFAULT_SIZE = 4096
 class Client(object):
     """safe and exact recv & send"""
     def __init__(self, address, on_connect=None, on_close=None):
-        """address is (host, port) tuple"""
+        """address is (host, port) tuple, or the path of a unix domain socket"""
         self.address = address
         self.on_connect = on_connect
         self.on_close = on_close
@@ -18,7 +18,10 @@ class Client(object):
 
     def connect(self):
         # create a new socket every time
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if isinstance(self.address, (tuple, list)):
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         self.sock.settimeout(DEFAULT_TIMEOUT)
         self.sock.connect(self.address)
         self._handle_connect()
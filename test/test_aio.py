@@ -0,0 +1,125 @@
+# coding=utf-8
+
+import asyncio
+import struct
+import unittest
+
+from poco.utils import jsoncodec
+from poco.utils.simplerpc.aio import AsyncRpcClient, AsyncTcpTransport
+from poco.utils.simplerpc.simplerpc import RpcConnectionError
+from poco.utils.simplerpc.transport.tcp.protocol import SimpleProtocolFilter
+from poco.utils.simplerpc.utils import RemoteError
+
+
+class Device(object):
+    """
+    Std rpc server side, the test decides when and how each response is written.
+    """
+
+    async def start(self):
+        self.connections = asyncio.Queue()
+        self.server = await asyncio.start_server(self._accept, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _accept(self, reader, writer):
+        await self.connections.put((reader, writer))
+
+    @staticmethod
+    async def read_request(reader):
+        header = await reader.readexactly(4)
+        return jsoncodec.loads(await reader.readexactly(struct.unpack('i', header)[0]))
+
+    @staticmethod
+    def response(req, result):
+        return SimpleProtocolFilter.pack(jsoncodec.dumps({'id': req['id'], 'jsonrpc': '2.0', 'result': result}))
+
+
+class TestAsyncRpcClient(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.device = Device()
+        addr = self.run_async(self.device.start())
+        self.client = AsyncRpcClient(AsyncTcpTransport(addr), timeout=5)
+        self.run_async(self.client.connect())
+        self.reader, self.writer = self.run_async(self.device.connections.get())
+
+    def tearDown(self):
+        self.run_async(self.client.close())
+        self.writer.close()
+        self.run_async(self.device.stop())
+        self.loop.close()
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(asyncio.wait_for(coro, 10))
+
+    def test_concurrent_calls_answered_out_of_order(self):
+        async def serve():
+            requests = [await Device.read_request(self.reader) for _ in range(3)]
+            for req in reversed(requests):
+                self.writer.write(Device.response(req, req['method'] + '-result'))
+            await self.writer.drain()
+
+        async def play():
+            calls = asyncio.gather(self.client.call('A'), self.client.call('B'), self.client.call('C'))
+            results, _ = await asyncio.gather(calls, serve())
+            return results
+
+        self.assertEqual(self.run_async(play()), ['A-result', 'B-result', 'C-result'])
+        self.assertEqual(self.client._pending, {})
+
+    def test_packet_split_across_reads(self):
+        result = {'name': u'按钮', 'children': [{'name': 'child-{}'.format(i)} for i in range(100)]}
+
+        async def serve():
+            req = await Device.read_request(self.reader)
+            data = Device.response(req, result)
+            # header split in the middle, then the body in small chunks
+            for i in range(0, len(data), 3):
+                self.writer.write(data[i:i + 3])
+                await self.writer.drain()
+                await asyncio.sleep(0)
+
+        async def play():
+            res, _ = await asyncio.gather(self.client.call('Dump', True), serve())
+            return res
+
+        self.assertEqual(self.run_async(play()), result)
+
+    def test_remote_error(self):
+        async def serve():
+            req = await Device.read_request(self.reader)
+            self.writer.write(SimpleProtocolFilter.pack(jsoncodec.dumps(
+                {'id': req['id'], 'jsonrpc': '2.0', 'error': {'message': 'boom'}})))
+            await self.writer.drain()
+
+        async def play():
+            await asyncio.gather(self.client.call('Click', 0.5, 0.5), serve())
+
+        with self.assertRaises(RemoteError):
+            self.run_async(play())
+
+    def test_pending_call_fails_when_connection_closes(self):
+        async def serve():
+            await Device.read_request(self.reader)
+            await Device.read_request(self.reader)
+            self.writer.close()
+
+        async def play():
+            calls = [asyncio.ensure_future(self.client.call(name)) for name in ('A', 'B')]
+            await serve()
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        errors = self.run_async(play())
+        self.assertEqual([type(e) for e in errors], [RpcConnectionError, RpcConnectionError])
+
+        # no more calls are accepted on the closed connection
+        with self.assertRaises(RpcConnectionError):
+            self.run_async(self.client.call('A'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+# coding=utf-8
+
+import unittest
+
+from hrpc.exceptions import RpcRemoteException
+
+from poco.utils.hrpc.hierarchy import RemotePocoHierarchy
+
+
+class RemoteNode(object):
+    def __init__(self, uri, **attrs):
+        self._uri__ = uri
+        self._invocation_path__ = ''
+        self.attrs = attrs
+
+
+class Attributor(object):
+    """
+    Remote attributor answering from the attributes of the nodes, raising NodeHasBeenRemoved for removed ones
+    """
+
+    def getAttr(self, node, name):
+        if node.attrs.get('removed'):
+            raise RpcRemoteException({'session_id': 's', 'id': 1, 'errors': {
+                'type': 'NodeHasBeenRemovedException', 'tb': '', 'message': node._uri__, 'stack': ''}})
+        return node.attrs[name]
+
+
+class TestRemotePocoHierarchyResolve(unittest.TestCase):
+    def setUp(self):
+        self.hierarchy = RemotePocoHierarchy(None, None, Attributor())
+
+    def test_resolve_visible_node(self):
+        node = RemoteNode('shown', visible=True)
+        self.assertEqual(self.hierarchy.resolve(node), [node])
+
+    def test_resolve_hidden_node(self):
+        self.assertEqual(self.hierarchy.resolve(RemoteNode('hidden', visible=False)), [])
+
+    def test_resolve_removed_node(self):
+        self.assertEqual(self.hierarchy.resolve(RemoteNode('removed', removed=True)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# coding=utf-8
+
+import json
+import sys
+import unittest
+
+from poco.utils import jsoncodec
+from poco.utils import six
+
+try:
+    from importlib import reload
+except ImportError:
+    pass
+
+
+def installed(name):
+    return getattr(jsoncodec, name) is not None
+
+
+BACKENDS = ['json'] + [name for name in ('orjson', 'ujson') if installed(name)]
+
+VALUES = [
+    {'id': 1, 'jsonrpc': '2.0', 'method': 'Dump', 'params': [True]},
+    {'result': [{'name': u'按钮', 'pos': [0.5, 0.25], 'visible': False, 'text': None}], 'url': 'a/b'},
+    {'big': 2 ** 70, 'small': -2 ** 70},
+    {1: 'int key', 'nested': {2.5: 'float key'}},
+    [],
+    u'',
+]
+
+
+class TestJsonCodec(unittest.TestCase):
+    def setUp(self):
+        self.default = jsoncodec.get_backend()
+
+    def tearDown(self):
+        jsoncodec.set_backend(self.default)
+
+    def test_default_backend(self):
+        if installed('orjson'):
+            self.assertEqual(self.default, 'orjson')
+        elif installed('ujson'):
+            self.assertEqual(self.default, 'ujson')
+        else:
+            self.assertEqual(self.default, 'json')
+
+    def test_same_as_json(self):
+        for backend in BACKENDS:
+            jsoncodec.set_backend(backend)
+            for value in VALUES:
+                data = jsoncodec.dumps(value)
+                self.assertIsInstance(data, six.text_type, backend)
+                expected = json.loads(json.dumps(value))
+                self.assertEqual(json.loads(data), expected, (backend, value))
+                self.assertEqual(jsoncodec.loads(data), expected, (backend, value))
+                self.assertEqual(jsoncodec.loads(data.encode('utf-8')), expected, (backend, value))
+
+    def test_loads_what_only_json_accepts(self):
+        for backend in BACKENDS:
+            jsoncodec.set_backend(backend)
+            value = jsoncodec.loads('{"a": NaN, "b": Infinity}')
+            self.assertNotEqual(value['a'], value['a'])
+            self.assertEqual(value['b'], float('inf'))
+
+    def test_set_backend(self):
+        jsoncodec.set_backend('json')
+        self.assertEqual(jsoncodec.get_backend(), 'json')
+        self.assertEqual(jsoncodec.dumps({'a': 1}), json.dumps({'a': 1}))
+        with self.assertRaises(ValueError):
+            jsoncodec.set_backend('simplejson')
+        self.assertEqual(jsoncodec.get_backend(), 'json')
+        for name in ('orjson', 'ujson'):
+            if not installed(name):
+                with self.assertRaises(ValueError):
+                    jsoncodec.set_backend(name)
+
+
+@unittest.skipIf(six.PY2, 'module reloading is only exercised on python 3')
+class TestJsonCodecBackendSelection(unittest.TestCase):
+    def reload_without(self, *names):
+        # a None entry in sys.modules makes the import raise ImportError
+        saved = dict((name, sys.modules.get(name)) for name in names)
+        try:
+            for name in names:
+                sys.modules[name] = None
+            reload(jsoncodec)
+            return jsoncodec.get_backend()
+        finally:
+            for name, module in saved.items():
+                if module is None:
+                    sys.modules.pop(name, None)
+                else:
+                    sys.modules[name] = module
+            reload(jsoncodec)
+
+    def test_falls_back_to_json(self):
+        self.assertEqual(self.reload_without('orjson', 'ujson'), 'json')
+
+    @unittest.skipUnless(installed('ujson'), 'ujson is not installed')
+    def test_ujson_without_orjson(self):
+        self.assertEqual(self.reload_without('orjson'), 'ujson')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+# coding=utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+from poco.agent import PocoAgent
+from poco.drivers.std.hierarchy import StdHierarchy
+from poco.freezeui.hierarchy import FrozenUIHierarchy
+from poco.pocofw import Poco
+from poco.sdk.LocatorHints import LocatorHints
+from poco.sdk.Selector import Selector
+
+from test.test_selector import CountingMatcher, Dumper, attr, node
+
+
+def fixture():
+    return node('root', [0.5, 0.5], [
+        node('panel', [0.5, 0.5], [node('a', [0.1, 0.1]) for _ in range(20)] + [
+            node('hidden', [0.5, 0.5], [node('b', [0.5, 0.5])], visible=False),
+            node('b', [0.9, 0.9]),
+        ]),
+    ], size=(1, 1))
+
+
+class TestLocatorHints(unittest.TestCase):
+    def test_get_set(self):
+        hints = LocatorHints()
+        self.assertIsNone(hints.get(attr('name', 'a')))
+        hints.set(attr('name', 'a'), [0, 1])
+        self.assertEqual(hints.get(attr('name', 'a')), [0, 1])
+        # tuples and lists of the query expression are the same key
+        self.assertEqual(hints.get(['attr=', ['name', 'a']]), [0, 1])
+
+    def test_max_size_drops_earliest(self):
+        hints = LocatorHints(max_size=2)
+        for name in ('a', 'b', 'c'):
+            hints.set(attr('name', name), [0])
+        self.assertIsNone(hints.get(attr('name', 'a')))
+        self.assertEqual(hints.get(attr('name', 'b')), [0])
+        self.assertEqual(hints.get(attr('name', 'c')), [0])
+
+    def test_save_and_load(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'hints.json')
+            hints = LocatorHints(filename)
+            hints.set(attr('name', u'中文'), [0, 3])
+            hints.save()
+            self.assertEqual(LocatorHints(filename).get(attr('name', u'中文')), [0, 3])
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class TestSelectorHints(unittest.TestCase):
+    def setUp(self):
+        self.hints = LocatorHints()
+        self.matcher = CountingMatcher()
+        self.selector = Selector(Dumper(fixture()), self.matcher, hints=self.hints)
+
+    def test_hint_recorded_and_probed(self):
+        query = attr('name', 'b')
+        node = self.selector.select(query)[0]
+        self.assertEqual(node.getAttr('pos'), [0.9, 0.9])
+        self.assertEqual(self.hints.get(query), [0, 21])
+
+        self.matcher.calls = 0
+        self.assertEqual(self.selector.select(query), [node])
+        self.assertTrue(self.selector.exists(query))
+        # each probe matches the hinted node only
+        self.assertEqual(self.matcher.calls, 2)
+
+    def test_stale_hint_is_verified(self):
+        query = attr('name', 'b')
+        self.hints.set(query, [0, 3])
+        self.assertEqual(self.selector.select(query)[0].getAttr('pos'), [0.9, 0.9])
+        self.assertEqual(self.hints.get(query), [0, 21])
+
+    def test_hint_into_invisible_node_is_not_followed(self):
+        query = attr('name', 'b')
+        self.hints.set(query, [0, 20, 0])
+        self.assertEqual(self.selector.select(query)[0].getAttr('pos'), [0.9, 0.9])
+
+    def test_hint_out_of_range(self):
+        query = attr('name', 'b')
+        self.hints.set(query, [0, 99])
+        self.assertEqual(self.selector.select(query)[0].getAttr('pos'), [0.9, 0.9])
+
+    def test_no_match(self):
+        self.assertEqual(self.selector.select(attr('name', 'missing')), [])
+        self.assertFalse(self.selector.exists(attr('name', 'missing')))
+        self.assertIsNone(self.hints.get(attr('name', 'missing')))
+
+    def test_operators_and_multiple_are_not_hinted(self):
+        self.selector.select(('/', (attr('name', 'panel'), attr('name', 'b'))))
+        self.selector.select(attr('name', 'a'), True)
+        self.assertEqual(self.hints.paths, {})
+
+
+class TestPocoLocatorHintsOption(unittest.TestCase):
+    def make_poco(self, hierarchy, hints):
+        agent = PocoAgent(hierarchy, None, None)
+        return Poco(agent, action_interval=0, pre_action_wait_for_appearance=0, locator_hints=hints)
+
+    def test_local_selector_takes_hints(self):
+        hierarchy = FrozenUIHierarchy(Dumper(fixture()))
+        hints = LocatorHints()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.make_poco(hierarchy, hints)
+        self.assertEqual(caught, [])
+        self.assertIs(hierarchy.selector.hints, hints)
+
+    def test_remote_select_warns(self):
+        hierarchy = StdHierarchy(Dumper(fixture()), None, {'Select'})
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.make_poco(hierarchy, LocatorHints())
+        self.assertEqual(len(caught), 1)
+        self.assertIn('locator_hints', str(caught[0].message))
+        self.assertIsNone(hierarchy.selector.hints)
+
+    def test_std_without_remote_select_takes_hints(self):
+        hierarchy = StdHierarchy(Dumper(fixture()), None, set())
+        hints = LocatorHints()
+        self.make_poco(hierarchy, hints)
+        self.assertIs(hierarchy.selector.hints, hints)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# coding=utf-8
+
+import unittest
+
+from poco.agent import PocoAgent
+from poco.exceptions import InvalidOperationException
+from poco.freezeui.hierarchy import FrozenUIDumper, FrozenUIHierarchy
+from poco.pocofw import Poco
+from poco.sdk.interfaces.input import InputInterface
+
+
+def node(name, pos, children=(), **attrs):
+    payload = {'name': name, 'visible': True, 'pos': pos, 'size': [0.1, 0.1], 'anchorPoint': [0.5, 0.5]}
+    payload.update(attrs)
+    return {'name': name, 'payload': payload, 'children': list(children)}
+
+
+class Dumper(FrozenUIDumper):
+    def __init__(self, root):
+        super(Dumper, self).__init__()
+        self.root = root
+
+    def dumpHierarchy(self, onlyVisibleNode=True):
+        return self.root
+
+
+class NodeInput(InputInterface):
+    """
+    Input supporting the node-targeted actions, recording every action performed
+    """
+
+    def __init__(self):
+        super(NodeInput, self).__init__()
+        self.actions = []
+
+    def has_capability(self, name):
+        return name in ('ClickNode', 'SwipeNode')
+
+    def click(self, x, y):
+        self.actions.append(('click', x, y))
+
+    def swipe(self, x1, y1, x2, y2, duration):
+        self.actions.append(('swipe', x1, y1, x2, y2))
+
+    def clickNode(self, instance_id, focus):
+        self.actions.append(('clickNode', instance_id, focus))
+
+    def swipeNode(self, instance_id, focus, direction, duration):
+        self.actions.append(('swipeNode', instance_id, focus, direction))
+
+
+class TestNodeActions(unittest.TestCase):
+    def setUp(self):
+        root = node('root', [0.5, 0.5], [
+            node('inside', [0.3, 0.3], _instanceId=1),
+            node('outside', [1.3, 0.5], _instanceId=2),
+        ], _instanceId=0)
+        self.input = NodeInput()
+        agent = PocoAgent(FrozenUIHierarchy(Dumper(root)), self.input, None)
+        self.poco = Poco(agent, action_interval=0, pre_action_wait_for_appearance=0)
+        self.callbacks = []
+        self.poco.add_pre_action_callback(lambda poco, action, ui, args: self.callbacks.append(('pre', action)))
+        self.poco.add_post_action_callback(lambda poco, action, ui, args: self.callbacks.append(('post', action)))
+
+    def test_click_node(self):
+        self.poco('inside').click()
+        self.assertEqual(self.input.actions, [('clickNode', 1, 'center')])
+        self.assertEqual(self.callbacks, [('pre', 'click'), ('post', 'click')])
+
+    def test_swipe_node(self):
+        self.poco('inside').swipe('up')
+        self.assertEqual(self.input.actions, [('swipeNode', 1, 'center', [0, -0.1])])
+        self.assertEqual(self.callbacks, [('pre', 'swipe'), ('post', 'swipe')])
+
+    def test_click_node_out_of_screen(self):
+        with self.assertRaises(InvalidOperationException):
+            self.poco('outside').click()
+        self.assertEqual(self.input.actions, [])
+
+    def test_swipe_node_out_of_screen(self):
+        with self.assertRaises(InvalidOperationException):
+            self.poco('outside').swipe('up')
+        self.assertEqual(self.input.actions, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# coding=utf-8
+
+import json
+import socket
+import time
+import unittest
+
+from poco.sdk.std.protocol import SimpleProtocolFilter
+from poco.utils.simplerpc.hub import RpcHub
+from poco.utils.simplerpc.rpcclient import RpcClient
+from poco.utils.simplerpc.simplerpc import RpcConnectionError
+from poco.utils.simplerpc.transport.tcp.main import TcpClient
+
+
+class TestRpcHub(unittest.TestCase):
+    def make_hub(self):
+        return RpcHub()
+
+    def setUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(1)
+        self.hub = self.make_hub()
+        self.client = RpcClient(TcpClient(self.server.getsockname()))
+        self.hub.add(self.client)
+        self.client.connect()
+        self.peer, _ = self.server.accept()
+
+    def tearDown(self):
+        self.peer.close()
+        self.server.close()
+
+    def test_pending_call_fails_when_peer_closes(self):
+        cb = self.client.call('Echo', 'a')
+        self.peer.recv(65536)
+        self.peer.close()
+
+        start = time.time()
+        with self.assertRaises(RpcConnectionError):
+            cb.wait(timeout=10)
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(self.client._callbacks, {})
+
+        with self.assertRaises(RpcConnectionError):
+            self.client.call('Echo', 'b')
+
+    def test_call(self):
+        cb = self.client.call('Echo', 'a')
+        p = SimpleProtocolFilter()
+        packets = []
+        while not packets:
+            packets = list(p.input(self.peer.recv(65536)))
+        request = json.loads(packets[0].decode('utf-8'))
+        response = {'id': request['id'], 'jsonrpc': '2.0', 'result': request['params'][0]}
+        self.peer.sendall(SimpleProtocolFilter.pack(json.dumps(response)))
+        self.assertEqual(cb.wait(timeout=5), ('a', None))
+
+
+class TestRpcHubWithoutSocketpair(TestRpcHub):
+    """
+    The same on windows with python 2.7, whose socket module has no socketpair
+    """
+
+    def make_hub(self):
+        native = socket.socketpair
+        del socket.socketpair
+        try:
+            hub = RpcHub()
+        finally:
+            socket.socketpair = native
+        self.assertEqual(hub._wakeup_r.family, socket.AF_INET)
+        return hub
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+# coding=utf-8
+
+import itertools
+import unittest
+
+from poco.freezeui.hierarchy import FrozenUIDumper
+from poco.sdk.DefaultMatcher import DefaultMatcher
+from poco.sdk.Selector import Selector
+from poco.sdk.exceptions import NoSuchTargetException
+
+
+def node(name, pos, children=(), size=(0.1, 0.1), **attrs):
+    payload = {'name': name, 'type': 'Node', 'visible': True, 'pos': list(pos), 'size': list(size),
+               'anchorPoint': [0.5, 0.5]}
+    payload.update(attrs)
+    return {'name': name, 'payload': payload, 'children': list(children)}
+
+
+def fixture():
+    return node('root', [0.5, 0.5], [
+        node('panel', [0.25, 0.5], [
+            node('item', [0.2, 0.2], [node('label', [0.2, 0.2], size=(0.05, 0.05))], type='Button'),
+            node('item', [0.2, 0.4], [node('label', [0.2, 0.4], size=(0.05, 0.05))]),
+            node('item', [0.2, 0.6], visible=False),
+        ], size=(0.5, 1)),
+        node('panel', [0.75, 0.5], [
+            node('item', [0.8, 0.8], [
+                node('item', [0.8, 0.8], size=(0.05, 0.05), type='Button'),
+            ]),
+            node('label', [0.7, 0.2]),
+        ], size=(0.5, 1)),
+        node('label', [0.5, 0.95]),
+    ], size=(1, 1))
+
+
+class Dumper(FrozenUIDumper):
+    def __init__(self, root):
+        super(Dumper, self).__init__()
+        self.root = root
+
+    def dumpHierarchy(self, onlyVisibleNode=True):
+        return self.root
+
+
+class SnapshotDumper(Dumper):
+    """
+    Dumper keeping the same root node until refreshed, like the dumper of a frozen poco
+    """
+
+    def __init__(self, root):
+        super(SnapshotDumper, self).__init__(root)
+        self.snapshot = None
+
+    def refresh(self, root):
+        self.root = root
+        self.snapshot = None
+
+    def getRoot(self):
+        if self.snapshot is None:
+            self.snapshot = super(SnapshotDumper, self).getRoot()
+        return self.snapshot
+
+
+class CountingMatcher(DefaultMatcher):
+    def __init__(self):
+        super(CountingMatcher, self).__init__()
+        self.calls = 0
+
+    def match(self, cond, node):
+        self.calls += 1
+        return super(CountingMatcher, self).match(cond, node)
+
+
+def attr(name, value):
+    return 'attr=', (name, value)
+
+
+LEAVES = [
+    attr('name', 'root'),
+    attr('name', 'panel'),
+    attr('name', 'item'),
+    attr('name', 'label'),
+    attr('name', 'missing'),
+    ('and', (attr('name', 'item'), attr('type', 'Button'))),
+    ('and', (attr('name', 'item'), ('spatial', ('inside', (0, 0, 0.5, 1))))),
+    ('and', (attr('name', 'label'), ('spatial', ('containsPoint', (0.7, 0.2))))),
+    ('and', (attr('name', 'item'), ('spatial', ('nearest', (0.2, 0.35))))),
+    ('and', (attr('name', 'label'), ('spatial', ('nearest', (1, 1))))),
+]
+
+
+def queries():
+    steps = LEAVES + [('index', (leaf, i)) for leaf in LEAVES[:4] for i in (0, 1, 3)]
+    steps += [('-', (attr('name', 'item'), attr('name', 'label'))), ('^', (attr('name', 'label'), None))]
+    for step in steps:
+        yield step
+    for op in ('/', '>'):
+        for path in itertools.product(steps, repeat=2):
+            yield op, path
+        for path in itertools.product(steps[1:4] + steps[-6:], repeat=3):
+            yield op, path
+
+
+def select(selector, query, multiple):
+    try:
+        return selector.select(query, multiple)
+    except NoSuchTargetException:
+        return []
+
+
+class TestSelectorCountAndExists(unittest.TestCase):
+    def check(self, selector):
+        for query in queries():
+            self.assertEqual(selector.count(query), len(select(selector, query, True)), query)
+            self.assertEqual(selector.exists(query), len(select(selector, query, False)) > 0, query)
+
+    def test_consistent_with_select(self):
+        self.check(Selector(Dumper(fixture())))
+
+    def test_consistent_with_select_memoized(self):
+        self.check(Selector(Dumper(fixture()), memoize=True))
+
+    def test_nearest_counts_once_per_anchor(self):
+        selector = Selector(Dumper(fixture()))
+        query = ('/', (attr('name', 'panel'), ('and', (attr('name', 'item'), ('spatial', ('nearest', (0, 0)))))))
+        self.assertEqual(selector.count(query), 2)
+
+    def test_index_out_of_range_in_path(self):
+        selector = Selector(Dumper(fixture()))
+        query = ('/', (('index', (attr('name', 'panel'), 5)), attr('name', 'item')))
+        self.assertEqual(selector.count(query), 0)
+        self.assertFalse(selector.exists(query))
+
+
+class TestSelectorPlanAndMemo(unittest.TestCase):
+    def test_plan_flattens_chained_paths(self):
+        a, b, c = attr('name', 'a'), attr('name', 'b'), attr('name', 'c')
+        self.assertEqual(Selector.plan(('/', (('/', (a, b)), c))), ('/', (a, b, c)))
+        self.assertEqual(Selector.plan(('>', (('>', (('>', (a, b)), c)), a))), ('>', (a, b, c, a)))
+        # different operators are not merged, nested ones are still planned
+        self.assertEqual(Selector.plan(('/', (('>', (a, b)), c))), ('/', (('>', (a, b)), c)))
+        self.assertEqual(Selector.plan(('index', (('/', (('/', (a, b)), c)), 1))), ('index', (('/', (a, b, c)), 1)))
+        self.assertEqual(Selector.plan(('-', (('/', (('/', (a, b)), c)), a))), ('-', (('/', (a, b, c)), a)))
+        self.assertEqual(Selector.plan(a), a)
+
+    def test_plan_keeps_results(self):
+        selector = Selector(Dumper(fixture()))
+        panel, item, label = attr('name', 'panel'), attr('name', 'item'), attr('name', 'label')
+        for op in ('/', '>'):
+            chained = (op, ((op, (panel, item)), label))
+            self.assertEqual(selector.selectImpl(chained, True, selector.getRoot(), 9999, True, True),
+                             selector.select(chained, True))
+
+    def test_memoized_results_equal_fresh(self):
+        root = fixture()
+        fresh = Selector(Dumper(root))
+        memoized = Selector(SnapshotDumper(root), memoize=True)
+        for query in queries():
+            for multiple in (True, False):
+                self.assertEqual(select(memoized, query, multiple), select(fresh, query, multiple), query)
+
+    def test_memo_resumes_from_anchor(self):
+        panel = ('index', (attr('name', 'panel'), 1))
+        fresh = Selector(Dumper(fixture()), CountingMatcher())
+        fresh.select(('/', (panel, attr('name', 'label'))), True)
+        memoized = Selector(SnapshotDumper(fixture()), CountingMatcher(), memoize=True)
+        memoized.select(('/', (panel, attr('name', 'item'))), True)
+        memoized.matcher.calls = 0
+        self.assertEqual(len(memoized.select(('/', (panel, attr('name', 'label'))), True)), 1)
+        # only the anchor and its children are matched again
+        self.assertEqual(memoized.matcher.calls, 3)
+        self.assertLess(memoized.matcher.calls, fresh.matcher.calls)
+
+    def test_memo_dropped_for_new_root(self):
+        dumper = SnapshotDumper(fixture())
+        selector = Selector(dumper, memoize=True)
+        for query in (attr('name', 'panel'), ('/', (attr('name', 'panel'), attr('name', 'item')))):
+            self.assertEqual(len(selector.select(query, True)), 3 if query[0] == '/' else 2)
+        dumper.refresh(node('root', [0.5, 0.5], [node('panel', [0.5, 0.5], [node('item', [0.5, 0.5])])]))
+        for query in (attr('name', 'panel'), ('/', (attr('name', 'panel'), attr('name', 'item')))):
+            self.assertEqual(len(selector.select(query, True)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+# coding=utf-8
+
+import socket
+import unittest
+
+from poco.utils.net import socketpair as socketpair_module
+from poco.utils.net.socketpair import socketpair
+
+
+class TestSocketpair(unittest.TestCase):
+    def check_pair(self, a, b):
+        try:
+            a.sendall(b'ping')
+            self.assertEqual(b.recv(4), b'ping')
+            b.sendall(b'pong')
+            self.assertEqual(a.recv(4), b'pong')
+        finally:
+            a.close()
+            b.close()
+
+    def test_socketpair(self):
+        self.check_pair(*socketpair())
+
+    def test_loopback_fallback(self):
+        native = getattr(socket, 'socketpair', None)
+        del socket.socketpair
+        try:
+            a, b = socketpair()
+            self.assertEqual(a.family, socket.AF_INET)
+        finally:
+            socket.socketpair = native
+        self.check_pair(a, b)
+
+    def test_loopback_pair_is_connected(self):
+        a, b = socketpair_module._loopback_socketpair()
+        self.assertEqual(a.getpeername(), b.getsockname())
+        self.check_pair(a, b)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# coding=utf-8
+
+import unittest
+
+from poco.sdk.DefaultMatcher import getBounds
+from poco.sdk.Selector import Selector
+from poco.utils.query_util import build_query, query_expr
+
+from test.test_selector import CountingMatcher, Dumper, fixture, node
+
+
+def walk(root):
+    # visible nodes in traversal order, the subtrees of invisible nodes are skipped like in the selector
+    if not root.getAttr('visible'):
+        return
+    yield root
+    for child in root.getChildren():
+        for n in walk(child):
+            yield n
+
+
+def brute_force(root, kind, value):
+    nodes = []
+    for n in walk(root):
+        x0, y0, x1, y1 = getBounds(n)
+        if kind == 'inside' and value[0] <= x0 and value[1] <= y0 and x1 <= value[2] and y1 <= value[3]:
+            nodes.append(n)
+        elif kind == 'containsPoint' and x0 <= value[0] <= x1 and y0 <= value[1] <= y1:
+            nodes.append(n)
+    return nodes
+
+
+REGIONS = [(0, 0, 1, 1), (0, 0, 0.5, 1), (0.5, 0, 1, 1), (0.1, 0.1, 0.3, 0.5), (0.7, 0.7, 0.9, 0.9), (2, 2, 3, 3)]
+POINTS = [(0.2, 0.2), (0.8, 0.8), (0.7, 0.2), (0.5, 0.95), (0.5, 0.5), (1.5, 0.5)]
+
+
+class TestBuildSpatialQuery(unittest.TestCase):
+    def test_build(self):
+        self.assertEqual(build_query(None, inside=[0, 0, 1, 1]),
+                         ('and', (('spatial', ('inside', (0.0, 0.0, 1.0, 1.0))),)))
+        self.assertEqual(build_query(None, containsPoint=(0.5, 0.5)),
+                         ('and', (('spatial', ('containsPoint', (0.5, 0.5))),)))
+        query = build_query('item', nearest=(0, 1))
+        self.assertIn(('spatial', ('nearest', (0.0, 1.0))), query[1])
+        self.assertIn(('attr=', ('name', 'item')), query[1])
+        self.assertIn('nearest=', query_expr(query))
+
+    def test_bad_coordinates(self):
+        for kwargs in ({'inside': (0, 0, 1)}, {'containsPoint': 0.5}, {'nearest': (0, 1, 2)}, {'inside': '0011'}):
+            with self.assertRaises(ValueError):
+                build_query(None, **kwargs)
+
+
+class TestSpatialPredicates(unittest.TestCase):
+    def setUp(self):
+        self.selector = Selector(Dumper(fixture()))
+        self.root = self.selector.getRoot()
+
+    def select(self, kind, value, prune=True, name=None):
+        self.selector.pruneByBounds = prune
+        return self.selector.select(build_query(name, **{kind: value}), True)
+
+    def test_inside(self):
+        for region in REGIONS:
+            expected = brute_force(self.root, 'inside', region)
+            self.assertEqual(self.select('inside', region), expected, region)
+            self.assertEqual(self.select('inside', region, prune=False), expected, region)
+
+    def test_contains_point(self):
+        for point in POINTS:
+            expected = brute_force(self.root, 'containsPoint', point)
+            self.assertEqual(self.select('containsPoint', point), expected, point)
+            self.assertEqual(self.select('containsPoint', point, prune=False), expected, point)
+
+    def test_nearest(self):
+        for point in POINTS:
+            items = [n for n in walk(self.root) if n.getAttr('name') == 'item']
+            expected = min(items, key=lambda n: (n.getAttr('pos')[0] - point[0]) ** 2 +
+                                                (n.getAttr('pos')[1] - point[1]) ** 2)
+            self.assertEqual(self.select('nearest', point, name='item'), [expected], point)
+            self.assertEqual(self.selector.select(build_query('item', nearest=point)), [expected], point)
+            self.assertEqual(self.selector.count(build_query('item', nearest=point)), 1)
+        self.assertEqual(self.select('nearest', (0, 0), name='missing'), [])
+
+    def test_pruning_skips_subtrees(self):
+        matcher = CountingMatcher()
+        selector = Selector(Dumper(fixture()), matcher)
+        selector.select(build_query(None, containsPoint=(0.2, 0.2)), True)
+        pruned = matcher.calls
+        selector.pruneByBounds = False
+        matcher.calls = 0
+        selector.select(build_query(None, containsPoint=(0.2, 0.2)), True)
+        self.assertLess(pruned, matcher.calls)
+
+    def test_zero_size_node_never_prunes(self):
+        root = node('root', [0.5, 0.5], [
+            node('container', [0, 0], [node('item', [0.8, 0.8])], size=(0, 0)),
+        ], size=(1, 1))
+        selector = Selector(Dumper(root))
+        nodes = selector.select(build_query('item', containsPoint=(0.8, 0.8)), True)
+        self.assertEqual([n.getAttr('pos') for n in nodes], [[0.8, 0.8]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# coding=utf-8
+
+import unittest
+
+from poco.drivers.std.capabilities import StdCapabilities
+from poco.utils.simplerpc.simplerpc import RpcTimeoutError
+
+
+class Callback(object):
+    def __init__(self, result=None, error=None, exception=None):
+        self.ret = result, error
+        self.exception = exception
+
+    def wait(self, timeout=None):
+        if self.exception is not None:
+            raise self.exception
+        return self.ret
+
+
+class Client(object):
+    def __init__(self, cb):
+        self.cb = cb
+        self.calls = []
+
+    def call(self, func, *args):
+        self.calls.append(func)
+        return self.cb
+
+
+class TestStdCapabilities(unittest.TestCase):
+    def test_advertised(self):
+        capabilities = StdCapabilities(Client(Callback(['Select', 'Count'])))
+        self.assertIn('Select', capabilities)
+        self.assertNotIn('Exists', capabilities)
+
+    def test_remote_error(self):
+        client = Client(Callback(error={'message': 'No such method "GetCapabilities"'}))
+        capabilities = StdCapabilities(client)
+        self.assertNotIn('Select', capabilities)
+
+    def test_timeout_is_cached(self):
+        client = Client(Callback(exception=RpcTimeoutError('GetCapabilities')))
+        capabilities = StdCapabilities(client)
+        self.assertNotIn('Select', capabilities)
+        self.assertNotIn('Count', capabilities)
+        self.assertEqual(client.calls, ['GetCapabilities'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# coding=utf-8
+
+import unittest
+
+from poco.agent import PocoAgent
+from poco.drivers.std.inputs import StdInput
+from poco.exceptions import InvalidOperationException
+from poco.freezeui.hierarchy import FrozenUIHierarchy
+from poco.pocofw import Poco
+
+from test.test_proxy import Dumper, node
+
+
+class Callback(object):
+    def wait(self, timeout=None):
+        return None, None
+
+
+class Client(object):
+    def __init__(self):
+        self.calls = []
+
+    def call(self, method, *params):
+        self.calls.append((method, ) + params)
+        return Callback()
+
+
+class TestInputBatch(unittest.TestCase):
+    def make_poco(self, capabilities):
+        self.client = Client()
+        root = node('root', [0.5, 0.5], [node('button', [0.3, 0.3])])
+        agent = PocoAgent(FrozenUIHierarchy(Dumper(root)), StdInput(self.client, capabilities), None)
+        return Poco(agent, action_interval=0, pre_action_wait_for_appearance=0)
+
+    def test_batch_sent_at_once(self):
+        poco = self.make_poco({'BatchInput'})
+        with poco.input_batch(step_delay=0.1):
+            poco.click([0.1, 0.2])
+            poco('button').click()
+            self.assertEqual(self.client.calls, [])
+        self.assertEqual(self.client.calls, [('BatchInput', [
+            {'method': 'Click', 'params': [0.1, 0.2], 'delay': 0.1},
+            {'method': 'Click', 'params': [0.3, 0.3], 'delay': 0.1},
+        ])])
+
+    def test_rejected_before_the_block_without_batch_input(self):
+        poco = self.make_poco(set())
+        with self.assertRaises(InvalidOperationException):
+            with poco.input_batch():
+                self.fail('the block must not run')
+        self.assertEqual(self.client.calls, [])
+
+        # the actions are still sent one by one outside of a batch
+        poco.click([0.1, 0.2])
+        self.assertEqual(self.client.calls, [('Click', 0.1, 0.2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
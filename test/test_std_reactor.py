@@ -0,0 +1,92 @@
+# coding=utf-8
+
+import threading
+import unittest
+
+from poco.sdk.std.rpc import reactor as reactor_module
+from poco.sdk.std.rpc.reactor import StdRpcReactor
+
+
+def request(method, *params):
+    return {'id': method, 'jsonrpc': '2.0', 'method': method, 'params': list(params)}
+
+
+class TestStdRpcReactorDispatch(unittest.TestCase):
+    def test_inline_by_default(self):
+        reactor = StdRpcReactor()
+        reactor.register('Echo', lambda x: (x, threading.current_thread()))
+        responses = []
+        reactor.dispatch_request(request('Echo', 1), responses.append)
+        self.assertEqual(responses[0]['result'], (1, threading.current_thread()))
+
+    def test_lane_runs_off_the_receiving_thread(self):
+        reactor = StdRpcReactor()
+        reactor.set_concurrency_limit('Echo', 1)
+        reactor.register('Echo', lambda x: (x, threading.current_thread()))
+        done = threading.Event()
+        responses = []
+
+        def on_complete(res):
+            responses.append(res)
+            done.set()
+
+        reactor.dispatch_request(request('Echo', 1), on_complete)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(responses[0]['result'][0], 1)
+        self.assertIsNot(responses[0]['result'][1], threading.current_thread())
+
+    def test_inline_without_concurrent_futures(self):
+        executor = reactor_module.ThreadPoolExecutor
+        reactor_module.ThreadPoolExecutor = None
+        try:
+            reactor = StdRpcReactor(max_workers=4)
+            reactor.set_concurrency_limit(['Echo'], 1)
+            reactor.register('Echo', lambda x: (x, threading.current_thread()))
+            responses = []
+            reactor.dispatch_request(request('Echo', 1), responses.append)
+            self.assertEqual(responses[0]['result'], (1, threading.current_thread()))
+        finally:
+            reactor_module.ThreadPoolExecutor = executor
+
+    def test_batch_input_steps_run_on_their_lane(self):
+        reactor = StdRpcReactor()
+        reactor.set_concurrency_limit(['Click'], 1)
+        reactor.register('Click', lambda x, y: threading.current_thread())
+        reactor.enable_batch_input()
+        done = threading.Event()
+        responses = []
+
+        def on_complete(res):
+            responses.append(res)
+            done.set()
+
+        reactor.dispatch_request(request('Click', 0.5, 0.5), on_complete)
+        self.assertTrue(done.wait(5))
+        lane_thread = responses.pop()['result']
+        self.assertIsNot(lane_thread, threading.current_thread())
+
+        # BatchInput itself has no lane and runs inline, its steps still run on the lane of Click
+        steps = [{'method': 'Click', 'params': [0.1, 0.1]}, {'method': 'Click', 'params': [0.2, 0.2]}]
+        reactor.dispatch_request(request('BatchInput', steps), responses.append)
+        self.assertEqual(responses[0]['result'], [lane_thread, lane_thread])
+
+    def test_batch_input_on_the_lane_of_its_steps(self):
+        reactor = StdRpcReactor()
+        reactor.set_concurrency_limit(['Click', 'BatchInput'], 1)
+        reactor.register('Click', lambda x, y: [x, y])
+        reactor.enable_batch_input()
+        done = threading.Event()
+        responses = []
+
+        def on_complete(res):
+            responses.append(res)
+            done.set()
+
+        steps = [{'method': 'Click', 'params': [0.1, 0.1]}]
+        reactor.dispatch_request(request('BatchInput', steps), on_complete)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(responses[0]['result'], [[0.1, 0.1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
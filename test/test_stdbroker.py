@@ -0,0 +1,205 @@
+# coding=utf-8
+
+import json
+import socket
+import threading
+import time
+import unittest
+
+from poco.sdk.std.protocol import SimpleProtocolFilter
+from poco.utils.net.stdbroker import StdBroker
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError('condition not met in {}s'.format(timeout))
+        time.sleep(0.01)
+
+
+def echo(responder, request):
+    # answer requests until the broker goes away
+    try:
+        while True:
+            responder.send({'id': request['id'], 'jsonrpc': '2.0', 'result': request['params'][0]})
+            request = responder.recv()
+    except Exception:
+        pass
+
+
+class Peer(object):
+    """
+    Raw std protocol peer, either a requester or a responder connected to the broker
+    """
+
+    def __init__(self, transport):
+        super(Peer, self).__init__()
+        self.sock = socket.create_connection(transport.s.getsockname())
+        self.sock.settimeout(5)
+        self.p = SimpleProtocolFilter()
+        self.packets = []
+
+    def send(self, packet):
+        self.sock.sendall(SimpleProtocolFilter.pack(json.dumps(packet)))
+
+    def recv(self, timeout=5):
+        self.sock.settimeout(timeout)
+        while not self.packets:
+            data = self.sock.recv(65536)
+            if not data:
+                raise EOFError
+            self.packets.extend(json.loads(packet.decode('utf-8')) for packet in self.p.input(data))
+        return self.packets.pop(0)
+
+    def close(self):
+        self.sock.close()
+
+
+class TestStdBroker(unittest.TestCase):
+    def make_broker(self, **kwargs):
+        broker = StdBroker('tcp://127.0.0.1:0', 'tcp://127.0.0.1:0', **kwargs)
+        self.peers = []
+        return broker
+
+    def connect(self, transport):
+        peer = Peer(transport)
+        self.peers.append(peer)
+        return peer
+
+    def tearDown(self):
+        for peer in getattr(self, 'peers', []):
+            peer.close()
+
+    def test_half_closed_responder_is_not_picked(self):
+        broker = self.make_broker()
+        responders = broker.responders[0]
+        half_closed = self.connect(responders)
+        wait_until(lambda: len(responders.get_connection_ids()) == 1)
+        half_closed.sock.shutdown(socket.SHUT_WR)
+        wait_until(lambda: len(responders.get_active_connection_ids()) == 0)
+        self.assertEqual(len(responders.get_connection_ids()), 1)
+
+        responder = self.connect(responders)
+        wait_until(lambda: len(responders.get_active_connection_ids()) == 1)
+        requester = self.connect(broker.requesters[0])
+        requester.send({'id': 1, 'jsonrpc': '2.0', 'method': 'Echo', 'params': ['a']})
+        request = responder.recv()
+        self.assertEqual(request['method'], 'Echo')
+        responder.send({'id': request['id'], 'jsonrpc': '2.0', 'result': 'a'})
+        self.assertEqual(requester.recv()['result'], 'a')
+
+    def test_least_loaded_responder_and_backpressure(self):
+        broker = self.make_broker(max_inflight=1, max_pending=2)
+        responders = broker.responders[0]
+        responder1 = self.connect(responders)
+        responder2 = self.connect(responders)
+        wait_until(lambda: len(responders.get_active_connection_ids()) == 2)
+        requester = self.connect(broker.requesters[0])
+
+        for i in range(6):
+            requester.send({'id': i, 'jsonrpc': '2.0', 'method': 'Echo', 'params': [i]})
+        # one request in flight on each responder, the others wait in the broker which stops reading when full
+        requests = [responder1.recv(), responder2.recv()]
+        self.assertEqual(sorted(request['params'][0] for request in requests), [0, 1])
+        wait_until(lambda: broker.reading_paused)
+        self.assertEqual(len(broker.pending), 2)
+
+        for responder, request in zip((responder1, responder2), requests):
+            t = threading.Thread(target=echo, args=(responder, request))
+            t.daemon = True
+            t.start()
+        self.assertEqual(sorted(requester.recv()['result'] for _ in range(6)), list(range(6)))
+        wait_until(lambda: not broker.reading_paused)
+
+    def test_same_id_from_two_requesters(self):
+        broker = self.make_broker()
+        responder = self.connect(broker.responders[0])
+        wait_until(lambda: len(broker.responders[0].get_active_connection_ids()) == 1)
+        requester1 = self.connect(broker.requesters[0])
+        requester2 = self.connect(broker.requesters[0])
+
+        requester1.send({'id': 1, 'jsonrpc': '2.0', 'method': 'Echo', 'params': ['a']})
+        request1 = responder.recv()
+        requester2.send({'id': 1, 'jsonrpc': '2.0', 'method': 'Echo', 'params': ['b']})
+        request2 = responder.recv()
+        self.assertEqual(request1['id'], 1)
+        self.assertNotEqual(request2['id'], 1)
+
+        # answered in reverse order, each response goes to its own requester with its own id
+        responder.send({'id': request2['id'], 'jsonrpc': '2.0', 'result': 'b'})
+        responder.send({'id': request1['id'], 'jsonrpc': '2.0', 'result': 'a'})
+        self.assertEqual(requester1.recv(), {'id': 1, 'jsonrpc': '2.0', 'result': 'a'})
+        self.assertEqual(requester2.recv(), {'id': 1, 'jsonrpc': '2.0', 'result': 'b'})
+
+        # the id is free again once answered
+        requester2.send({'id': 1, 'jsonrpc': '2.0', 'method': 'Echo', 'params': ['c']})
+        self.assertEqual(responder.recv()['id'], 1)
+
+    def test_request_timeout(self):
+        broker = self.make_broker(request_timeout=0.3)
+        broker.SWEEP_INTERVAL = 0.1
+        responder = self.connect(broker.responders[0])
+        wait_until(lambda: len(broker.responders[0].get_active_connection_ids()) == 1)
+        requester = self.connect(broker.requesters[0])
+        requester.send({'id': 1, 'jsonrpc': '2.0', 'method': 'Echo', 'params': ['a']})
+        responder.recv()
+
+        response = requester.recv()
+        self.assertEqual(response['id'], 1)
+        self.assertIn('Request timeout', response['error']['message'])
+
+        requester.send({'id': 2, 'jsonrpc': '2.0', 'method': StdBroker.STATS_METHOD, 'params': []})
+        stats = requester.recv()['result']
+        self.assertEqual(stats['inflight'], [])
+        self.assertEqual(stats['responders'][0]['timeouts'], 1)
+
+    def test_responder_disconnected(self):
+        broker = self.make_broker()
+        broker.SWEEP_INTERVAL = 0.1
+        responder = self.connect(broker.responders[0])
+        wait_until(lambda: len(broker.responders[0].get_active_connection_ids()) == 1)
+        requester = self.connect(broker.requesters[0])
+        requester.send({'id': 1, 'jsonrpc': '2.0', 'method': 'Echo', 'params': ['a']})
+        responder.recv()
+        responder.close()
+
+        self.assertIn('Responder disconnected', requester.recv()['error']['message'])
+
+    def test_coalesce_identical_requests(self):
+        broker = self.make_broker(cache_ttl=5)
+        responder = self.connect(broker.responders[0])
+        wait_until(lambda: len(broker.responders[0].get_active_connection_ids()) == 1)
+        requester1 = self.connect(broker.requesters[0])
+        requester2 = self.connect(broker.requesters[0])
+
+        requester1.send({'id': 'a', 'jsonrpc': '2.0', 'method': 'Dump', 'params': [True]})
+        request = responder.recv()
+        requester2.send({'id': 'b', 'jsonrpc': '2.0', 'method': 'Dump', 'params': [True]})
+        requester2.send({'id': 'c', 'jsonrpc': '2.0', 'method': 'Dump', 'params': [False]})
+        # only the request with different params is forwarded
+        self.assertEqual(responder.recv()['params'], [False])
+        wait_until(lambda: broker.stats[broker.requesters[0]].coalesced == 1)
+
+        responder.send({'id': request['id'], 'jsonrpc': '2.0', 'result': 'dump'})
+        self.assertEqual(requester1.recv(), {'id': 'a', 'jsonrpc': '2.0', 'result': 'dump'})
+        self.assertEqual(requester2.recv(), {'id': 'b', 'jsonrpc': '2.0', 'result': 'dump'})
+
+        # answered from the cache afterwards
+        requester1.send({'id': 'd', 'jsonrpc': '2.0', 'method': 'Dump', 'params': [True]})
+        self.assertEqual(requester1.recv(), {'id': 'd', 'jsonrpc': '2.0', 'result': 'dump'})
+        self.assertEqual(broker.stats[broker.requesters[0]].cache_hits, 1)
+
+    def test_not_coalesced_methods(self):
+        broker = self.make_broker()
+        responder = self.connect(broker.responders[0])
+        wait_until(lambda: len(broker.responders[0].get_active_connection_ids()) == 1)
+        requester = self.connect(broker.requesters[0])
+        requester.send({'id': 1, 'jsonrpc': '2.0', 'method': 'Click', 'params': [0.5, 0.5]})
+        requester.send({'id': 2, 'jsonrpc': '2.0', 'method': 'Click', 'params': [0.5, 0.5]})
+        self.assertEqual(responder.recv()['id'], 1)
+        self.assertEqual(responder.recv()['id'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
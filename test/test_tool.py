@@ -0,0 +1,302 @@
+# coding=utf-8
+
+import base64
+import io
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from tool import CoordElementFinder, ElementTracker, HitTestIndex, LocatorIndex, UIRegionExtractor
+
+
+def element(name, pos, size, children=(), **attrs):
+    payload = {'name': name, 'pos': list(pos), 'size': list(size), 'visible': True}
+    payload.update(attrs)
+    return {'name': name, 'payload': payload, 'children': list(children)}
+
+
+def screen():
+    rng = random.Random(42)
+    items = [element('item{}'.format(i), (rng.uniform(-0.2, 1.2), rng.uniform(-0.2, 1.2)),
+                     (rng.uniform(0, 0.4), rng.uniform(0, 0.4)), touchable=i % 2 == 0,
+                     anchorPoint=rng.choice([[0.5, 0.5], [0, 0], [1, 1], [0.2, 0.7]])) for i in range(60)]
+    return element('root', (0.5, 0.5), (1, 1), [
+        element('panel', (0.3, 0.5), (0.6, 1), items[:30]),
+        element('overflow', (1.1, 0.5), (0.4, 0.2), items[30:]),
+        element('hidden', (0.5, 0.5), (0.2, 0.2), visible=False),
+        {'name': 'no-bounds', 'payload': {'name': 'no-bounds'}, 'children': []},
+    ])
+
+
+def walk(node):
+    yield node['payload']
+    for child in node['children']:
+        for attrs in walk(child):
+            yield attrs
+
+
+def brute_force(hierarchy, coord):
+    matches = []
+    for attrs in walk(hierarchy):
+        if 'pos' not in attrs:
+            continue
+        (x, y), (w, h) = attrs['pos'], attrs['size']
+        ax, ay = attrs.get('anchorPoint', [0.5, 0.5])
+        if x - w * ax <= coord[0] <= x + w * (1 - ax) and y - h * ay <= coord[1] <= y + h * (1 - ay):
+            matches.append(attrs)
+    return matches
+
+
+class Hierarchy(object):
+    def __init__(self, root):
+        self.root = root
+        self.dumps = 0
+
+    def dump(self):
+        self.dumps += 1
+        return self.root
+
+
+class Agent(object):
+    def __init__(self, root):
+        self.hierarchy = Hierarchy(root)
+
+
+class FakePoco(object):
+    """
+    Poco answering from a fixed hierarchy dump and screen size, recording the clicks
+    """
+
+    def __init__(self, root, screen_size=(1000, 2000), screen_image=None):
+        self.agent = Agent(root)
+        self.screen_size = screen_size
+        self.screen_size_calls = 0
+        self.screen_image = screen_image
+        self.snapshots = 0
+        self.clicks = []
+
+    def snapshot(self):
+        self.snapshots += 1
+        buf = io.BytesIO()
+        self.screen_image.save(buf, 'png')
+        return base64.b64encode(buf.getvalue()), 'png'
+
+    def get_screen_size(self):
+        self.screen_size_calls += 1
+        return self.screen_size
+
+    def click(self, pos):
+        self.clicks.append(list(pos))
+
+
+COORDS = [(random.Random(i).uniform(-0.5, 1.5), random.Random(-i).uniform(-0.5, 1.5)) for i in range(300)]
+COORDS += [(0, 0), (1, 1), (0.5, 0.5), (1.1, 0.5), (-1, -1), (2, 2)]
+
+
+class TestHitTestIndex(unittest.TestCase):
+    def test_query_equals_brute_force(self):
+        hierarchy = screen()
+        for grid_size in (None, 1, 3, 16):
+            index = HitTestIndex(hierarchy, grid_size)
+            for coord in COORDS:
+                self.assertEqual(index.query(coord), brute_force(hierarchy, coord), (grid_size, coord))
+
+    def test_anchored_bounds(self):
+        # the pos of a cocos node is at its anchor point, the bottom left corner here
+        hierarchy = element('root', (0.5, 0.5), (1, 1), [
+            element('anchored', (0.1, 0.1), (0.2, 0.2), anchorPoint=[0, 0]),
+            element('centered', (0.7, 0.7), (0.2, 0.2)),
+        ])
+        index = HitTestIndex(hierarchy)
+        self.assertEqual([attrs['name'] for attrs in index.query((0.25, 0.25))], ['root', 'anchored'])
+        self.assertEqual([attrs['name'] for attrs in index.query((0.05, 0.05))], ['root'])
+        self.assertEqual([attrs['name'] for attrs in index.query((0.7, 0.7))], ['root', 'centered'])
+
+        region = CoordElementFinder(FakePoco(hierarchy)).get_element_region_by_coord((0.25, 0.25), padding=0)
+        self.assertEqual(region['element_info']['name'], 'anchored')
+        for actual, expected in zip(region['region']['center'], [0.2, 0.2]):
+            self.assertAlmostEqual(actual, expected)
+        self.assertAlmostEqual(region['original_bounds']['right'], 0.3)
+
+    def test_elements_without_bounds_are_skipped(self):
+        index = HitTestIndex(screen())
+        self.assertNotIn('no-bounds', [attrs['name'] for _, attrs in index.elements])
+        self.assertEqual(HitTestIndex(None).query((0.5, 0.5)), [])
+
+    def test_elements_by_coords_from_one_dump(self):
+        poco = FakePoco(screen())
+        finder = CoordElementFinder(poco)
+        pixels = [(c[0] * 1000, c[1] * 2000) for c in COORDS]
+        infos = finder.get_elements_by_coords(pixels, 'pixel')
+        self.assertEqual(poco.agent.hierarchy.dumps, 1)
+        self.assertEqual(poco.screen_size_calls, 1)
+
+        for coord, info in zip(COORDS, infos):
+            matches = brute_force(poco.agent.hierarchy.root, coord)
+            if not matches:
+                self.assertIsNone(info)
+                continue
+            self.assertIs(info['full_attributes'], max(matches, key=CoordElementFinder._priority_score))
+            self.assertEqual(finder.get_element_by_coord(coord), info)
+
+
+def locator_tree():
+    rng = random.Random(7)
+
+    def item(depth):
+        attrs = dict((name, rng.choice(values)) for name, values in (
+            ('resourceId', ['', 'id/a', 'id/b', 'id/c']), ('text', ['', 'ok', 'cancel']), ('type', ['Button', 'Text'])))
+        children = [item(depth + 1) for _ in range(rng.randint(0, 3))] if depth < 4 else []
+        return element(rng.choice(['row', 'cell', 'label']), (0.5, 0.5), (0.1, 0.1), children, **attrs)
+
+    return element('root', (0.5, 0.5), (1, 1), [item(0) for _ in range(6)])
+
+
+def brute_force_resolve(hierarchy, locator):
+    def offspring(node):
+        for child in node['children']:
+            yield child
+            for n in offspring(child):
+                yield n
+
+    def matches(nodes, step):
+        return [n for n in nodes if all(n['payload'].get(k) == v for k, v in step.items())]
+
+    matched = matches([hierarchy] + list(offspring(hierarchy)), locator[0])
+    for step in locator[1:]:
+        matched = [n for n in matches([hierarchy] + list(offspring(hierarchy)), step)
+                   if any(n is o for anchor in matched for o in offspring(anchor))]
+    return [n['payload'] for n in matched]
+
+
+class TestLocatorIndex(unittest.TestCase):
+    def test_locate_and_resolve(self):
+        hierarchy = locator_tree()
+        index = LocatorIndex(hierarchy)
+        located = 0
+        for attrs in walk(hierarchy):
+            locator = index.locate(attrs)
+            if locator is None:
+                continue
+            located += 1
+            resolved = index.resolve(locator)
+            self.assertEqual(len(resolved), 1, locator)
+            self.assertIs(resolved[0], attrs)
+            self.assertEqual(brute_force_resolve(hierarchy, locator), [attrs])
+        self.assertGreater(located, 0)
+
+    def test_fewest_own_attributes(self):
+        hierarchy = locator_tree()
+        index = LocatorIndex(hierarchy)
+        for attrs in walk(hierarchy):
+            locator = index.locate(attrs)
+            keys = [(name, attrs[name]) for name in LocatorIndex.ATTRIBUTES if attrs.get(name)]
+            unique = [len(c) for n in range(1, len(keys) + 1) for c in itertools.combinations(keys, n)
+                      if len(brute_force_resolve(hierarchy, [dict(c)])) == 1]
+            if unique:
+                self.assertEqual(len(locator), 1)
+                self.assertEqual(len(locator[0]), min(unique))
+            elif locator is not None:
+                self.assertEqual(len(locator), 2)
+
+    def test_anchored_by_ancestor(self):
+        hierarchy = element('root', (0.5, 0.5), (1, 1), [
+            element('dialog', (0.5, 0.5), (1, 1), [element('button', (0.5, 0.5), (0.1, 0.1), text='ok')],
+                    resourceId='id/dialog'),
+            element('panel', (0.5, 0.5), (1, 1), [element('button', (0.5, 0.5), (0.1, 0.1), text='ok')]),
+        ])
+        index = LocatorIndex(hierarchy)
+        button = hierarchy['children'][0]['children'][0]['payload']
+        self.assertEqual(index.locate(button), [{'resourceId': 'id/dialog'}, {'name': 'button'}])
+        self.assertEqual(index.resolve(index.locate(button)), [button])
+
+    def test_not_identifiable(self):
+        hierarchy = element('root', (0.5, 0.5), (1, 1), [element('item', (0.5, 0.5), (0.1, 0.1)) for _ in range(2)])
+        index = LocatorIndex(hierarchy)
+        self.assertIsNone(index.locate(hierarchy['children'][0]['payload']))
+        # attributes of another dump are not indexed
+        self.assertIsNone(index.locate({'name': 'item'}))
+        self.assertEqual(len(index.resolve([{'name': 'item'}])), 2)
+
+
+class TestElementTracker(unittest.TestCase):
+    def assertClickedAt(self, poco, pos):
+        self.assertEqual(len(poco.clicks), 1)
+        for actual, expected in zip(poco.clicks.pop(), pos):
+            self.assertAlmostEqual(actual, expected)
+
+    def test_click_at_center_of_anchored_element(self):
+        button = element('button', (0.1, 0.1), (0.2, 0.2), anchorPoint=[0, 0], resourceId='ok')
+        poco = FakePoco(element('root', (0.5, 0.5), (1, 1), [button]))
+        tracker = ElementTracker(poco)
+        self.assertTrue(tracker.track_element_by_coord((0.15, 0.15), 'ok'))
+        self.assertTrue(tracker.click_tracked_element('ok'))
+        self.assertClickedAt(poco, [0.2, 0.2])
+
+        # by the ranked locators if the recorded one does not match any more
+        tracker.tracked_elements['ok']['locator'] = [{'resourceId': 'gone'}]
+        self.assertTrue(tracker.click_tracked_element('ok'))
+        self.assertClickedAt(poco, [0.2, 0.2])
+
+        # by the original coordinate if nothing matches
+        poco.agent.hierarchy.root = element('root', (0.5, 0.5), (1, 1))
+        self.assertTrue(tracker.click_tracked_element('ok'))
+        self.assertClickedAt(poco, [0.2, 0.2])
+
+    def test_nearest_of_ambiguous_matches(self):
+        items = [element('item', (x, 0.5), (0.1, 0.1), anchorPoint=[0.5, 1]) for x in (0.2, 0.5, 0.8)]
+        poco = FakePoco(element('root', (0.5, 0.5), (1, 1), items))
+        tracker = ElementTracker(poco)
+        self.assertTrue(tracker.track_element_by_coord((0.5, 0.5), 'item'))
+        self.assertIsNone(tracker.tracked_elements['item']['locator'])
+        self.assertTrue(tracker.click_tracked_element('item'))
+        self.assertClickedAt(poco, [0.5, 0.45])
+
+
+class TestUIRegionExtractor(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        pixels = np.random.RandomState(0).randint(0, 256, (200, 100, 3), dtype=np.uint8)
+        root = element('root', (0.5, 0.5), (1, 1), [
+            element('a', (0.25, 0.25), (0.3, 0.2)),
+            element('b', (0.75, 0.6), (0.4, 0.5)),
+            element('c', (0.9, 0.95), (0.3, 0.2)),
+        ])
+        self.poco = FakePoco(root, (100, 200), Image.fromarray(pixels))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def path(self, name):
+        return os.path.join(self.tmpdir, name)
+
+    def test_batch_crops_equal_single_crops(self):
+        coords = [(0.25, 0.25), (0.75, 0.6), (0.9, 0.95), (0.5, 0.5)]
+        extractor = UIRegionExtractor(self.poco)
+        items = [(coord, self.path('batch{}.png'.format(i))) for i, coord in enumerate(coords)]
+        self.assertEqual(extractor.save_element_screenshots(items), [True] * len(coords))
+        self.assertEqual(self.poco.snapshots, 1)
+        self.assertEqual(self.poco.agent.hierarchy.dumps, 1)
+
+        for i, coord in enumerate(coords):
+            self.assertTrue(extractor.save_element_screenshot(coord, self.path('single{}.png'.format(i))))
+            batch = np.asarray(Image.open(self.path('batch{}.png'.format(i))))
+            single = np.asarray(Image.open(self.path('single{}.png'.format(i))))
+            self.assertEqual(batch.shape, single.shape)
+            self.assertTrue((batch == single).all())
+
+    def test_no_element_at_coordinate(self):
+        self.poco.agent.hierarchy.root = element('root', (0.25, 0.25), (0.5, 0.5))
+        items = [((0.1, 0.1), self.path('found.png')), ((0.9, 0.9), self.path('missing.png'))]
+        self.assertEqual(UIRegionExtractor(self.poco).save_element_screenshots(items), [True, False])
+        self.assertFalse(os.path.exists(self.path('missing.png')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# coding=utf-8
+
+import socket
+import time
+import unittest
+
+import websocket
+
+from poco.utils.net.transport.ws import WsSocket
+
+
+class TestWsSocket(unittest.TestCase):
+    def setUp(self):
+        self.transport = WsSocket()
+        self.transport.bind(('127.0.0.1', 0))
+        self.client = websocket.create_connection('ws://127.0.0.1:{}'.format(self.transport.s.serversocket.getsockname()[1]))
+
+    def tearDown(self):
+        self.client.close()
+
+    def recv(self, timeout):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            cid, data = self.transport.update(0.05)
+            if data:
+                return data
+        return None
+
+    def test_pause_reading(self):
+        self.client.send('a')
+        self.assertEqual(self.recv(5), 'a')
+
+        self.transport.pause_reading()
+        time.sleep(0.1)
+        self.client.send('b')
+        self.assertIsNone(self.recv(0.5))
+
+        self.transport.resume_reading()
+        self.assertEqual(self.recv(5), 'b')
+
+
+class TestWsSocketWithoutSocketpair(TestWsSocket):
+    """
+    The same on windows with python 2.7, whose socket module has no socketpair
+    """
+
+    def setUp(self):
+        native = socket.socketpair
+        del socket.socketpair
+        try:
+            super(TestWsSocketWithoutSocketpair, self).setUp()
+        finally:
+            socket.socketpair = native
+        self.assertEqual(self.transport.s.wakeupsocket.family, socket.AF_INET)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,8 +4,228 @@ Poco UI automation testing toolkit
 Provides coordinate positioning, element finding, region calculation and other useful functions
 """
 
+import bisect
+import itertools
 import time
-from poco.exceptions import PocoNoSuchNodeException
+
+
+def _attributes(node):
+    """Attributes of a node of the hierarchy dump, which are stored in its payload"""
+    return node.get('payload', node)
+
+
+def _bounds(attrs):
+    """
+    Bounds (left, top, right, bottom) of an element, whose pos is at its anchorPoint like in
+    poco.sdk.DefaultMatcher.getBounds, or None if it has no pos or size
+    """
+    pos = attrs.get('pos')
+    size = attrs.get('size')
+    if not pos or not size:
+        return None
+    anchor = attrs.get('anchorPoint') or [0.5, 0.5]
+    left = pos[0] - size[0] * anchor[0]
+    top = pos[1] - size[1] * anchor[1]
+    return left, top, left + size[0], top + size[1]
+
+
+def _center(attrs):
+    """Center of the bounds of an element like UIObjectProxy.focus('center'), its pos if it has no bounds"""
+    bounds = _bounds(attrs)
+    if bounds is None:
+        return attrs.get('pos')
+    return [(bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2]
+
+
+class HitTestIndex:
+    """
+    Uniform grid over the element bounds of one hierarchy dump, for resolving many coordinates without walking the
+    whole tree for each of them. Each element is put into every cell its bounds overlap, so a coordinate only tests
+    the elements of its own cell. Coordinates and bounds outside the screen are clamped to the border cells.
+
+    Args:
+        hierarchy: hierarchy dump, see ``poco.agent.hierarchy.dump()``
+        grid_size: number of cells per axis, chosen by the number of elements by default
+    """
+
+    def __init__(self, hierarchy, grid_size=None):
+        self.hierarchy = hierarchy
+        # (bounds, attributes) in traversal order
+        self.elements = []
+        stack = [hierarchy] if hierarchy else []
+        while stack:
+            node = stack.pop()
+            attrs = _attributes(node)
+            bounds = _bounds(attrs)
+            if bounds is not None:
+                self.elements.append((bounds, attrs))
+            stack.extend(reversed(node.get('children') or []))
+
+        self.grid_size = grid_size or max(1, min(64, int(len(self.elements) ** 0.5)))
+        self.cells = [[] for _ in range(self.grid_size * self.grid_size)]
+        for i, (bounds, _) in enumerate(self.elements):
+            x0, y0 = self._cell(bounds[0], bounds[1])
+            x1, y1 = self._cell(bounds[2], bounds[3])
+            for y in range(y0, y1 + 1):
+                for x in range(x0, x1 + 1):
+                    self.cells[y * self.grid_size + x].append(i)
+
+    def _cell(self, x, y):
+        n = self.grid_size
+        return min(max(int(x * n), 0), n - 1), min(max(int(y * n), 0), n - 1)
+
+    def query(self, coord):
+        """
+        Find all elements whose bounds contain the coordinate
+
+        Args:
+            coord: normalized coordinate [x, y]
+
+        Returns:
+            list: attributes of the matched elements in traversal order
+        """
+        x, y = self._cell(coord[0], coord[1])
+        matches = []
+        for i in self.cells[y * self.grid_size + x]:
+            left, top, right, bottom = self.elements[i][0]
+            if left <= coord[0] <= right and top <= coord[1] <= bottom:
+                matches.append(self.elements[i][1])
+        return matches
+
+
+class LocatorIndex:
+    """
+    Attribute frequency tables and inverted index of one hierarchy dump, for synthesizing the shortest locator that
+    identifies an element uniquely without trial queries against the device. Combinations of the element's own
+    attributes are tried first, fewest attributes first, then combinations anchored by a uniquely identified ancestor.
+
+    A locator is a list of steps, each one a dict of attribute values. The first step selects by attributes and each
+    following one selects among the offspring of the previous one, i.e. ``poco(**steps[0]).offspring(**steps[1])``.
+
+    Args:
+        hierarchy: hierarchy dump, see ``poco.agent.hierarchy.dump()``
+    """
+    
+    # attributes to compose locators of, in the order of preference
+    ATTRIBUTES = ('resourceId', 'name', 'text', 'type')
+    
+    def __init__(self, hierarchy):
+        self.elements = []  # attributes in preorder
+        self.parents = []  # preorder index of the parent, -1 for the root
+        self.ends = []  # preorder index of the last offspring
+        self.postings = {}  # (attribute, value) -> ascending preorder indexes, whose lengths are the frequencies
+        self.members = {}  # (attribute, value) -> set of the preorder indexes
+        self.positions = {}  # id of attributes -> preorder index
+        self._unique = {}  # preorder index -> unique keys in the whole hierarchy
+        
+        stack = [(hierarchy, -1)] if hierarchy else []
+        while stack:
+            node, parent = stack.pop()
+            if node is None:
+                # all offspring of the parent are visited
+                self.ends[parent] = len(self.elements) - 1
+                continue
+            i = len(self.elements)
+            attrs = _attributes(node)
+            self.elements.append(attrs)
+            self.parents.append(parent)
+            self.ends.append(i)
+            self.positions[id(attrs)] = i
+            for key in self._keys(attrs):
+                self.postings.setdefault(key, []).append(i)
+            stack.append((None, i))
+            stack.extend((child, i) for child in reversed(node.get('children') or []))
+        for key, indexes in self.postings.items():
+            self.members[key] = set(indexes)
+    
+    def _keys(self, attrs):
+        keys = []
+        for name in self.ATTRIBUTES:
+            value = attrs.get(name)
+            if value is None or value == '':
+                continue
+            try:
+                hash(value)
+            except TypeError:
+                continue
+            keys.append((name, value))
+        return keys
+    
+    def _matches(self, keys, anchor=None, limit=None):
+        # preorder indexes matching all the keys, among the offspring of the anchor if given
+        if not keys:
+            return []
+        postings = min((self.postings.get(key, []) for key in keys), key=len)
+        lo, hi = (anchor + 1, self.ends[anchor]) if anchor is not None else (0, len(self.elements) - 1)
+        matched = []
+        for i in postings[bisect.bisect_left(postings, lo):bisect.bisect_right(postings, hi)]:
+            if all(i in self.members[key] for key in keys):
+                matched.append(i)
+                if len(matched) == limit:
+                    break
+        return matched
+    
+    def _unique_keys(self, i, anchor=None):
+        if anchor is None and i in self._unique:
+            return self._unique[i]
+        keys = self._keys(self.elements[i])
+        unique = None
+        for size in range(1, len(keys) + 1):
+            for combination in itertools.combinations(keys, size):
+                if len(self._matches(combination, anchor, limit=2)) == 1:
+                    unique = combination
+                    break
+            if unique:
+                break
+        if anchor is None:
+            self._unique[i] = unique
+        return unique
+    
+    def locate(self, attrs):
+        """
+        Synthesize the shortest locator of the element
+        
+        Args:
+            attrs: attributes of the element in the indexed hierarchy dump, e.g. ``full_attributes`` of the element
+             information
+        
+        Returns:
+            list: locator steps, or None if the element cannot be identified uniquely
+        """
+        i = self.positions.get(id(attrs))
+        if i is None:
+            return None
+        keys = self._unique_keys(i)
+        if keys:
+            return [dict(keys)]
+        
+        # Anchor by the ancestor giving the fewest attributes in total, the nearest one if tied
+        best = None
+        anchor = self.parents[i]
+        while anchor >= 0 and not (best and len(best[0]) + len(best[1]) == 2):
+            anchor_keys = self._unique_keys(anchor)
+            if anchor_keys:
+                keys = self._unique_keys(i, anchor)
+                if keys and (best is None or len(anchor_keys) + len(keys) < len(best[0]) + len(best[1])):
+                    best = (anchor_keys, keys)
+            anchor = self.parents[anchor]
+        return [dict(keys) for keys in best] if best else None
+    
+    def resolve(self, locator):
+        """
+        Evaluate the locator against the indexed hierarchy dump
+        
+        Returns:
+            list: attributes of the matched elements in traversal order
+        """
+        matched = None
+        for step in locator:
+            keys = list(step.items())
+            if matched is None:
+                matched = self._matches(keys)
+            else:
+                matched = sorted(set(i for anchor in matched for i in self._matches(keys, anchor)))
+        return [self.elements[i] for i in matched or []]
 
 
 class CoordElementFinder:
@@ -25,24 +245,46 @@ class CoordElementFinder:
         Returns:
             dict: element information including resourceId, name, type, text, etc.
         """
-        # 1. Coordinate conversion if needed
+        return self.get_elements_by_coords([coord], coord_type)[0]
+    
+    def get_elements_by_coords(self, coords, coord_type='normalized', index=None):
+        """
+        Get element information by many coordinates against one UI hierarchy dump
+        
+        Args:
+            coords: list of coordinates [x, y]
+            coord_type: 'normalized' or 'pixel'
+            index: HitTestIndex to reuse, a new one is built from the current UI hierarchy by default
+        
+        Returns:
+            list: element information for each coordinate, None for those with no element found
+        """
+        # 1. Get UI hierarchy and index it
+        if index is None:
+            index = self.build_index()
+            if index is None:
+                return [None] * len(coords)
+        
+        # 2. Coordinate conversion if needed
         if coord_type == 'pixel':
-            coord = self._pixel_to_normalized(coord)
+            coords = self._pixels_to_normalized(coords)
+        
+        # 3. Find all matching elements and sort by priority (visibility, Z-order, size, etc.)
+        return [self._select_best_match(index.query(coord)) for coord in coords]
+    
+    def build_index(self):
+        """
+        Dump the UI hierarchy and build a HitTestIndex of it
         
-        # 2. Get UI hierarchy
+        Returns:
+            HitTestIndex: None if failed to get UI hierarchy
+        """
         try:
             hierarchy = self.poco.agent.hierarchy.dump()
         except Exception as e:
             print(f"Failed to get UI hierarchy: {e}")
             return None
-        
-        # 3. Find all matching elements
-        matches = self._find_all_elements_at_coord(hierarchy, coord)
-        
-        # 4. Sort by priority (visibility, Z-order, size, etc.)
-        best_match = self._select_best_match(matches)
-        
-        return best_match
+        return HitTestIndex(hierarchy)
     
     def get_element_region_by_coord(self, coord, coord_type='normalized', padding=0.01):
         """
@@ -56,26 +298,24 @@ class CoordElementFinder:
         Returns:
             dict: dictionary containing region information
         """
-        element_info = self.get_element_by_coord(coord, coord_type)
-        
+        return self._element_region(self.get_element_by_coord(coord, coord_type), padding)
+    
+    @staticmethod
+    def _element_region(element_info, padding):
+        """Region information of the element found by coordinate, see get_element_region_by_coord"""
         if not element_info:
             return None
         
-        # Calculate complete element region
-        pos = element_info.get('pos', [0, 0])
-        size = element_info.get('size', [0, 0])
-        
-        # Calculate boundary coordinates
-        left = pos[0] - size[0] / 2
-        top = pos[1] - size[1] / 2
-        right = pos[0] + size[0] / 2
-        bottom = pos[1] + size[1] / 2
+        # Calculate complete element region from its bounds
+        pos = element_info.get('pos') or [0, 0]
+        original_left, original_top, original_right, original_bottom = \
+            _bounds(element_info) or (pos[0], pos[1], pos[0], pos[1])
         
         # Add padding
-        left = max(0, left - padding)
-        top = max(0, top - padding)
-        right = min(1, right + padding)
-        bottom = min(1, bottom + padding)
+        left = max(0, original_left - padding)
+        top = max(0, original_top - padding)
+        right = min(1, original_right + padding)
+        bottom = min(1, original_bottom + padding)
         
         return {
             'element_info': element_info,
@@ -86,45 +326,49 @@ class CoordElementFinder:
                 'bottom': bottom,
                 'width': right - left,
                 'height': bottom - top,
-                'center': pos
+                'center': [(original_left + original_right) / 2, (original_top + original_bottom) / 2]
             },
             'original_bounds': {
-                'left': pos[0] - size[0] / 2,
-                'top': pos[1] - size[1] / 2,
-                'right': pos[0] + size[0] / 2,
-                'bottom': pos[1] + size[1] / 2
+                'left': original_left,
+                'top': original_top,
+                'right': original_right,
+                'bottom': original_bottom
             }
         }
     
-    def _find_all_elements_at_coord(self, root, coord):
-        """Find all elements at specified coordinate"""
-        matches = []
-        
-        def traverse(node):
-            if self._is_coord_in_element(coord, node):
-                matches.append(node)
-            
-            for child in node.get('children', []):
-                traverse(child)
-        
-        traverse(root)
-        return matches
-    
-    def _is_coord_in_element(self, coord, element):
-        """Check if coordinate is within element"""
-        pos = element.get('pos', [0, 0])
+    @staticmethod
+    def _priority_score(element):
+        '''
+          在UI自动化中，一个坐标点可能同时位于多个重叠的UI元素内，比如：
+        - 一个按钮在父容器内
+        - 父容器在根布局内
+        - 可能还有透明的遮罩层
+
+        best_match 通过多维度评分来选择最合适的元素：
+        '''
+        score = 0
+
+        # 1. 可见性优先 (最重要)
+        if element.get('visible', False):
+            score += 1000  # 不可见元素基本不应该被选中
+
+        # 2. Z轴层级 (层级越高越在前台)
+        z_orders = element.get('zOrders', {})
+        global_z = z_orders.get('global', 0)  # 全局层级
+        local_z = z_orders.get('local', 0)    # 局部层级
+        score += global_z * 100 + local_z * 10
+
+        # 3. 可交互性 (可点击的元素更有价值)
+        if element.get('touchable', False):
+            score += 50
+
+        # 4. 面积越小越精确 (避免选择大的容器)
         size = element.get('size', [0, 0])
+        if size[0] > 0 and size[1] > 0:
+            area = size[0] * size[1]
+            score -= area * 10  # 负分，面积越小分数越高
         
-        if not pos or not size:
-            return False
-        
-        left = pos[0] - size[0] / 2
-        top = pos[1] - size[1] / 2
-        right = pos[0] + size[0] / 2
-        bottom = pos[1] + size[1] / 2
-        
-        return (left <= coord[0] <= right and 
-                top <= coord[1] <= bottom)
+        return score
     
     def _select_best_match(self, matches):
         """Select the best matching element"""
@@ -132,40 +376,7 @@ class CoordElementFinder:
             return None
         
         # Priority: visible > Z-order > interactive > small area (more precise)
-        def priority_score(element):
-            '''
-              在UI自动化中，一个坐标点可能同时位于多个重叠的UI元素内，比如：
-            - 一个按钮在父容器内
-            - 父容器在根布局内
-            - 可能还有透明的遮罩层
-
-            best_match 通过多维度评分来选择最合适的元素：
-            '''
-            score = 0
-
-            # 1. 可见性优先 (最重要)
-            if element.get('visible', False):
-                score += 1000  # 不可见元素基本不应该被选中
-
-            # 2. Z轴层级 (层级越高越在前台)
-            z_orders = element.get('zOrders', {})
-            global_z = z_orders.get('global', 0)  # 全局层级
-            local_z = z_orders.get('local', 0)    # 局部层级
-            score += global_z * 100 + local_z * 10
-
-            # 3. 可交互性 (可点击的元素更有价值)
-            if element.get('touchable', False):
-                score += 50
-
-            # 4. 面积越小越精确 (避免选择大的容器)
-            size = element.get('size', [0, 0])
-            if size[0] > 0 and size[1] > 0:
-                area = size[0] * size[1]
-                score -= area * 10  # 负分，面积越小分数越高
-            
-            return score
-        
-        best_match = max(matches, key=priority_score)
+        best_match = max(matches, key=self._priority_score)
         
         # Extract required information
         return {
@@ -194,11 +405,23 @@ class CoordElementFinder:
         except:
             # If unable to get screen size, return original coordinates
             return pixel_coord
+    
+    def _pixels_to_normalized(self, pixel_coords):
+        """Convert pixel coordinates to normalized coordinates, getting the screen size only once"""
+        try:
+            screen_size = self.poco.get_screen_size()
+        except:
+            # If unable to get screen size, return original coordinates
+            return pixel_coords
+        return [[c[0] / screen_size[0], c[1] / screen_size[1]] for c in pixel_coords]
 
 
 class ElementTracker:
     """Element tracker - for recording and repeatedly locating UI elements"""
     
+    # attributes to locate tracked elements by, in the order of confidence
+    LOCATORS = ('resourceId', 'name', 'text')
+    
     def __init__(self, poco):
         self.poco = poco
         self.finder = CoordElementFinder(poco)
@@ -216,11 +439,14 @@ class ElementTracker:
         Returns:
             bool: whether tracking was successful
         """
-        element_info = self.finder.get_element_by_coord(coord, coord_type)
+        index = self.finder.build_index()
+        element_info = self.finder.get_elements_by_coords([coord], coord_type, index)[0] if index else None
         
         if element_info:
+            # Record the shortest unique locator of the element against the same dump
+            element_info['locator'] = LocatorIndex(index.hierarchy).locate(element_info['full_attributes'])
             self.tracked_elements[element_name] = element_info
-            print(f"Successfully tracked element '{element_name}': {element_info['resourceId'] or element_info['name']}")
+            print(f"Successfully tracked element '{element_name}': {element_info['locator'] or element_info['resourceId'] or element_info['name']}")
             return True
         else:
             print(f"Unable to track element '{element_name}': no element found at coordinate {coord}")
@@ -243,32 +469,19 @@ class ElementTracker:
         
         element_info = self.tracked_elements[element_name]
         
-        # Try locating by resourceId
-        if element_info.get('resourceId'):
-            try:
-                self.poco(resourceId=element_info['resourceId']).click()
-                print(f"Successfully clicked '{element_name}' by resourceId")
-                return True
-            except PocoNoSuchNodeException:
-                print(f"Failed to locate by resourceId, trying other methods...")
-        
-        # Try locating by name
-        if element_info.get('name'):
-            try:
-                self.poco(element_info['name']).click()
-                print(f"Successfully clicked '{element_name}' by name")
-                return True
-            except PocoNoSuchNodeException:
-                print(f"Failed to locate by name, trying other methods...")
-        
-        # Try locating by text
-        if element_info.get('text'):
+        # Evaluate all locators against one UI hierarchy dump and click the best ranked match once
+        index = self.finder.build_index()
+        located = self._locate(element_info, index) if index is not None else None
+        if located:
+            locator, pos = located
             try:
-                self.poco(text=element_info['text']).click()
-                print(f"Successfully clicked '{element_name}' by text")
+                self.poco.click(pos)
+                print(f"Successfully clicked '{element_name}' by {locator}")
                 return True
-            except PocoNoSuchNodeException:
-                print(f"Failed to locate by text, trying other methods...")
+            except Exception as e:
+                print(f"Failed to click by {locator}: {e}")
+        else:
+            print(f"Failed to locate '{element_name}' by any locator, trying coordinates...")
         
         # Use fallback coordinate
         if fallback_coord:
@@ -282,7 +495,7 @@ class ElementTracker:
         # Use original coordinate
         if element_info.get('pos'):
             try:
-                self.poco.click(element_info['pos'])
+                self.poco.click(_center(element_info))
                 print(f"Successfully clicked '{element_name}' by original coordinate")
                 return True
             except Exception as e:
@@ -291,6 +504,46 @@ class ElementTracker:
         print(f"All location methods failed, unable to click '{element_name}'")
         return False
     
+    def _locate(self, element_info, index):
+        """
+        Find the tracked element by all locators in one pass over the indexed UI hierarchy
+        
+        The recorded unique locator is taken if it still matches exactly one visible element. Otherwise locators
+        matching exactly one visible element rank first, then by confidence. If the best locator matches several
+        elements, the one nearest to the tracked position is taken.
+        
+        Returns:
+            tuple: (locator, center position) of the located element, or None if no locator matches
+        """
+        if element_info.get('locator'):
+            matches = [attrs for attrs in LocatorIndex(index.hierarchy).resolve(element_info['locator'])
+                       if attrs.get('visible', True)]
+            if len(matches) == 1 and matches[0].get('pos'):
+                return 'locator', _center(matches[0])
+        
+        values = [(locator, element_info.get(locator)) for locator in self.LOCATORS if element_info.get(locator)]
+        matches = dict((locator, []) for locator, _ in values)
+        for _, attrs in index.elements:
+            if not attrs.get('visible', True):
+                continue
+            for locator, value in values:
+                if attrs.get(locator) == value:
+                    matches[locator].append(attrs)
+        
+        ranked = [(len(matches[locator]) > 1, priority, locator)
+                  for priority, (locator, _) in enumerate(values) if matches[locator]]
+        if not ranked:
+            return None
+        _, _, locator = min(ranked)
+        
+        candidates = matches[locator]
+        origin = element_info.get('pos')
+        if len(candidates) > 1 and origin:
+            best = min(candidates, key=lambda a: (a['pos'][0] - origin[0]) ** 2 + (a['pos'][1] - origin[1]) ** 2)
+        else:
+            best = candidates[0]
+        return locator, _center(best)
+    
     def get_tracked_elements(self):
         """Get all tracked elements"""
         return self.tracked_elements
@@ -405,6 +658,66 @@ class UIRegionExtractor:
         except Exception as e:
             print(f"Failed to save element screenshot: {e}")
             return False
+    
+    def save_element_screenshots(self, coords_and_filenames, padding=0.01, coord_type='normalized', max_workers=4):
+        """
+        Save screenshots of many elements from one screen screenshot and one UI hierarchy dump
+        
+        Args:
+            coords_and_filenames: list of (coord [x, y], save filename)
+            padding: region padding
+            coord_type: coordinate type
+            max_workers: number of threads to encode and save the screenshots
+        
+        Returns:
+            list: whether save was successful for each element
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        results = [False] * len(coords_and_filenames)
+        try:
+            import base64
+            import numpy as np
+            from PIL import Image
+            import io
+            
+            # Get region information of all elements against one UI hierarchy dump
+            coords = [coord for coord, _ in coords_and_filenames]
+            element_infos = self.finder.get_elements_by_coords(coords, coord_type)
+            
+            # Get screen screenshot only once
+            b64img, fmt = self.poco.snapshot()
+            img = Image.open(io.BytesIO(base64.b64decode(b64img)))
+            if img.mode not in ('RGB', 'RGBA', 'L'):
+                img = img.convert('RGB')
+            pixels = np.asarray(img)
+            height, width = pixels.shape[:2]
+        except Exception as e:
+            print(f"Failed to save element screenshots: {e}")
+            return results
+        
+        def save(i, crop, filename):
+            try:
+                Image.fromarray(crop).save(filename)
+                results[i] = True
+                print(f"Element screenshot saved: {filename}")
+            except Exception as e:
+                print(f"Failed to save element screenshot {filename}: {e}")
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for i, ((coord, filename), element_info) in enumerate(zip(coords_and_filenames, element_infos)):
+                region_info = CoordElementFinder._element_region(element_info, padding)
+                if not region_info:
+                    print(f"Failed to save element screenshot {filename}: no element found at coordinate {coord}")
+                    continue
+                
+                # Crop region by slicing, the crop is a view so that nothing is copied before saving
+                region = region_info['region']
+                crop = pixels[int(region['top'] * height):int(region['bottom'] * height),
+                              int(region['left'] * width):int(region['right'] * width)]
+                pool.submit(save, i, crop, filename)
+        
+        return results
 
 
 # Convenience functions